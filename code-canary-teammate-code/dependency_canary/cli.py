@@ -2,11 +2,7 @@
 Command-line interface for Code Canary.
 """
 
-import asyncio
-import json
 import sys
-from datetime import datetime
-from enum import Enum
 from pathlib import Path
 from typing import Optional
 
@@ -16,10 +12,12 @@ from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from loguru import logger
 
+from . import aio
 from .sbom import SBOMGenerator
 from .vulnerability import VulnerabilityEnricher
 from .modal_workers import ModalSBOMService
 from .models import ScanResult
+from .serialization import json_dumps
 
 console = Console()
 
@@ -81,55 +79,22 @@ def scan(project_path: Path, output: Optional[Path], format: str,
                     modal_service = ModalSBOMService()
                     intelligence_data = await modal_service.gather_supply_chain_intelligence_remote(result.sbom.packages)
                 else:
-                    from .supply_chain_intelligence import SupplyChainIntelligence
+                    from .supply_chain_intelligence import SupplyChainIntelligence, format_intel_result
                     intel_service = SupplyChainIntelligence()
                     intelligence_data = await intel_service.gather_package_intelligence(result.sbom.packages)
                     
                     # Convert to same format as Modal output
-                    formatted_data = []
-                    for intel in intelligence_data:
-                        risk = intel_service.calculate_supply_chain_risk(intel)
-                        formatted_data.append({
-                            "package_name": intel.package_name,
-                            "package_manager": intel.package_manager,
-                            "version": intel.version,
-                            "intelligence": {
-                                "weekly_downloads": intel.weekly_downloads,
-                                "total_downloads": intel.total_downloads,
-                                "maintainers": intel.maintainers,
-                                "upload_time": intel.upload_time.isoformat() if intel.upload_time else None,
-                                "project_urls": intel.project_urls,
-                                "dependencies_count": intel.dependencies_count,
-                                "is_very_new": intel.is_very_new,
-                                "low_download_count": intel.low_download_count,
-                                "suspicious_name": intel.suspicious_name,
-                                "potential_typosquat": intel.potential_typosquat,
-                            },
-                            "supply_chain_risk": {
-                                "risk_level": risk.risk_level,
-                                "risk_score": risk.risk_score,
-                                "risk_factors": risk.risk_factors,
-                                "recommendations": risk.recommendations,
-                            }
-                        })
-                    intelligence_data = formatted_data
+                    intelligence_data = [
+                        format_intel_result(intel, intel_service.calculate_supply_chain_risk(intel))
+                        for intel in intelligence_data
+                    ]
                 
                 # Add intelligence data to result for output
                 result.supply_chain_intelligence = intelligence_data
          
         # Output results in the requested format
         if format == "json":
-            class DateTimeEncoder(json.JSONEncoder):
-                def default(self, obj):
-                    if isinstance(obj, datetime):
-                        return obj.isoformat()
-                    elif isinstance(obj, Enum):
-                        return obj.value
-                    elif isinstance(obj, set):
-                        return list(obj)
-                    return super().default(obj)
-                    
-            output_data = json.dumps(result.model_dump(), indent=2, cls=DateTimeEncoder)
+            output_data = json_dumps(result.model_dump(mode="json"), indent=True)
         elif format == "yaml":
             import yaml
             output_data = yaml.dump(result.model_dump(), default_flow_style=False)
@@ -143,7 +108,7 @@ def scan(project_path: Path, output: Optional[Path], format: str,
             console.print(output_data)
     
     try:
-        asyncio.run(run_scan())
+        aio.run(run_scan())
     except KeyboardInterrupt:
         console.print("❌ Scan cancelled")
         sys.exit(1)
@@ -176,17 +141,7 @@ def sbom(project_path: Path, output: Optional[Path], format: str):
          
         # Output SBOM
         if format == "json":
-            class DateTimeEncoder(json.JSONEncoder):
-                def default(self, obj):
-                    if isinstance(obj, datetime):
-                        return obj.isoformat()
-                    elif isinstance(obj, Enum):
-                        return obj.value
-                    elif isinstance(obj, set):
-                        return list(obj)
-                    return super().default(obj)
-                    
-            output_data = json.dumps(sbom_result.model_dump(), indent=2, cls=DateTimeEncoder)
+            output_data = json_dumps(sbom_result.model_dump(mode="json"), indent=True)
         else:
             import yaml
             output_data = yaml.dump(sbom_result.model_dump(), default_flow_style=False)
@@ -198,7 +153,7 @@ def sbom(project_path: Path, output: Optional[Path], format: str):
             console.print(output_data)
     
     try:
-        asyncio.run(generate_sbom())
+        aio.run(generate_sbom())
     except Exception as e:
         console.print(f"❌ SBOM generation failed: {e}")
         sys.exit(1)
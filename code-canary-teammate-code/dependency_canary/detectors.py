@@ -203,11 +203,16 @@ class LanguageDetector:
                 return
             
             try:
-                for item in path.iterdir():
-                    if item.is_file():
-                        files.append(item)
-                    elif item.is_dir() and not self._should_skip_directory(item):
-                        _walk(item, depth + 1)
+                # scandir reports entry types from the directory listing, so
+                # most entries need no extra stat call
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            files.append(path / entry.name)
+                        elif entry.is_dir():
+                            child = path / entry.name
+                            if not self._should_skip_directory(child):
+                                _walk(child, depth + 1)
             except (PermissionError, OSError):
                 # Skip directories we can't read
                 pass
@@ -0,0 +1,131 @@
+"""
+Shared HTTP client configuration for registry and vulnerability APIs.
+"""
+
+import asyncio
+import random
+import weakref
+from typing import Optional
+
+import httpx
+from loguru import logger
+
+from . import __version__
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Connection pool sized for fan-out across hundreds of packages
+DEFAULT_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=3.0)
+# httpx already negotiates gzip and deflate, adding br and zstd when the
+# optional brotli and zstandard packages are installed, so Accept-Encoding
+# is left to it: advertising an encoding it cannot decode would break reads
+DEFAULT_HEADERS = {"User-Agent": f"code-canary/{__version__}"}
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRY_DELAY = 30.0
+
+# Long-lived clients keyed by event loop; an AsyncClient's connections are
+# bound to the loop that opened them, so clients are never shared across loops
+_shared_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def create_async_client(**kwargs) -> httpx.AsyncClient:
+    """Create an AsyncClient with the shared pool limits and timeouts.
+
+    HTTP/2 is enabled when the optional ``h2`` package is installed, and
+    responses are compressed with brotli when ``brotli`` is installed.
+    Headers passed in are merged over the defaults.
+
+    Args:
+        **kwargs: Overrides for any ``httpx.AsyncClient`` option
+
+    Returns:
+        Configured HTTP client
+    """
+    options = {
+        "http2": HTTP2_AVAILABLE,
+        "limits": DEFAULT_LIMITS,
+        "timeout": DEFAULT_TIMEOUT,
+    }
+    options.update(kwargs)
+    options["headers"] = {**DEFAULT_HEADERS, **dict(kwargs.get("headers") or {})}
+    return httpx.AsyncClient(**options)
+
+
+def get_shared_client() -> httpx.AsyncClient:
+    """Return the pooled client for the running event loop.
+
+    Repeated callers on the same loop reuse open connections (and TLS
+    sessions) instead of handshaking again. The client is owned by this
+    module: do not close it or use it as a context manager.
+
+    Returns:
+        Shared HTTP client
+    """
+    loop = asyncio.get_running_loop()
+    client = _shared_clients.get(loop)
+    if client is None or client.is_closed:
+        client = create_async_client()
+        _shared_clients[loop] = client
+    return client
+
+
+async def close_shared_client() -> None:
+    """Close the running event loop's shared client, if one was created."""
+    client = _shared_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def request_with_retry(client: httpx.AsyncClient, method: str, url: str,
+                             max_attempts: int = 3, backoff: float = 0.5,
+                             **kwargs) -> httpx.Response:
+    """Send a request, retrying with exponential backoff on 429/5xx.
+
+    Args:
+        client: HTTP client
+        method: HTTP method
+        url: Request URL
+        max_attempts: Total number of attempts
+        backoff: Base delay in seconds, doubled after every attempt
+        **kwargs: Passed through to ``client.request``
+
+    Returns:
+        The last response received
+
+    Raises:
+        httpx.TransportError: If the final attempt fails at the transport level
+    """
+    for attempt in range(1, max_attempts + 1):
+        response = None
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.TransportError:
+            if attempt == max_attempts:
+                raise
+        else:
+            if response.status_code not in RETRY_STATUS_CODES or attempt == max_attempts:
+                return response
+
+        delay = _retry_delay(response, attempt, backoff)
+        logger.debug(f"Retrying {method} {url} in {delay:.2f}s (attempt {attempt}/{max_attempts})")
+        await asyncio.sleep(delay)
+
+
+def _retry_delay(response: Optional[httpx.Response], attempt: int, backoff: float) -> float:
+    """Compute the delay before the next attempt, honouring Retry-After."""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), MAX_RETRY_DELAY)
+
+    # Full jitter keeps concurrent workers from retrying in lockstep
+    return random.uniform(0, backoff * (2 ** (attempt - 1)))
@@ -4,34 +4,58 @@ Modal workers for parallel SBOM generation and vulnerability enrichment.
 
 import modal
 import asyncio
+from functools import cached_property
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
 import os
+import httpx
 from loguru import logger
 
 from .sbom import SBOMGenerator
 from .vulnerability import VulnerabilityEnricher
-from .supply_chain_intelligence import SupplyChainIntelligence
+from .supply_chain_intelligence import SupplyChainIntelligence, format_intel_result
+from .detectors import LanguageDetector, DetectedManifest
+from .http_client import create_async_client
 from .models import SBOM, ScanResult, Package
+from . import aio
+from .serialization import PAYLOAD_CODEC, json_dumps, pack_payload, unpack_payload
 
 # Create Modal app
 app = modal.App("renamed-project")
 
+# Local OSV snapshot kept on the shared volume and refreshed nightly
+OSV_SNAPSHOT_DIR = "/data/osv"
+OSV_SNAPSHOT_URL = "https://osv-vulnerabilities.storage.googleapis.com"
+OSV_SNAPSHOT_ECOSYSTEMS = ["PyPI", "npm", "Go", "crates.io", "RubyGems", "Maven", "NuGet"]
+
+# Pinned Syft release; the tarball is checked against the release's checksum
+# file so the image layer is deterministic and cacheable
+SYFT_VERSION = "1.14.0"
+SYFT_TARBALL = f"syft_{SYFT_VERSION}_linux_amd64.tar.gz"
+SYFT_RELEASE_URL = f"https://github.com/anchore/syft/releases/download/v{SYFT_VERSION}"
+
 # Define the container image with all dependencies
 image = (
     modal.Image.debian_slim()
     .apt_install(["curl", "ca-certificates"])
     .run_commands([
-        "bash -lc 'curl -sSfL https://raw.githubusercontent.com/anchore/syft/main/install.sh | sh -s -- -b /usr/local/bin'",
+        f"curl -sSfL -o /tmp/{SYFT_TARBALL} {SYFT_RELEASE_URL}/{SYFT_TARBALL}",
+        f"curl -sSfL -o /tmp/syft_checksums.txt {SYFT_RELEASE_URL}/syft_{SYFT_VERSION}_checksums.txt",
+        "cd /tmp && sha256sum --check --ignore-missing --strict syft_checksums.txt",
+        f"tar -xzf /tmp/{SYFT_TARBALL} -C /usr/local/bin syft",
+        f"rm /tmp/{SYFT_TARBALL} /tmp/syft_checksums.txt",
     ])
     .pip_install([
         "httpx>=0.25.0",
         "pydantic>=2.0.0",
         "loguru>=0.7.0",
-        "toml>=0.10.2",
+        "rtoml>=0.9.0",  # Fast TOML parsing for pyproject.toml and Cargo files
+        'tomli>=2.0.0; python_version < "3.11"',
         "PyYAML>=6.0",
         "networkx>=3.0",  # For dependency graph analysis
+        "msgpack>=1.0.0",  # Compact scan result payloads
     ])
+    .env({"OSV_SNAPSHOT_DIR": OSV_SNAPSHOT_DIR})
 )
 
 # Shared volume for temporary file storage
@@ -68,7 +92,7 @@ async def generate_sbom_worker(project_data: Dict[str, Any]) -> Dict[str, Any]:
         )
         
         # Serialize SBOM to dictionary
-        return sbom.model_dump()
+        return sbom.model_dump(exclude_none=True)
         
     except Exception as e:
         logger.error(f"Failed to generate SBOM: {e}")
@@ -93,7 +117,7 @@ async def enrich_vulnerabilities_worker(sbom_data: Dict[str, Any]) -> Dict[str,
     """
     try:
         # Deserialize SBOM
-        sbom = SBOM.model_validate(sbom_data)
+        sbom = SBOM.from_trusted_dict(sbom_data)
         
         logger.info(f"Enriching vulnerabilities for {sbom.total_packages} packages")
         
@@ -104,7 +128,7 @@ async def enrich_vulnerabilities_worker(sbom_data: Dict[str, Any]) -> Dict[str,
         scan_result = await enricher.enrich_sbom(sbom)
         
         # Serialize scan result
-        return scan_result.model_dump()
+        return scan_result.model_dump(exclude_none=True)
         
     except Exception as e:
         logger.error(f"Failed to enrich vulnerabilities: {e}")
@@ -120,6 +144,10 @@ async def enrich_vulnerabilities_worker(sbom_data: Dict[str, Any]) -> Dict[str,
 async def detect_manifests_worker(project_path: str) -> List[Dict[str, Any]]:
     """Modal worker function to detect manifest files in a project.
     
+    Only useful for paths that exist inside the worker (e.g. checkouts on the
+    shared volume); local projects should use
+    ``ModalSBOMService.detect_manifests_local`` to avoid a cold start.
+    
     Args:
         project_path: Path to project directory
         
@@ -127,8 +155,6 @@ async def detect_manifests_worker(project_path: str) -> List[Dict[str, Any]]:
         List of detected manifest information
     """
     try:
-        from .detectors import LanguageDetector
-        
         detector = LanguageDetector()
         manifests = detector.detect_manifests(Path(project_path))
         
@@ -155,14 +181,16 @@ async def detect_manifests_worker(project_path: str) -> List[Dict[str, Any]]:
     memory=4096,
     cpu=8.0
 )
-async def full_scan_worker(project_data: Dict[str, Any]) -> Dict[str, Any]:
+async def full_scan_worker(project_data: Dict[str, Any]) -> Union[bytes, Dict[str, Any]]:
     """Modal worker function to perform complete security scan.
     
     Args:
-        project_data: Dictionary containing project information
+        project_data: Dictionary containing project information, optionally
+            with the ``payload_codec`` the caller can decode
         
     Returns:
-        Complete scan result with SBOM, vulnerabilities, and risk analysis
+        Complete scan result with SBOM, vulnerabilities, and risk analysis,
+        msgpack-encoded when the caller asked for it
     """
     try:
         import time
@@ -173,19 +201,32 @@ async def full_scan_worker(project_data: Dict[str, Any]) -> Dict[str, Any]:
         
         logger.info(f"Starting full security scan for {project_path}")
         
-        # Step 1: Generate SBOM
+        # Generate the SBOM and enrich packages concurrently: the generator
+        # pushes each package onto the queue as its manifest is parsed and the
+        # enricher drains it in OSV-sized batches.
+        package_queue = asyncio.Queue()
         generator = SBOMGenerator()
-        sbom = await generator.generate_sbom(
-            project_path=project_path,
-            project_name=project_name,
-            include_transitive=True
-        )
+        enricher = VulnerabilityEnricher()
+        consumer = asyncio.create_task(enricher.enrich_package_stream(package_queue))
+        
+        try:
+            sbom = await generator.generate_sbom(
+                project_path=project_path,
+                project_name=project_name,
+                include_transitive=True,
+                package_queue=package_queue
+            )
+        except Exception:
+            consumer.cancel()
+            raise
+        finally:
+            package_queue.put_nowait(None)
         
         logger.info(f"Generated SBOM with {sbom.total_packages} packages")
         
-        # Step 2: Enrich with vulnerabilities
-        enricher = VulnerabilityEnricher()
-        scan_result = await enricher.enrich_sbom(sbom)
+        scan_result = ScanResult(sbom=sbom)
+        for risk in await consumer:
+            scan_result.add_package_risk(risk)
         
         logger.info(f"Found {scan_result.total_vulnerabilities} vulnerabilities")
         
@@ -196,7 +237,10 @@ async def full_scan_worker(project_data: Dict[str, Any]) -> Dict[str, Any]:
         
         logger.info(f"Completed full scan in {scan_result.scan_duration_seconds:.2f} seconds")
         
-        return scan_result.model_dump()
+        codec = project_data.get("payload_codec")
+        if codec is None:
+            return scan_result.model_dump(exclude_none=True)
+        return pack_payload(scan_result.model_dump(mode="json", exclude_none=True), codec)
         
     except Exception as e:
         logger.error(f"Failed to perform full scan: {e}")
@@ -215,7 +259,7 @@ async def generate_image_sbom_worker(image_ref: str) -> Dict[str, Any]:
         logger.info(f"Generating image SBOM for {image_ref}")
         generator = SBOMGenerator()
         sbom = await generator.generate_sbom_from_container(image_ref)
-        return sbom.model_dump()
+        return sbom.model_dump(exclude_none=True)
     except Exception as e:
         logger.error(f"Failed to generate image SBOM: {e}")
         raise
@@ -250,34 +294,8 @@ async def supply_chain_intelligence_worker(packages_data: List[Dict[str, Any]])
         intelligence_data = await intel_service.gather_package_intelligence(packages)
         
         # Calculate risks
-        results = []
-        for intel in intelligence_data:
-            risk = intel_service.calculate_supply_chain_risk(intel)
-            
-            result = {
-                "package_name": intel.package_name,
-                "package_manager": intel.package_manager,
-                "version": intel.version,
-                "intelligence": {
-                    "weekly_downloads": intel.weekly_downloads,
-                    "total_downloads": intel.total_downloads,
-                    "maintainers": intel.maintainers,
-                    "upload_time": intel.upload_time.isoformat() if intel.upload_time else None,
-                    "project_urls": intel.project_urls,
-                    "dependencies_count": intel.dependencies_count,
-                    "is_very_new": intel.is_very_new,
-                    "low_download_count": intel.low_download_count,
-                    "suspicious_name": intel.suspicious_name,
-                    "potential_typosquat": intel.potential_typosquat,
-                },
-                "supply_chain_risk": {
-                    "risk_level": risk.risk_level,
-                    "risk_score": risk.risk_score,
-                    "risk_factors": risk.risk_factors,
-                    "recommendations": risk.recommendations,
-                }
-            }
-            results.append(result)
+        calculate_risk = intel_service.calculate_supply_chain_risk
+        results = [format_intel_result(intel, calculate_risk(intel)) for intel in intelligence_data]
         
         logger.info(f"Completed supply chain intelligence analysis for {len(results)} packages")
         
@@ -287,6 +305,48 @@ async def supply_chain_intelligence_worker(packages_data: List[Dict[str, Any]])
         logger.error(f"Failed to gather supply chain intelligence: {e}")
         raise
 
+@app.function(
+    image=image,
+    volumes={"/data": volume},
+    timeout=1800,
+    memory=1024,
+    cpu=1.0,
+    schedule=modal.Cron("0 2 * * *")
+)
+async def refresh_osv_snapshot() -> Dict[str, int]:
+    """Download OSV ecosystem bundles into the shared volume.
+    
+    VulnerabilityEnricher answers OSV lookups from these bundles and only
+    falls back to the live API when a snapshot is missing or stale.
+    
+    Returns:
+        Size in bytes of each downloaded bundle
+    """
+    snapshot_dir = Path(OSV_SNAPSHOT_DIR)
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    sizes = {}
+    
+    async with create_async_client(timeout=httpx.Timeout(300.0, connect=10.0)) as client:
+        for ecosystem in OSV_SNAPSHOT_ECOSYSTEMS:
+            target = snapshot_dir / f"{ecosystem}.zip"
+            partial = target.with_suffix(".zip.partial")
+            try:
+                async with client.stream("GET", f"{OSV_SNAPSHOT_URL}/{ecosystem}/all.zip") as response:
+                    response.raise_for_status()
+                    with partial.open("wb") as f:
+                        async for chunk in response.aiter_bytes(1 << 20):
+                            f.write(chunk)
+                # Swap in atomically so readers never see a half-written bundle
+                os.replace(partial, target)
+                sizes[ecosystem] = target.stat().st_size
+                logger.info(f"Refreshed OSV snapshot for {ecosystem} ({sizes[ecosystem]} bytes)")
+            except Exception as e:
+                logger.error(f"Failed to refresh OSV snapshot for {ecosystem}: {e}")
+                partial.unlink(missing_ok=True)
+    
+    volume.commit()
+    return sizes
+
 class ModalSBOMService:
     """Service class for interacting with Modal workers."""
     
@@ -294,6 +354,50 @@ class ModalSBOMService:
         """Initialize Modal SBOM service."""
         self.app = app
     
+    # Local fallbacks are built on first use and then reused, so repeated
+    # Modal failures share one generator (and its parse and SBOM caches)
+    @cached_property
+    def _local_generator(self) -> SBOMGenerator:
+        return SBOMGenerator()
+    
+    @cached_property
+    def _local_enricher(self) -> VulnerabilityEnricher:
+        return VulnerabilityEnricher()
+    
+    @cached_property
+    def _local_intelligence(self) -> SupplyChainIntelligence:
+        return SupplyChainIntelligence()
+    
+    async def detect_manifests_local(self, project_path: Path) -> List[DetectedManifest]:
+        """Detect manifest files locally in a worker thread.
+        
+        Directory walks are IO-bound and cheap, so they run in-process
+        rather than paying for a Modal container cold start.
+        
+        Args:
+            project_path: Path to project directory
+            
+        Returns:
+            List of detected manifest files
+        """
+        detector = LanguageDetector()
+        return await asyncio.to_thread(detector.detect_manifests, Path(project_path))
+    
+    async def detect_manifests_local_many(self, project_paths: List[Path]) -> List[List[DetectedManifest]]:
+        """Detect manifest files for several projects concurrently.
+        
+        Args:
+            project_paths: Paths to project directories
+            
+        Returns:
+            Detected manifests for each project, in input order
+        """
+        detector = LanguageDetector()
+        return await asyncio.gather(*(
+            asyncio.to_thread(detector.detect_manifests, Path(path))
+            for path in project_paths
+        ))
+    
     async def generate_sbom_remote(self, project_path: Path, 
                                  project_name: str = None) -> SBOM:
         """Generate SBOM using Modal worker.
@@ -312,13 +416,12 @@ class ModalSBOMService:
         
         try:
             sbom_data = await generate_sbom_worker.remote(project_data)
-            return SBOM.model_validate(sbom_data)
+            return SBOM.from_trusted_dict(sbom_data)
         except Exception as e:
             logger.error(f"Remote SBOM generation failed: {e}")
             # Fall back to local processing
             logger.info("Falling back to local processing")
-            generator = SBOMGenerator()
-            return await generator.generate_sbom(project_path, project_name)
+            return await self._local_generator.generate_sbom(project_path, project_name)
     
     async def enrich_vulnerabilities_remote(self, sbom: SBOM) -> ScanResult:
         """Enrich SBOM with vulnerabilities using Modal worker.
@@ -330,15 +433,14 @@ class ModalSBOMService:
             Enriched scan result
         """
         try:
-            sbom_data = sbom.model_dump()
+            sbom_data = sbom.cached_dump()
             result_data = await enrich_vulnerabilities_worker.remote(sbom_data)
-            return ScanResult.model_validate(result_data)
+            return ScanResult.from_trusted_dict(result_data)
         except Exception as e:
             logger.error(f"Remote vulnerability enrichment failed: {e}")
             # Fall back to local processing
             logger.info("Falling back to local processing")
-            enricher = VulnerabilityEnricher()
-            return await enricher.enrich_sbom(sbom)
+            return await self._local_enricher.enrich_sbom(sbom)
     
     async def full_scan_remote(self, project_path: Path, 
                              project_name: str = None) -> ScanResult:
@@ -353,12 +455,13 @@ class ModalSBOMService:
         """
         project_data = {
             "path": str(project_path),
-            "name": project_name
+            "name": project_name,
+            "payload_codec": PAYLOAD_CODEC
         }
         
         try:
             result_data = await full_scan_worker.remote(project_data)
-            return ScanResult.model_validate(result_data)
+            return ScanResult.from_trusted_dict(unpack_payload(result_data))
         except Exception as e:
             logger.error(f"Remote scan failed: {e}")
             # Fall back to local processing
@@ -377,13 +480,12 @@ class ModalSBOMService:
         """
         try:
             sbom_data = await generate_image_sbom_worker.remote(image_ref)
-            return SBOM.model_validate(sbom_data)
+            return SBOM.from_trusted_dict(sbom_data)
         except Exception as e:
             logger.error(f"Remote container image scan failed: {e}")
             # Fall back to local processing if possible
             logger.info("Falling back to local processing")
-            generator = SBOMGenerator()
-            return await generator.generate_sbom_from_container(image_ref)
+            return await self._local_generator.generate_sbom_from_container(image_ref)
     
     async def gather_supply_chain_intelligence_remote(self, packages: List[Package]) -> List[Dict[str, Any]]:
         """Gather supply chain intelligence using Modal worker.
@@ -396,7 +498,7 @@ class ModalSBOMService:
         """
         try:
             # Serialize packages for Modal worker
-            packages_data = [pkg.model_dump() for pkg in packages]
+            packages_data = [pkg.model_dump(exclude_none=True) for pkg in packages]
             
             # Process in batches of 50 to avoid overwhelming APIs
             batch_size = 50
@@ -413,38 +515,11 @@ class ModalSBOMService:
             logger.error(f"Remote supply chain intelligence gathering failed: {e}")
             # Fall back to local processing
             logger.info("Falling back to local processing")
-            intel_service = SupplyChainIntelligence()
+            intel_service = self._local_intelligence
             intelligence_data = await intel_service.gather_package_intelligence(packages)
             
-            results = []
-            for intel in intelligence_data:
-                risk = intel_service.calculate_supply_chain_risk(intel)
-                result = {
-                    "package_name": intel.package_name,
-                    "package_manager": intel.package_manager,
-                    "version": intel.version,
-                    "intelligence": {
-                        "weekly_downloads": intel.weekly_downloads,
-                        "total_downloads": intel.total_downloads,
-                        "maintainers": intel.maintainers,
-                        "upload_time": intel.upload_time.isoformat() if intel.upload_time else None,
-                        "project_urls": intel.project_urls,
-                        "dependencies_count": intel.dependencies_count,
-                        "is_very_new": intel.is_very_new,
-                        "low_download_count": intel.low_download_count,
-                        "suspicious_name": intel.suspicious_name,
-                        "potential_typosquat": intel.potential_typosquat,
-                    },
-                    "supply_chain_risk": {
-                        "risk_level": risk.risk_level,
-                        "risk_score": risk.risk_score,
-                        "risk_factors": risk.risk_factors,
-                        "recommendations": risk.recommendations,
-                    }
-                }
-                results.append(result)
-            
-            return results
+            calculate_risk = intel_service.calculate_supply_chain_risk
+            return [format_intel_result(intel, calculate_risk(intel)) for intel in intelligence_data]
 
 # CLI function for Modal deployment
 @app.local_entrypoint()
@@ -455,28 +530,12 @@ def main(project_path: str = ".", output_format: str = "json"):
         project_path: Path to project directory to scan
         output_format: Output format (json, yaml, or summary)
     """
-    import asyncio
-    import json
-    
     async def run_scan():
         service = ModalSBOMService()
         result = await service.full_scan_remote(Path(project_path))
         
         if output_format == "json":
-            from datetime import datetime
-            from enum import Enum
-            
-            class DateTimeEncoder(json.JSONEncoder):
-                def default(self, obj):
-                    if isinstance(obj, datetime):
-                        return obj.isoformat()
-                    elif isinstance(obj, Enum):
-                        return obj.value
-                    elif isinstance(obj, set):
-                        return list(obj)
-                    return super().default(obj)
-            
-            print(json.dumps(result.model_dump(), indent=2, cls=DateTimeEncoder))
+            print(json_dumps(result.model_dump(mode="json"), indent=True))
         elif output_format == "summary":
             print(f"Scan Results for {result.sbom.project_name}")
             print(f"Total packages: {result.sbom.total_packages}")
@@ -488,4 +547,4 @@ def main(project_path: str = ".", output_format: str = "json"):
         
         return result
     
-    return asyncio.run(run_scan())
+    return aio.run(run_scan())
@@ -2,9 +2,12 @@
 Data models for SBOM, dependencies, and vulnerabilities.
 """
 
+import sys
+from array import array
 from datetime import datetime
-from typing import Dict, List, Optional, Set, Any
-from pydantic import BaseModel, Field
+from functools import cached_property
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Any
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, field_validator
 from enum import Enum
 
 class SeverityLevel(Enum):
@@ -16,6 +19,9 @@ class SeverityLevel(Enum):
     INFO = "info"
     UNKNOWN = "unknown"
 
+# Compact integer codes used by the ScanResult severity index
+SEVERITY_CODES = {severity: code for code, severity in enumerate(SeverityLevel)}
+
 class DependencyType(Enum):
     """Types of dependencies."""
     DIRECT = "direct"
@@ -33,6 +39,9 @@ class RiskLevel(Enum):
 
 class Package(BaseModel):
     """Represents a software package."""
+    # Immutable so parsers can share instances across manifests
+    model_config = ConfigDict(frozen=True)
+    
     name: str
     version: str
     language: str
@@ -45,14 +54,35 @@ class Package(BaseModel):
     author: Optional[str] = None
     checksum: Optional[str] = None
     
-    @property
+    # No private attributes or model_post_init: either makes pydantic run
+    # extra Python code for every instance, roughly doubling construction
+    # time for the thousands of packages in a large lockfile
+    
+    @field_validator("language", "package_manager")
+    @classmethod
+    def _intern_identifier(cls, value: str) -> str:
+        """Intern repeated identifiers so packages share one string."""
+        return sys.intern(value)
+    
+    @cached_property
     def purl(self) -> str:
-        """Generate Package URL (PURL) for this package."""
+        """Package URL (PURL) for this package."""
+        # Packages are frozen, so the PURL is built on first access only
         namespace_part = f"{self.namespace}/" if self.namespace else ""
         return f"pkg:{self.package_manager}/{namespace_part}{self.name}@{self.version}"
+    
+    def model_copy(self, *, update: Optional[Dict[str, Any]] = None, deep: bool = False) -> "Package":
+        """Copy the package, dropping the cached PURL when fields change."""
+        copy = super().model_copy(update=update, deep=deep)
+        if update:
+            # model_copy carries __dict__ over, cached_property values included
+            copy.__dict__.pop("purl", None)
+        return copy
 
 class Dependency(BaseModel):
     """Represents a dependency relationship."""
+    model_config = ConfigDict(frozen=True)
+    
     package: Package
     dependency_type: DependencyType
     scope: Optional[str] = None  # e.g., "runtime", "test", "build"
@@ -131,6 +161,72 @@ class SBOM(BaseModel):
     languages: Set[str] = Field(default_factory=set)
     package_managers: Set[str] = Field(default_factory=set)
     
+    # Field assignments since creation, and the last cached_dump() result
+    # with the state it was taken in
+    _revision: int = PrivateAttr(default=0)
+    _dump_cache: Optional[Tuple[Tuple[int, ...], Dict[str, Any]]] = PrivateAttr(default=None)
+    
+    def __eq__(self, other: Any) -> bool:
+        # Private bookkeeping is derived data, so only fields are compared
+        if not isinstance(other, SBOM):
+            return NotImplemented
+        return type(self) is type(other) and self.__dict__ == other.__dict__
+    
+    def __setattr__(self, name: str, value: Any):
+        super().__setattr__(name, value)
+        if name in SBOM.model_fields:
+            self.__pydantic_private__["_revision"] += 1
+    
+    def cached_dump(self) -> Dict[str, Any]:
+        """Get ``model_dump(exclude_none=True)`` of this SBOM, reusing the previous dump if unchanged.
+        
+        Unset optional fields are left out; every one of them defaults to
+        None, so ``from_trusted_dict`` restores them on the other side.
+        
+        The SBOM counts as unchanged while no field has been assigned and its
+        collections kept their sizes; packages and dependencies are frozen, so
+        appends are the only other way its contents change. ``model_copy``
+        carries the cache along, so the key also includes ``id(self)``. The
+        returned dict is shared between calls and must not be modified.
+        """
+        key = (
+            id(self), self._revision, len(self.packages), len(self.dependencies),
+            len(self.languages), len(self.package_managers),
+        )
+        cached = self._dump_cache
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        data = self.model_dump(exclude_none=True)
+        self._dump_cache = (key, data)
+        return data
+
+    @classmethod
+    def from_trusted_dict(cls, data: Dict[str, Any]) -> "SBOM":
+        """Recreate an SBOM from the output of ``model_dump()``.
+
+        Every package of a dumped SBOM appears twice, once in ``packages`` and
+        once inside its dependency, so packages are validated once and the
+        dependencies share those instances, as they did before dumping.
+        """
+        sbom = cls.model_validate({**data, "dependencies": []})
+        by_key = {
+            (package.package_manager, package.namespace, package.name, package.version): package
+            for package in sbom.packages
+        }
+
+        dependencies = []
+        for dependency_data in data.get("dependencies", ()):
+            package_data = dependency_data["package"]
+            package = by_key.get((
+                package_data["package_manager"], package_data.get("namespace"),
+                package_data["name"], package_data["version"],
+            ))
+            if package is not None:
+                dependency_data = {**dependency_data, "package": package}
+            dependencies.append(Dependency.model_validate(dependency_data))
+        sbom.dependencies = dependencies
+        return sbom
+
     def add_package(self, package: Package, dependency: Dependency):
         """Add a package and its dependency relationship to the SBOM."""
         # Check if package already exists
@@ -146,6 +242,31 @@ class SBOM(BaseModel):
         # Update statistics
         self._update_statistics()
     
+    def add_packages_bulk(self, pairs: Iterable[Tuple[Package, Dependency]]):
+        """Add many packages and their dependency relationships at once.
+        
+        Equivalent to calling ``add_package`` for each pair, but existing
+        PURLs are collected into a set once and statistics are updated once
+        at the end instead of per package.
+        """
+        packages = self.packages
+        dependencies = self.dependencies
+        known_purls = {package.purl for package in packages}
+        add_language = self.languages.add
+        add_package_manager = self.package_managers.add
+        
+        for package, dependency in pairs:
+            purl = package.purl
+            if purl not in known_purls:
+                known_purls.add(purl)
+                packages.append(package)
+                add_language(package.language)
+                add_package_manager(package.package_manager)
+            
+            dependencies.append(dependency)
+        
+        self._update_statistics()
+    
     def get_package_by_purl(self, purl: str) -> Optional[Package]:
         """Get package by its PURL."""
         for package in self.packages:
@@ -196,6 +317,27 @@ class ScanResult(BaseModel):
     # Supply chain intelligence (optional)
     supply_chain_intelligence: Optional[List[Dict[str, Any]]] = None
     
+    # Flat vulnerability index: parallel arrays of vulnerabilities and their
+    # severity codes, covering the first ``_indexed_risks`` entries of ``risks``
+    _vulns: List[Vulnerability] = PrivateAttr(default_factory=list)
+    _vuln_severity: array = PrivateAttr(default_factory=lambda: array("B"))
+    _indexed_risks: int = PrivateAttr(default=0)
+    _indexed_list: Optional[List[PackageRisk]] = PrivateAttr(default=None)
+    
+    def __eq__(self, other: Any) -> bool:
+        # The vulnerability index is derived data, so only fields are compared
+        if not isinstance(other, ScanResult):
+            return NotImplemented
+        return type(self) is type(other) and self.__dict__ == other.__dict__
+
+    @classmethod
+    def from_trusted_dict(cls, data: Dict[str, Any]) -> "ScanResult":
+        """Recreate a scan result from the output of ``model_dump()``.
+
+        The nested SBOM goes through ``SBOM.from_trusted_dict``.
+        """
+        return cls.model_validate({**data, "sbom": SBOM.from_trusted_dict(data["sbom"])})
+
     def add_package_risk(self, risk: PackageRisk):
         """Add a package risk assessment."""
         self.risks.append(risk)
@@ -208,23 +350,39 @@ class ScanResult(BaseModel):
     
     def get_vulnerabilities_by_severity(self, severity: SeverityLevel) -> List[Vulnerability]:
         """Get all vulnerabilities of a specific severity."""
-        vulnerabilities = []
-        for risk in self.risks:
-            vulnerabilities.extend([v for v in risk.vulnerabilities if v.severity == severity])
-        return vulnerabilities
+        self._sync_vulnerability_index()
+        code = SEVERITY_CODES[severity]
+        vulns = self._vulns
+        return [vulns[i] for i, s in enumerate(self._vuln_severity) if s == code]
+    
+    def _sync_vulnerability_index(self):
+        """Index vulnerabilities of risks added since the last sync."""
+        if self._indexed_list is not self.risks or self._indexed_risks > len(self.risks):
+            # risks was replaced or truncated; rebuild from scratch
+            self._vulns = []
+            self._vuln_severity = array("B")
+            self._indexed_risks = 0
+            self._indexed_list = self.risks
+        
+        vulns = self._vulns
+        severities = self._vuln_severity
+        for risk in self.risks[self._indexed_risks:]:
+            for vuln in risk.vulnerabilities:
+                vulns.append(vuln)
+                severities.append(SEVERITY_CODES[vuln.severity])
+        self._indexed_risks = len(self.risks)
     
     def _update_risk_statistics(self):
         """Update risk and vulnerability statistics."""
         # Count vulnerabilities by severity
-        all_vulnerabilities = []
-        for risk in self.risks:
-            all_vulnerabilities.extend(risk.vulnerabilities)
+        self._sync_vulnerability_index()
+        severities = self._vuln_severity
         
-        self.total_vulnerabilities = len(all_vulnerabilities)
-        self.critical_vulnerabilities = len([v for v in all_vulnerabilities if v.severity == SeverityLevel.CRITICAL])
-        self.high_vulnerabilities = len([v for v in all_vulnerabilities if v.severity == SeverityLevel.HIGH])
-        self.medium_vulnerabilities = len([v for v in all_vulnerabilities if v.severity == SeverityLevel.MEDIUM])
-        self.low_vulnerabilities = len([v for v in all_vulnerabilities if v.severity == SeverityLevel.LOW])
+        self.total_vulnerabilities = len(severities)
+        self.critical_vulnerabilities = severities.count(SEVERITY_CODES[SeverityLevel.CRITICAL])
+        self.high_vulnerabilities = severities.count(SEVERITY_CODES[SeverityLevel.HIGH])
+        self.medium_vulnerabilities = severities.count(SEVERITY_CODES[SeverityLevel.MEDIUM])
+        self.low_vulnerabilities = severities.count(SEVERITY_CODES[SeverityLevel.LOW])
         
         # Count packages by risk level
         self.critical_risk_packages = len([r for r in self.risks if r.overall_risk == RiskLevel.CRITICAL])
@@ -2,12 +2,71 @@
 Base parser class for manifest file parsing.
 """
 
+import os
+import stat
+import threading
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any, Tuple
 from ..models import Package, Dependency, DependencyType
 from ..detectors import Language, PackageManager
 
+# Read buffer for parsers that stream large manifests line by line
+STREAM_BUFFER_SIZE = 128 * 1024
+
+
+@lru_cache(maxsize=8192)
+def _normalize_version_impl(version: str) -> str:
+    """Cached implementation of ``BaseParser._normalize_version``."""
+    # Remove common prefixes
+    version = version.lstrip('^~>=<!')
+    
+    # Remove git commit hashes and URLs
+    if version.startswith('git+') or '#' in version:
+        return "latest"
+    
+    # Handle version ranges (take the minimum version)
+    if ' - ' in version:
+        version = version.split(' - ')[0]
+    
+    return version.strip()
+
+
+# Length of the leading comparison operator in a version constraint
+_OP_LEN = {">=": 2, "<=": 2, "!=": 2, "^": 1, "~": 1, ">": 1, "<": 1, "=": 1}
+
+
+@lru_cache(maxsize=8192)
+def _parse_constraint_impl(constraint: str) -> str:
+    """Cached implementation of ``BaseParser._parse_version_constraint``."""
+    n = _OP_LEN.get(constraint[:2]) or _OP_LEN.get(constraint[:1], 0)
+    return constraint[n:]
+
+
+@lru_cache(maxsize=65536)
+def _build_package(name: str, version: str, language: str, package_manager: str,
+                   metadata: Tuple[Tuple[str, Any], ...]) -> Package:
+    """Build a Package; packages are frozen, so cached instances are shared."""
+    return Package(
+        name=name,
+        version=version,
+        language=language,
+        package_manager=package_manager,
+        **dict(metadata)
+    )
+
+
+# Parse results shared by every parser in the process, keyed by parser class,
+# package manager, kind, path, mtime and size; oldest entries are evicted first
+_PARSE_CACHE_SIZE = 4096
+_parse_cache: Dict[Tuple[Any, ...], List[Dependency]] = {}
+# Striped locks so concurrent requests for the same file parse it only once
+_parse_locks = [threading.Lock() for _ in range(64)]
+# Guards inserts and evictions, which every stripe makes on the shared dict
+_parse_cache_lock = threading.Lock()
+
+
 class BaseParser(ABC):
     """Abstract base class for manifest parsers."""
     
@@ -66,15 +125,12 @@ class BaseParser(ABC):
             **kwargs: Additional package metadata
             
         Returns:
-            Package instance
+            Package instance, shared with earlier calls for the same package
+            across all parsers
         """
-        return Package(
-            name=name,
-            version=version,
-            language=self.language.value,
-            package_manager=self.package_manager.value,
-            **kwargs
-        )
+        # Metadata is part of the key, so differing metadata is never merged
+        metadata = tuple(sorted(kwargs.items())) if kwargs else ()
+        return _build_package(name, version, self.language.value, self.package_manager.value, metadata)
     
     def create_dependency(self, package: Package, dependency_type: DependencyType = DependencyType.DIRECT, **kwargs) -> Dependency:
         """Create a Dependency instance.
@@ -93,9 +149,49 @@ class BaseParser(ABC):
             **kwargs
         )
     
+    def _cached_parse(self, kind: str, file_path: Path,
+                      parse: Callable[[Path], List[Dependency]]) -> List[Dependency]:
+        """Parse a file, reusing the previous result if the file is unchanged.
+        
+        Files are identified by path, modification time and size, so repeated
+        scans of the same tree, by this or any other generator in the process,
+        skip re-reading and re-parsing. Concurrent calls for the same file wait
+        for the first parse instead of repeating it.
+        
+        Args:
+            kind: Cache namespace, e.g. "manifest" or "lockfile"
+            file_path: Path to file
+            parse: Synchronous parse function to call on a miss
+            
+        Returns:
+            A new list of dependencies the caller may modify
+        """
+        try:
+            file_stat = file_path.stat()
+        except OSError:
+            return parse(file_path)
+        
+        key = (type(self), self.package_manager, kind, file_path,
+               file_stat.st_mtime_ns, file_stat.st_size)
+        dependencies = _parse_cache.get(key)
+        if dependencies is None:
+            with _parse_locks[hash(key) % len(_parse_locks)]:
+                dependencies = _parse_cache.get(key)
+                if dependencies is None:
+                    dependencies = parse(file_path)
+                    with _parse_cache_lock:
+                        if len(_parse_cache) >= _PARSE_CACHE_SIZE:
+                            _parse_cache.pop(next(iter(_parse_cache)), None)
+                        _parse_cache[key] = dependencies
+        return list(dependencies)
+    
     def _read_file(self, file_path: Path) -> str:
         """Read file contents safely.
         
+        The file is read once into a buffer sized from its metadata and decoded
+        as UTF-8, falling back to latin-1 (which accepts any byte sequence)
+        without re-reading.
+        
         Args:
             file_path: Path to file
             
@@ -106,16 +202,28 @@ class BaseParser(ABC):
             FileNotFoundError: If file doesn't exist
             IOError: If file can't be read
         """
+        with open(file_path, 'rb', buffering=0) as f:
+            size = os.fstat(f.fileno()).st_size
+            buf = bytearray(size)
+            view = memoryview(buf)
+            read = 0
+            while read < size:
+                n = f.readinto(view[read:])
+                if not n:
+                    break
+                read += n
+            view.release()
+        del buf[read:]
+        
         try:
-            return file_path.read_text(encoding='utf-8')
+            text = buf.decode('utf-8')
         except UnicodeDecodeError:
-            # Try with different encodings
-            for encoding in ['latin-1', 'cp1252']:
-                try:
-                    return file_path.read_text(encoding=encoding)
-                except UnicodeDecodeError:
-                    continue
-            raise IOError(f"Could not decode file {file_path}")
+            text = buf.decode('latin-1')
+        
+        # Match text-mode reads: universal newlines
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text
     
     def _normalize_version(self, version: str) -> str:
         """Normalize version string by removing prefixes and suffixes.
@@ -126,18 +234,7 @@ class BaseParser(ABC):
         Returns:
             Normalized version string
         """
-        # Remove common prefixes
-        version = version.lstrip('^~>=<!')
-        
-        # Remove git commit hashes and URLs
-        if version.startswith('git+') or '#' in version:
-            return "latest"
-        
-        # Handle version ranges (take the minimum version)
-        if ' - ' in version:
-            version = version.split(' - ')[0]
-        
-        return version.strip()
+        return _normalize_version_impl(version)
     
     def _parse_version_constraint(self, constraint: str) -> str:
         """Parse version constraint and extract the actual version.
@@ -148,23 +245,7 @@ class BaseParser(ABC):
         Returns:
             Extracted version string
         """
-        # Handle npm-style constraints
-        if constraint.startswith('^'):
-            return constraint[1:]
-        elif constraint.startswith('~'):
-            return constraint[1:]
-        elif constraint.startswith('>='):
-            return constraint[2:]
-        elif constraint.startswith('>'):
-            return constraint[1:]
-        elif constraint.startswith('<='):
-            return constraint[2:]
-        elif constraint.startswith('<'):
-            return constraint[1:]
-        elif constraint.startswith('='):
-            return constraint[1:]
-        
-        return constraint
+        return _parse_constraint_impl(constraint)
     
     async def can_parse(self, file_path: Path) -> bool:
         """Check if this parser can handle the given file.
@@ -175,4 +256,7 @@ class BaseParser(ABC):
         Returns:
             True if parser can handle this file
         """
-        return file_path.exists() and file_path.is_file()
+        try:
+            return stat.S_ISREG(file_path.stat().st_mode)
+        except (OSError, ValueError):
+            return False
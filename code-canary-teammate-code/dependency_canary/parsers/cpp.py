@@ -3,14 +3,27 @@ C/C++ manifest parser for vcpkg and conan projects.
 """
 
 from pathlib import Path
-import json
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import asyncio
 
+from loguru import logger
+
 from .base import BaseParser
 from ..detectors import Language, PackageManager
 from ..models import Dependency, DependencyType, Package
+from ..serialization import json_iter_items, json_loads
+
+# conanfile.py: self.requires("pkg/version") (group 1) or
+# requires = ["pkg1/version", "pkg2/version"] (group 2), in one pass;
+# build_requires/tool_requires lists are build tools, not dependencies
+_RE_CONANPY_REQUIRES = re.compile(
+    r'self\.requires\([\'"]([^\'"]+)[\'"]\)|(?<!\w)requires\s*=\s*\[(.*?)\]', re.DOTALL
+)
+_RE_ITEM = re.compile(r'[\'"]([^\'"]+)[\'"]')
+# Conan reference: name/version[@user/channel], where the version may be a
+# bracketed range such as [>=1.2 <2]
+_CONAN_REF = re.compile(r'([^/\s]+)/(\[[^\]]*\]|[^@/\s]+)')
 
 class CppParser(BaseParser):
     """Parser for C/C++ projects using vcpkg or conan."""
@@ -22,40 +35,92 @@ class CppParser(BaseParser):
             package_manager: C/C++ package manager (vcpkg or conan)
         """
         super().__init__(Language.CPP, package_manager)
+        # Format-specific parsers keyed by file name
+        self._manifest_dispatch = {
+            "vcpkg.json": self._parse_vcpkg_json_sync,
+            "conanfile.txt": self._parse_conanfile_txt_sync,
+            "conanfile.py": self._parse_conanfile_py_sync,
+        }
+        self._lockfile_dispatch = {
+            "vcpkg-configuration.json": self._parse_vcpkg_configuration_sync,
+            "conan.lock": self._parse_conan_lock_sync,
+        }
     
     async def parse_manifest(self, manifest_path: Path) -> List[Dependency]:
         """Parse a vcpkg.json or conanfile.txt file.
         
+        The file is parsed in a worker thread so that many manifests can be
+        parsed concurrently; use ``parse_manifest_sync`` outside an event loop.
+        
+        Args:
+            manifest_path: Path to manifest file
+            
+        Returns:
+            List of direct dependencies
+        """
+        return await asyncio.to_thread(self.parse_manifest_sync, manifest_path)
+    
+    def parse_manifest_sync(self, manifest_path: Path) -> List[Dependency]:
+        """Parse a vcpkg.json or conanfile.txt file.
+        
         Args:
             manifest_path: Path to manifest file
             
         Returns:
             List of direct dependencies
         """
-        if manifest_path.name == "vcpkg.json":
-            return await self._parse_vcpkg_json(manifest_path)
-        elif manifest_path.name == "conanfile.txt":
-            return await self._parse_conanfile_txt(manifest_path)
-        elif manifest_path.name == "conanfile.py":
-            return await self._parse_conanfile_py(manifest_path)
-        else:
-            return []
+        return self._cached_parse("manifest", manifest_path, self._parse_manifest_file)
+    
+    def _parse_manifest_file(self, manifest_path: Path) -> List[Dependency]:
+        """Dispatch a manifest to its format-specific parser."""
+        parse = self._manifest_dispatch.get(manifest_path.name)
+        return parse(manifest_path) if parse else []
     
     async def parse_lockfile(self, lockfile_path: Path) -> List[Dependency]:
         """Parse a lockfile.
         
+        The file is parsed in a worker thread; use ``parse_lockfile_sync``
+        outside an event loop.
+        
         Args:
             lockfile_path: Path to lockfile
             
         Returns:
             List of all dependencies (direct and transitive)
         """
-        if lockfile_path.name == "vcpkg-configuration.json":
-            return await self._parse_vcpkg_configuration(lockfile_path)
-        elif lockfile_path.name == "conan.lock":
-            return await self._parse_conan_lock(lockfile_path)
-        else:
-            return []
+        return await asyncio.to_thread(self.parse_lockfile_sync, lockfile_path)
+    
+    def parse_lockfile_sync(self, lockfile_path: Path) -> List[Dependency]:
+        """Parse a lockfile.
+        
+        Args:
+            lockfile_path: Path to lockfile
+            
+        Returns:
+            List of all dependencies (direct and transitive)
+        """
+        return self._cached_parse("lockfile", lockfile_path, self._parse_lockfile_file)
+    
+    def _parse_lockfile_file(self, lockfile_path: Path) -> List[Dependency]:
+        """Dispatch a lockfile to its format-specific parser."""
+        parse = self._lockfile_dispatch.get(lockfile_path.name)
+        return parse(lockfile_path) if parse else []
+    
+    async def can_parse(self, file_path: Path) -> bool:
+        """Check if this parser can handle the given file.
+        
+        Unrecognized file names are rejected without touching the filesystem.
+        
+        Args:
+            file_path: Path to file to check
+            
+        Returns:
+            True if parser can handle this file
+        """
+        name = file_path.name
+        if name not in self._manifest_dispatch and name not in self._lockfile_dispatch:
+            return False
+        return await super().can_parse(file_path)
     
     async def resolve_transitive_dependencies(self, dependencies: List[Dependency]) -> List[Dependency]:
         """Resolve transitive dependencies.
@@ -74,7 +139,7 @@ class CppParser(BaseParser):
         # to get the full dependency graph
         return dependencies
     
-    async def _parse_vcpkg_json(self, manifest_path: Path) -> List[Dependency]:
+    def _parse_vcpkg_json_sync(self, manifest_path: Path) -> List[Dependency]:
         """Parse a vcpkg.json file.
         
         Args:
@@ -86,8 +151,7 @@ class CppParser(BaseParser):
         dependencies = []
         
         try:
-            content = self._read_file(manifest_path)
-            data = json.loads(content)
+            data = json_loads(manifest_path.read_bytes())
             
             # Extract package metadata
             package_name = data.get("name", "")
@@ -95,6 +159,7 @@ class CppParser(BaseParser):
             
             # Process dependencies
             deps = data.get("dependencies", [])
+            append = dependencies.append
             for dep in deps:
                 if isinstance(dep, str):
                     # Simple dependency "name"
@@ -104,24 +169,18 @@ class CppParser(BaseParser):
                     # Complex dependency {"name": "libname", "version>=": "1.0.0"}
                     name = dep.get("name", "")
                     # Combine all version constraints
-                    version = ""
-                    for key, value in dep.items():
-                        if "version" in key and key != "name":
-                            version += f"{key.replace('version', '')}{value} "
-                    version = version.strip()
+                    version = " ".join(
+                        f"{key[len('version'):]}{value}"
+                        for key, value in dep.items()
+                        if key.startswith("version")
+                    )
                 else:
                     continue
                 
                 if name:
-                    package = self.create_package(
-                        name=name,
-                        version=version,
-                        description="",
-                        homepage="",
-                        repository_url=""
-                    )
+                    package = self.create_package(name=name, version=version)
                     
-                    dependencies.append(self.create_dependency(
+                    append(self.create_dependency(
                         package=package,
                         dependency_type=DependencyType.DIRECT,
                         constraint=version
@@ -129,11 +188,11 @@ class CppParser(BaseParser):
                     
         except Exception as e:
             # Log error
-            print(f"Error parsing vcpkg.json file {manifest_path}: {e}")
+            logger.warning("Error parsing vcpkg.json file {}: {}", manifest_path, e)
             
         return dependencies
     
-    async def _parse_conanfile_txt(self, manifest_path: Path) -> List[Dependency]:
+    def _parse_conanfile_txt_sync(self, manifest_path: Path) -> List[Dependency]:
         """Parse a conanfile.txt file.
         
         Args:
@@ -147,44 +206,30 @@ class CppParser(BaseParser):
         try:
             content = self._read_file(manifest_path)
             
-            # Find [requires] section
-            requires_match = re.search(r"\[requires\](.*?)(?:\[|\Z)", content, re.DOTALL)
-            if requires_match:
-                requires_section = requires_match.group(1)
-                
-                # Process each requirement line
-                for line in requires_section.strip().split("\n"):
-                    line = line.strip()
-                    if not line or line.startswith("#"):
-                        continue
-                        
-                    # Parse requirement (e.g., "zlib/1.2.11")
-                    parts = line.split("/")
-                    if len(parts) >= 2:
-                        name = parts[0]
-                        version = parts[1].split("@")[0] if "@" in parts[1] else parts[1]
-                        
-                        package = self.create_package(
-                            name=name,
-                            version=version,
-                            description="",
-                            homepage="",
-                            repository_url=""
-                        )
-                        
-                        dependencies.append(self.create_dependency(
-                            package=package,
-                            dependency_type=DependencyType.DIRECT,
-                            constraint=version
-                        ))
+            # Walk the file once, tracking whether we are in the [requires] section
+            in_requires = False
+            for line in content.splitlines():
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                if line.startswith("["):
+                    in_requires = line == "[requires]"
+                    continue
+                if not in_requires:
+                    continue
+                    
+                # Parse requirement (e.g., "zlib/1.2.11")
+                dependency = self._conan_reference_dependency(line, DependencyType.DIRECT)
+                if dependency:
+                    dependencies.append(dependency)
                         
         except Exception as e:
             # Log error
-            print(f"Error parsing conanfile.txt {manifest_path}: {e}")
+            logger.warning("Error parsing conanfile.txt {}: {}", manifest_path, e)
             
         return dependencies
     
-    async def _parse_conanfile_py(self, manifest_path: Path) -> List[Dependency]:
+    def _parse_conanfile_py_sync(self, manifest_path: Path) -> List[Dependency]:
         """Parse a conanfile.py file.
         
         Note: Proper parsing would require Python AST parsing or execution.
@@ -201,68 +246,22 @@ class CppParser(BaseParser):
         try:
             content = self._read_file(manifest_path)
             
-            # Extract requires using regex
-            # Look for requires = ["pkg1/version", "pkg2/version"]
-            # or self.requires("pkg/version")
-            requires_list_pattern = r'requires\s*=\s*\[(.*?)\]'
-            requires_method_pattern = r'self\.requires\([\'"]([^\'"]+)[\'"]\)'
-            
-            # Process requires list
-            requires_list_match = re.search(requires_list_pattern, content, re.DOTALL)
-            if requires_list_match:
-                requires_items = requires_list_match.group(1)
-                # Extract items from the list
-                item_pattern = r'[\'"]([^\'"]+)[\'"](,|$)'
-                for match in re.finditer(item_pattern, requires_items):
-                    requirement = match.group(1)
-                    parts = requirement.split("/")
-                    if len(parts) >= 2:
-                        name = parts[0]
-                        version = parts[1].split("@")[0] if "@" in parts[1] else parts[1]
-                        
-                        package = self.create_package(
-                            name=name,
-                            version=version,
-                            description="",
-                            homepage="",
-                            repository_url=""
-                        )
-                        
-                        dependencies.append(self.create_dependency(
-                            package=package,
-                            dependency_type=DependencyType.DIRECT,
-                            constraint=version
-                        ))
-            
-            # Process requires method calls
-            for match in re.finditer(requires_method_pattern, content):
-                requirement = match.group(1)
-                parts = requirement.split("/")
-                if len(parts) >= 2:
-                    name = parts[0]
-                    version = parts[1].split("@")[0] if "@" in parts[1] else parts[1]
-                    
-                    package = self.create_package(
-                        name=name,
-                        version=version,
-                        description="",
-                        homepage="",
-                        repository_url=""
-                    )
-                    
-                    dependencies.append(self.create_dependency(
-                        package=package,
-                        dependency_type=DependencyType.DIRECT,
-                        constraint=version
-                    ))
+            # Process requires method calls and requires lists in document order
+            for match in _RE_CONANPY_REQUIRES.finditer(content):
+                method_ref, requires_items = match.groups()
+                refs = [method_ref] if method_ref else _RE_ITEM.findall(requires_items)
+                for ref in refs:
+                    dependency = self._conan_reference_dependency(ref, DependencyType.DIRECT)
+                    if dependency:
+                        dependencies.append(dependency)
                     
         except Exception as e:
             # Log error
-            print(f"Error parsing conanfile.py {manifest_path}: {e}")
+            logger.warning("Error parsing conanfile.py {}: {}", manifest_path, e)
             
         return dependencies
     
-    async def _parse_vcpkg_configuration(self, lockfile_path: Path) -> List[Dependency]:
+    def _parse_vcpkg_configuration_sync(self, lockfile_path: Path) -> List[Dependency]:
         """Parse a vcpkg-configuration.json file.
         
         Args:
@@ -275,7 +274,7 @@ class CppParser(BaseParser):
         # It contains registry information, so we return an empty list for now
         return []
     
-    async def _parse_conan_lock(self, lockfile_path: Path) -> List[Dependency]:
+    def _parse_conan_lock_sync(self, lockfile_path: Path) -> List[Dependency]:
         """Parse a conan.lock file.
         
         Args:
@@ -287,43 +286,42 @@ class CppParser(BaseParser):
         dependencies = []
         
         try:
-            content = self._read_file(lockfile_path)
-            data = json.loads(content)
-            
-            # Extract graph nodes from lock file
-            nodes = data.get("graph_lock", {}).get("nodes", {})
+            # Extract graph nodes from lock file, skipping the root node (usually node 0).
+            # Lockfiles contain both direct and transitive dependencies, so
+            # TRANSITIVE is the conservative assumption.
+            dependencies = [
+                dependency
+                for node_id, node in json_iter_items(lockfile_path, "graph_lock.nodes")
+                if node_id != "0"
+                and (dependency := self._conan_reference_dependency(node.get("ref", ""), DependencyType.TRANSITIVE))
+            ]
             
-            for node_id, node in nodes.items():
-                # Skip the root node (usually node 0)
-                if node_id == "0":
-                    continue
-                    
-                # Get package reference
-                ref = node.get("ref", "")
-                if ref:
-                    # Format is typically name/version@user/channel
-                    parts = ref.split("/")
-                    if len(parts) >= 2:
-                        name = parts[0]
-                        version = parts[1].split("@")[0] if "@" in parts[1] else parts[1]
-                        
-                        package = self.create_package(
-                            name=name,
-                            version=version,
-                            description="",
-                            homepage="",
-                            repository_url=""
-                        )
-                        
-                        # Lockfiles contain both direct and transitive dependencies
-                        dependencies.append(self.create_dependency(
-                            package=package,
-                            dependency_type=DependencyType.TRANSITIVE,  # Conservative assumption
-                            constraint=version
-                        ))
-                        
         except Exception as e:
             # Log error
-            print(f"Error parsing conan.lock file {lockfile_path}: {e}")
+            logger.warning("Error parsing conan.lock file {}: {}", lockfile_path, e)
             
         return dependencies
+    
+    def _conan_reference_dependency(self, ref: str, dependency_type: DependencyType) -> Optional[Dependency]:
+        """Build a dependency from a Conan package reference.
+        
+        Args:
+            ref: Package reference, typically name/version@user/channel
+            dependency_type: Type of dependency
+            
+        Returns:
+            Dependency, or None if the reference has no version
+        """
+        match = _CONAN_REF.match(ref)
+        if not match:
+            return None
+        
+        name, version = match.group(1), match.group(2)
+        
+        package = self.create_package(name=name, version=version)
+        
+        return self.create_dependency(
+            package=package,
+            dependency_type=dependency_type,
+            constraint=version
+        )
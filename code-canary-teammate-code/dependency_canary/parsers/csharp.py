@@ -3,15 +3,76 @@ C# manifest parser for NuGet projects.
 """
 
 from pathlib import Path
-import re
-import xml.etree.ElementTree as ET
-import json
-from typing import List, Dict, Any
+import xml.sax
+from typing import List, Dict, Any, Optional
 import asyncio
 
+from loguru import logger
+
 from .base import BaseParser
 from ..detectors import Language, PackageManager
 from ..models import Dependency, DependencyType, Package
+from ..serialization import json_iter_items
+
+
+def _local_name(qname: str) -> str:
+    """Strip the namespace prefix from a qualified element name."""
+    return qname.rpartition(":")[2]
+
+
+class _PackageElementHandler(xml.sax.ContentHandler):
+    """SAX handler collecting the attributes of package elements.
+    
+    Only elements with the requested local name are recorded, so no tree is
+    built. A nested ``<Version>`` element is folded into the ``Version``
+    attribute when the attribute itself is missing.
+    """
+    
+    def __init__(self, name: str):
+        super().__init__()
+        self.name = name
+        self.items: List[Dict[str, str]] = []
+        self._current: Optional[Dict[str, str]] = None
+        self._version_text: Optional[List[str]] = None
+    
+    def startElement(self, qname: str, attrs: Any) -> None:
+        local = _local_name(qname)
+        if local == self.name:
+            self._current = dict(attrs)
+            self.items.append(self._current)
+        elif local == "Version" and self._current is not None and not self._current.get("Version"):
+            self._version_text = []
+    
+    def characters(self, content: str) -> None:
+        if self._version_text is not None:
+            self._version_text.append(content)
+    
+    def endElement(self, qname: str) -> None:
+        local = _local_name(qname)
+        if local == "Version" and self._version_text is not None:
+            self._current["Version"] = "".join(self._version_text).strip()
+            self._version_text = None
+        elif local == self.name:
+            self._current = None
+
+
+def _collect_package_elements(xml_path: Path, name: str) -> List[Dict[str, str]]:
+    """Collect the attributes of every element with the given local name.
+    
+    Elements match with or without a namespace prefix, so both SDK-style and
+    legacy MSBuild project files are handled in one pass.
+    
+    Args:
+        xml_path: Path to XML file
+        name: Local element name, e.g. "PackageReference"
+        
+    Returns:
+        Attribute dictionaries in document order
+    """
+    handler = _PackageElementHandler(name)
+    xml.sax.parse(str(xml_path), handler)
+    return handler.items
+
 
 class CSharpParser(BaseParser):
     """Parser for C# NuGet projects."""
@@ -19,38 +80,96 @@ class CSharpParser(BaseParser):
     def __init__(self):
         """Initialize C# parser."""
         super().__init__(Language.CSHARP, PackageManager.NUGET)
+        # Format-specific parsers keyed by file name, then by suffix
+        self._name_dispatch = {
+            "packages.config": self._parse_packages_config_sync,
+            "Directory.Build.props": self._parse_directory_build_props_sync,
+        }
+        self._suffix_dispatch = {
+            ".csproj": self._parse_project_file_sync,
+            ".vbproj": self._parse_project_file_sync,
+        }
+        self._lockfile_dispatch = {
+            "packages.lock.json": self._parse_packages_lock_json_sync,
+        }
     
     async def parse_manifest(self, manifest_path: Path) -> List[Dependency]:
         """Parse a C# project file or packages.config file.
         
+        The file is parsed in a worker thread so that many manifests can be
+        parsed concurrently; use ``parse_manifest_sync`` outside an event loop.
+        
+        Args:
+            manifest_path: Path to manifest file
+            
+        Returns:
+            List of direct dependencies
+        """
+        return await asyncio.to_thread(self.parse_manifest_sync, manifest_path)
+    
+    def parse_manifest_sync(self, manifest_path: Path) -> List[Dependency]:
+        """Parse a C# project file or packages.config file.
+        
         Args:
             manifest_path: Path to .csproj, .vbproj, packages.config, or Directory.Build.props file
             
         Returns:
             List of direct dependencies
         """
-        if manifest_path.name.endswith(".csproj") or manifest_path.name.endswith(".vbproj"):
-            return await self._parse_project_file(manifest_path)
-        elif manifest_path.name == "packages.config":
-            return await self._parse_packages_config(manifest_path)
-        elif manifest_path.name == "Directory.Build.props":
-            return await self._parse_directory_build_props(manifest_path)
-        else:
-            return []
+        return self._cached_parse("manifest", manifest_path, self._parse_manifest_file)
+    
+    def _parse_manifest_file(self, manifest_path: Path) -> List[Dependency]:
+        """Dispatch a manifest to its format-specific parser."""
+        parse = self._name_dispatch.get(manifest_path.name) or self._suffix_dispatch.get(manifest_path.suffix)
+        return parse(manifest_path) if parse else []
     
     async def parse_lockfile(self, lockfile_path: Path) -> List[Dependency]:
         """Parse a packages.lock.json file.
         
+        The file is parsed in a worker thread; use ``parse_lockfile_sync``
+        outside an event loop.
+        
+        Args:
+            lockfile_path: Path to lockfile
+            
+        Returns:
+            List of all dependencies (direct and transitive)
+        """
+        return await asyncio.to_thread(self.parse_lockfile_sync, lockfile_path)
+    
+    def parse_lockfile_sync(self, lockfile_path: Path) -> List[Dependency]:
+        """Parse a packages.lock.json file.
+        
         Args:
             lockfile_path: Path to packages.lock.json file
             
         Returns:
             List of all dependencies (direct and transitive)
         """
-        if lockfile_path.name == "packages.lock.json":
-            return await self._parse_packages_lock_json(lockfile_path)
-        else:
-            return []
+        return self._cached_parse("lockfile", lockfile_path, self._parse_lockfile_file)
+    
+    def _parse_lockfile_file(self, lockfile_path: Path) -> List[Dependency]:
+        """Dispatch a lockfile to its format-specific parser."""
+        parse = self._lockfile_dispatch.get(lockfile_path.name)
+        return parse(lockfile_path) if parse else []
+    
+    async def can_parse(self, file_path: Path) -> bool:
+        """Check if this parser can handle the given file.
+        
+        Unrecognized file names are rejected without touching the filesystem.
+        
+        Args:
+            file_path: Path to file to check
+            
+        Returns:
+            True if parser can handle this file
+        """
+        name = file_path.name
+        if (name not in self._name_dispatch
+                and file_path.suffix not in self._suffix_dispatch
+                and name not in self._lockfile_dispatch):
+            return False
+        return await super().can_parse(file_path)
     
     async def resolve_transitive_dependencies(self, dependencies: List[Dependency]) -> List[Dependency]:
         """Resolve transitive dependencies.
@@ -69,7 +188,7 @@ class CSharpParser(BaseParser):
         # to get the full dependency graph
         return dependencies
     
-    async def _parse_project_file(self, project_path: Path) -> List[Dependency]:
+    def _parse_project_file_sync(self, project_path: Path) -> List[Dependency]:
         """Parse a .csproj or .vbproj file.
         
         Args:
@@ -81,54 +200,24 @@ class CSharpParser(BaseParser):
         dependencies = []
         
         try:
-            content = self._read_file(project_path)
-            
-            # Parse XML content
-            root = ET.fromstring(content)
-            
             # SDK-style project files (new format)
             # Look for PackageReference items
-            package_refs = root.findall(".//PackageReference") or root.findall(".//{http://schemas.microsoft.com/developer/msbuild/2003}PackageReference")
-            
-            for ref in package_refs:
-                name = ref.get("Include") or ""
-                version = ref.get("Version") or ""
-                
-                # If Version attribute is not present, look for Version element
-                if not version:
-                    version_elem = ref.find("Version")
-                    if version_elem is not None and version_elem.text:
-                        version = version_elem.text
-                
-                if name:
-                    package = self.create_package(
-                        name=name,
-                        version=version,
-                        description="",
-                        homepage="",
-                        repository_url=""
-                    )
-                    
-                    dependencies.append(self.create_dependency(
-                        package=package,
-                        dependency_type=DependencyType.DIRECT,
-                        constraint=version
-                    ))
+            dependencies = self._package_reference_dependencies(project_path)
                     
             # Older format (packages.config references)
-            if not package_refs:
+            if not dependencies:
                 # Check if there's a packages.config file in the same directory
                 packages_config = project_path.parent / "packages.config"
                 if packages_config.exists():
-                    return await self._parse_packages_config(packages_config)
+                    return self._parse_packages_config_sync(packages_config)
                     
         except Exception as e:
             # Log error
-            print(f"Error parsing project file {project_path}: {e}")
+            logger.warning("Error parsing project file {}: {}", project_path, e)
             
         return dependencies
     
-    async def _parse_packages_config(self, config_path: Path) -> List[Dependency]:
+    def _parse_packages_config_sync(self, config_path: Path) -> List[Dependency]:
         """Parse a packages.config file.
         
         Args:
@@ -140,45 +229,15 @@ class CSharpParser(BaseParser):
         dependencies = []
         
         try:
-            content = self._read_file(config_path)
-            
-            # Parse XML content
-            root = ET.fromstring(content)
-            
-            # Get all package elements
-            packages = root.findall(".//package")
-            
-            for package in packages:
-                name = package.get("id") or ""
-                version = package.get("version") or ""
-                
-                # Check if this is a development dependency
-                dev_dependency = package.get("developmentDependency", "").lower() == "true"
-                
-                if name:
-                    package_obj = self.create_package(
-                        name=name,
-                        version=version,
-                        description="",
-                        homepage="",
-                        repository_url=""
-                    )
-                    
-                    dependency_type = DependencyType.DEV if dev_dependency else DependencyType.DIRECT
-                    
-                    dependencies.append(self.create_dependency(
-                        package=package_obj,
-                        dependency_type=dependency_type,
-                        constraint=version
-                    ))
+            dependencies = self._packages_config_dependencies(config_path)
                     
         except Exception as e:
             # Log error
-            print(f"Error parsing packages.config file {config_path}: {e}")
+            logger.warning("Error parsing packages.config file {}: {}", config_path, e)
             
         return dependencies
     
-    async def _parse_directory_build_props(self, props_path: Path) -> List[Dependency]:
+    def _parse_directory_build_props_sync(self, props_path: Path) -> List[Dependency]:
         """Parse a Directory.Build.props file.
         
         Args:
@@ -190,46 +249,84 @@ class CSharpParser(BaseParser):
         dependencies = []
         
         try:
-            content = self._read_file(props_path)
-            
-            # Parse XML content
-            root = ET.fromstring(content)
-            
             # Look for PackageReference items in ItemGroup
-            package_refs = root.findall(".//PackageReference") or root.findall(".//{http://schemas.microsoft.com/developer/msbuild/2003}PackageReference")
-            
-            for ref in package_refs:
-                name = ref.get("Include") or ""
-                version = ref.get("Version") or ""
-                
-                # If Version attribute is not present, look for Version element
-                if not version:
-                    version_elem = ref.find("Version")
-                    if version_elem is not None and version_elem.text:
-                        version = version_elem.text
-                
-                if name:
-                    package = self.create_package(
-                        name=name,
-                        version=version,
-                        description="",
-                        homepage="",
-                        repository_url=""
-                    )
-                    
-                    dependencies.append(self.create_dependency(
-                        package=package,
-                        dependency_type=DependencyType.DIRECT,
-                        constraint=version
-                    ))
+            dependencies = self._package_reference_dependencies(props_path)
                     
         except Exception as e:
             # Log error
-            print(f"Error parsing Directory.Build.props file {props_path}: {e}")
+            logger.warning("Error parsing Directory.Build.props file {}: {}", props_path, e)
             
         return dependencies
     
-    async def _parse_packages_lock_json(self, lockfile_path: Path) -> List[Dependency]:
+    def _package_reference_dependencies(self, xml_path: Path) -> List[Dependency]:
+        """Collect PackageReference dependencies from an MSBuild file.
+        
+        Args:
+            xml_path: Path to project or props file
+            
+        Returns:
+            List of dependencies
+        """
+        dependencies = []
+        for ref in _collect_package_elements(xml_path, "PackageReference"):
+            dependency = self._package_reference_dependency(ref)
+            if dependency:
+                dependencies.append(dependency)
+        return dependencies
+    
+    def _packages_config_dependencies(self, config_path: Path) -> List[Dependency]:
+        """Collect dependencies from a packages.config file.
+        
+        Args:
+            config_path: Path to packages.config file
+            
+        Returns:
+            List of dependencies
+        """
+        dependencies = []
+        for package in _collect_package_elements(config_path, "package"):
+            name = package.get("id") or ""
+            version = package.get("version") or ""
+            
+            # Check if this is a development dependency
+            dev_dependency = package.get("developmentDependency", "").lower() == "true"
+            
+            if name:
+                package_obj = self.create_package(name=name, version=version)
+                
+                dependency_type = DependencyType.DEV if dev_dependency else DependencyType.DIRECT
+                
+                dependencies.append(self.create_dependency(
+                    package=package_obj,
+                    dependency_type=dependency_type,
+                    constraint=version
+                ))
+        return dependencies
+    
+    def _package_reference_dependency(self, ref: Dict[str, str]) -> Optional[Dependency]:
+        """Build a dependency from PackageReference attributes.
+        
+        Args:
+            ref: PackageReference attributes, with any nested Version element folded in
+            
+        Returns:
+            Dependency, or None if the element has no Include attribute
+        """
+        name = ref.get("Include") or ""
+        version = ref.get("Version") or ""
+        
+        if not name:
+            return None
+        
+        package = self.create_package(name=name, version=version)
+        
+        return self.create_dependency(
+            package=package,
+            dependency_type=DependencyType.DIRECT,
+            constraint=version
+        )
+    
+    def _parse_packages_lock_json_sync(self, lockfile_path: Path) -> List[Dependency]:
         """Parse a packages.lock.json file.
         
         Args:
@@ -241,29 +338,20 @@ class CSharpParser(BaseParser):
         dependencies = []
         
         try:
-            content = self._read_file(lockfile_path)
-            data = json.loads(content)
-            
             # Process dependencies
-            deps = data.get("dependencies", {})
-            for name, dep_info in deps.items():
+            append = dependencies.append
+            for name, dep_info in json_iter_items(lockfile_path, "dependencies"):
                 version = dep_info.get("resolved", "")
                 
                 # Check if this is a direct dependency
                 is_direct = dep_info.get("type", "") == "Direct"
                 
                 if name:
-                    package = self.create_package(
-                        name=name,
-                        version=version,
-                        description="",
-                        homepage="",
-                        repository_url=""
-                    )
+                    package = self.create_package(name=name, version=version)
                     
                     dependency_type = DependencyType.DIRECT if is_direct else DependencyType.TRANSITIVE
                     
-                    dependencies.append(self.create_dependency(
+                    append(self.create_dependency(
                         package=package,
                         dependency_type=dependency_type,
                         constraint=version
@@ -271,6 +359,6 @@ class CSharpParser(BaseParser):
                     
         except Exception as e:
             # Log error
-            print(f"Error parsing packages.lock.json file {lockfile_path}: {e}")
+            logger.warning("Error parsing packages.lock.json file {}: {}", lockfile_path, e)
             
         return dependencies
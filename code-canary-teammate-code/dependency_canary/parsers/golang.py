@@ -4,13 +4,25 @@ Go manifest parser for Go Modules projects.
 
 from pathlib import Path
 import re
-from typing import List, Dict, Any, Set
+from typing import List, Dict, Any, Set, Tuple
 import asyncio
 
-from .base import BaseParser
+from loguru import logger
+
+from .base import BaseParser, STREAM_BUFFER_SIZE
 from ..detectors import Language, PackageManager
 from ..models import Dependency, DependencyType, Package
 
+_RE_MODULE = re.compile(r"module\s+(\S+)")
+_RE_GOVER = re.compile(r"go\s+([0-9.]+)")
+# Single-line requires (exclude block syntax)
+_RE_REQUIRE_LINE = re.compile(r"^[ \t]*require[ \t]+([^\s\(\)]+)[ \t]+([^\s\(\)]+)[ \t]*$", re.MULTILINE)
+# Body of a require ( ... ) block, starting right after "("
+_RE_REQUIRE_BLOCK = re.compile(r"require\s*\(([\s\S]*?)\)")
+# "module version" entry inside a require block, at a line start or right
+# after the "(" of a one-line block; comment lines never match
+_RE_BLOCK_ENTRY = re.compile(r"(?:^|(?<=\())[ \t]*([^\s/]\S*)[ \t]+(\S+)", re.MULTILINE)
+
 class GoParser(BaseParser):
     """Parser for Go modules projects."""
     
@@ -21,6 +33,31 @@ class GoParser(BaseParser):
     async def parse_manifest(self, manifest_path: Path) -> List[Dependency]:
         """Parse a go.mod file.
         
+        The file is parsed in a worker thread so that many manifests can be
+        parsed concurrently; use ``parse_manifest_sync`` outside an event loop.
+        
+        Args:
+            manifest_path: Path to go.mod file
+            
+        Returns:
+            List of direct dependencies
+        """
+        return await asyncio.to_thread(self.parse_manifest_sync, manifest_path)
+    
+    def parse_manifest_sync(self, manifest_path: Path) -> List[Dependency]:
+        """Parse a go.mod file.
+        
+        Args:
+            manifest_path: Path to go.mod file
+            
+        Returns:
+            List of direct dependencies
+        """
+        return self._cached_parse("manifest", manifest_path, self._parse_manifest_file)
+    
+    def _parse_manifest_file(self, manifest_path: Path) -> List[Dependency]:
+        """Parse a go.mod file.
+        
         Args:
             manifest_path: Path to go.mod file
             
@@ -37,34 +74,40 @@ class GoParser(BaseParser):
             
             # Extract module name (first line usually)
             module_name = ""
-            module_match = re.search(r"module\s+(.+)", content)
+            module_match = _RE_MODULE.search(content)
             if module_match:
-                module_name = module_match.group(1).strip()
+                module_name = module_match.group(1)
             
             # Extract Go version
             go_version = "unknown"
-            go_match = re.search(r"go\s+([0-9.]+)", content)
+            go_match = _RE_GOVER.search(content)
             if go_match:
-                go_version = go_match.group(1).strip()
+                go_version = go_match.group(1)
             
             # Extract require statements
             # Single-line requires (exclude block syntax)
-            require_pattern = r"^require\s+([^\s\(\)]+)\s+([^\s\(\)]+)$"
-            for line in content.splitlines():
-                line = line.strip()
-                match = re.match(require_pattern, line)
-                if match:
+            for match in _RE_REQUIRE_LINE.finditer(content):
+                pkg_name, version = match.groups()
+                
+                package = self.create_package(
+                    name=pkg_name,
+                    version=version
+                )
+                
+                dependencies.append(self.create_dependency(
+                    package=package,
+                    dependency_type=DependencyType.DIRECT,
+                    constraint=version
+                ))
+            
+            # Multi-line require block, scanned in place within the block bounds
+            for block in _RE_REQUIRE_BLOCK.finditer(content):
+                for match in _RE_BLOCK_ENTRY.finditer(content, block.start(1), block.end(1)):
                     pkg_name, version = match.groups()
                     
-                    # Clean up version (remove 'v' prefix if present)
-                    version = version.strip()
-                    
                     package = self.create_package(
-                        name=pkg_name.strip(),
-                        version=version,
-                        description="",
-                        homepage="",
-                        repository_url=""
+                        name=pkg_name,
+                        version=version
                     )
                     
                     dependencies.append(self.create_dependency(
@@ -72,42 +115,41 @@ class GoParser(BaseParser):
                         dependency_type=DependencyType.DIRECT,
                         constraint=version
                     ))
-            
-            # Multi-line require block
-            require_blocks = re.findall(r"require\s*\(\s*([\s\S]*?)\s*\)", content)
-            for block in require_blocks:
-                for line in block.strip().split("\n"):
-                    line = line.strip()
-                    if not line or line.startswith("//"):
-                        continue
-                        
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        pkg_name, version = parts[0], parts[1]
-                        
-                        package = self.create_package(
-                            name=pkg_name.strip(),
-                            version=version.strip(),
-                            description="",
-                            homepage="",
-                            repository_url=""
-                        )
-                        
-                        dependencies.append(self.create_dependency(
-                            package=package,
-                            dependency_type=DependencyType.DIRECT,
-                            constraint=version.strip()
-                        ))
                         
         except Exception as e:
             # Log error
-            print(f"Error parsing Go module file {manifest_path}: {e}")
+            logger.warning("Error parsing Go module file {}: {}", manifest_path, e)
             
         return dependencies
     
     async def parse_lockfile(self, lockfile_path: Path) -> List[Dependency]:
         """Parse a go.sum lockfile.
         
+        The file is parsed in a worker thread so that many lockfiles can be
+        parsed concurrently; use ``parse_lockfile_sync`` outside an event loop.
+        
+        Args:
+            lockfile_path: Path to go.sum file
+            
+        Returns:
+            List of all dependencies (direct and transitive)
+        """
+        return await asyncio.to_thread(self.parse_lockfile_sync, lockfile_path)
+    
+    def parse_lockfile_sync(self, lockfile_path: Path) -> List[Dependency]:
+        """Parse a go.sum lockfile.
+        
+        Args:
+            lockfile_path: Path to go.sum file
+            
+        Returns:
+            List of all dependencies (direct and transitive)
+        """
+        return self._cached_parse("lockfile", lockfile_path, self._parse_lockfile_file)
+    
+    def _parse_lockfile_file(self, lockfile_path: Path) -> List[Dependency]:
+        """Parse a go.sum lockfile.
+        
         Args:
             lockfile_path: Path to go.sum file
             
@@ -117,49 +159,46 @@ class GoParser(BaseParser):
         if lockfile_path.name != "go.sum":
             return []
             
-        dependencies = []
-        package_versions = set()  # To avoid duplicates
+        # Keyed by raw (module, version) bytes: go.sum has multiple entries per
+        # package, and the dict both deduplicates and keeps first-seen order
+        deps_by_key: Dict[Tuple[bytes, bytes], Dependency] = {}
         
         try:
-            content = self._read_file(lockfile_path)
-            
+            create_package = self.create_package
+            create_dependency = self.create_dependency
             # Format: github.com/pkg/errors v0.9.1 h1:FEBLx1zS214owpjy7qsBeixbURkuhQAwrK5UwLGTwt4=
             # or: github.com/pkg/errors v0.9.1/go.mod h1:bwawxfHBFNV+L2hUp1rHADufV3IMtnDRdf1r5NINEl0=
-            pattern = r"^([^\s]+)\s+([^\s/]+)(?:/go\.mod)?\s+"
-            
-            for line in content.splitlines():
-                match = re.match(pattern, line)
-                if match:
-                    pkg_name, version = match.groups()
-                    
-                    # Avoid duplicates (go.sum has multiple entries per package)
-                    pkg_key = f"{pkg_name}@{version}"
-                    if pkg_key in package_versions:
-                        continue
-                    
-                    package_versions.add(pkg_key)
-                    
-                    package = self.create_package(
-                        name=pkg_name,
-                        version=version,
-                        description="",
-                        homepage="",
-                        repository_url=""
-                    )
-                    
-                    dependencies.append(self.create_dependency(
-                        package=package,
-                        # go.sum contains both direct and transitive dependencies
-                        # Without additional info, we assume transitive to be conservative
-                        dependency_type=DependencyType.TRANSITIVE,
-                        constraint=version
-                    ))
-                    
+            # The file is read in binary mode so that only the first entry of
+            # each module version is decoded; the /go.mod duplicates never are
+            with lockfile_path.open("rb", buffering=STREAM_BUFFER_SIZE) as f:
+                for line in f:
+                    # bytes.split runs in C and is several times cheaper than a regex per line
+                    fields = line.split(None, 2)
+                    if len(fields) == 3:
+                        key = (fields[0], fields[1].removesuffix(b"/go.mod"))
+                        if key in deps_by_key:
+                            continue
+                        pkg_name = key[0].decode("utf-8", "replace")
+                        version = key[1].decode("utf-8", "replace")
+                        
+                        package = create_package(
+                            name=pkg_name,
+                            version=version
+                        )
+                        
+                        deps_by_key[key] = create_dependency(
+                            package=package,
+                            # go.sum contains both direct and transitive dependencies
+                            # Without additional info, we assume transitive to be conservative
+                            dependency_type=DependencyType.TRANSITIVE,
+                            constraint=version
+                        )
+                        
         except Exception as e:
             # Log error
-            print(f"Error parsing go.sum file {lockfile_path}: {e}")
+            logger.warning("Error parsing go.sum file {}: {}", lockfile_path, e)
             
-        return dependencies
+        return list(deps_by_key.values())
     
     async def resolve_transitive_dependencies(self, dependencies: List[Dependency]) -> List[Dependency]:
         """Resolve transitive dependencies.
@@ -10,10 +10,15 @@ import json
 import os
 import asyncio
 
+from loguru import logger
+
 from .base import BaseParser
 from ..detectors import Language, PackageManager
 from ..models import Dependency, DependencyType, Package
 
+# gradle.lockfile entry: group:artifact:version=configurations
+_RE_GRADLE_LOCK = re.compile(r"^([^:\n]+):([^:\n]+):([^=\n]+)=", re.MULTILINE)
+
 class JavaParser(BaseParser):
     """Parser for Java Maven and Gradle projects."""
     
@@ -28,6 +33,31 @@ class JavaParser(BaseParser):
     async def parse_manifest(self, manifest_path: Path) -> List[Dependency]:
         """Parse a Maven or Gradle manifest file.
         
+        The file is parsed in a worker thread so that many manifests can be
+        parsed concurrently; use ``parse_manifest_sync`` outside an event loop.
+        
+        Args:
+            manifest_path: Path to pom.xml or build.gradle file
+            
+        Returns:
+            List of direct dependencies
+        """
+        return await asyncio.to_thread(self.parse_manifest_sync, manifest_path)
+    
+    def parse_manifest_sync(self, manifest_path: Path) -> List[Dependency]:
+        """Parse a Maven or Gradle manifest file.
+        
+        Args:
+            manifest_path: Path to pom.xml or build.gradle file
+            
+        Returns:
+            List of direct dependencies
+        """
+        return self._cached_parse("manifest", manifest_path, self._parse_manifest_file)
+    
+    def _parse_manifest_file(self, manifest_path: Path) -> List[Dependency]:
+        """Parse a Maven or Gradle manifest file.
+        
         Args:
             manifest_path: Path to pom.xml or build.gradle file
             
@@ -35,15 +65,40 @@ class JavaParser(BaseParser):
             List of direct dependencies
         """
         if manifest_path.name == "pom.xml":
-            return await self._parse_maven_pom(manifest_path)
+            return self._parse_maven_pom_sync(manifest_path)
         elif manifest_path.name in ("build.gradle", "build.gradle.kts"):
-            return await self._parse_gradle_build(manifest_path)
+            return self._parse_gradle_build_sync(manifest_path)
         else:
             return []
     
     async def parse_lockfile(self, lockfile_path: Path) -> List[Dependency]:
         """Parse a Maven or Gradle lockfile.
         
+        The file is parsed in a worker thread so that many lockfiles can be
+        parsed concurrently; use ``parse_lockfile_sync`` outside an event loop.
+        
+        Args:
+            lockfile_path: Path to lockfile
+            
+        Returns:
+            List of all dependencies (direct and transitive)
+        """
+        return await asyncio.to_thread(self.parse_lockfile_sync, lockfile_path)
+    
+    def parse_lockfile_sync(self, lockfile_path: Path) -> List[Dependency]:
+        """Parse a Maven or Gradle lockfile.
+        
+        Args:
+            lockfile_path: Path to lockfile
+            
+        Returns:
+            List of all dependencies (direct and transitive)
+        """
+        return self._cached_parse("lockfile", lockfile_path, self._parse_lockfile_file)
+    
+    def _parse_lockfile_file(self, lockfile_path: Path) -> List[Dependency]:
+        """Parse a Maven or Gradle lockfile.
+        
         Args:
             lockfile_path: Path to lockfile
             
@@ -51,7 +106,7 @@ class JavaParser(BaseParser):
             List of all dependencies (direct and transitive)
         """
         if lockfile_path.name == "gradle.lockfile":
-            return await self._parse_gradle_lockfile(lockfile_path)
+            return self._parse_gradle_lockfile_sync(lockfile_path)
         # Maven doesn't have a standard lockfile
         return []
     
@@ -73,7 +128,7 @@ class JavaParser(BaseParser):
         # This simplified implementation just returns the direct dependencies
         return dependencies
     
-    async def _parse_maven_pom(self, pom_path: Path) -> List[Dependency]:
+    def _parse_maven_pom_sync(self, pom_path: Path) -> List[Dependency]:
         """Parse Maven POM file.
         
         Args:
@@ -88,30 +143,35 @@ class JavaParser(BaseParser):
             content = self._read_file(pom_path)
             root = ET.fromstring(content)
             
-            # Handle XML namespaces in POM files
-            ns = {"maven": "http://maven.apache.org/POM/4.0.0"}
+            # Handle XML namespaces in POM files: take the namespace from the
+            # root element once and match Clark-notation tags directly, which
+            # also covers POMs written without the Maven namespace
+            ns = root.tag[:root.tag.index("}") + 1] if root.tag.startswith("{") else ""
+            group_tag = f"{ns}groupId"
+            artifact_tag = f"{ns}artifactId"
+            version_tag = f"{ns}version"
+            scope_tag = f"{ns}scope"
             
             # Parse project coordinates
-            project_group = root.findtext("maven:groupId", default="", namespaces=ns)
-            project_artifact = root.findtext("maven:artifactId", default="", namespaces=ns)
-            project_version = root.findtext("maven:version", default="", namespaces=ns)
+            project_group = root.findtext(group_tag, default="")
+            project_artifact = root.findtext(artifact_tag, default="")
+            project_version = root.findtext(version_tag, default="")
             
             # Parse dependencies
-            deps_element = root.find("maven:dependencies", namespaces=ns)
+            deps_element = root.find(f"{ns}dependencies")
             if deps_element is not None:
-                for dep in deps_element.findall("maven:dependency", namespaces=ns):
-                    group_id = dep.findtext("maven:groupId", default="", namespaces=ns)
-                    artifact_id = dep.findtext("maven:artifactId", default="", namespaces=ns)
-                    version = dep.findtext("maven:version", default="", namespaces=ns)
-                    scope = dep.findtext("maven:scope", default="compile", namespaces=ns)
+                for dep in deps_element.iter(f"{ns}dependency"):
+                    # Collect child values in one pass instead of one search per field
+                    fields = {child.tag: child.text or "" for child in dep}
+                    group_id = fields.get(group_tag, "")
+                    artifact_id = fields.get(artifact_tag, "")
+                    version = fields.get(version_tag, "")
+                    scope = fields.get(scope_tag, "compile")
                     
                     if artifact_id and group_id:
                         package = self.create_package(
                             name=f"{group_id}:{artifact_id}",
-                            version=version or "unknown",
-                            description="",
-                            homepage="",
-                            repository_url=""
+                            version=version or "unknown"
                         )
                         
                         # Determine if this is a development dependency
@@ -125,11 +185,11 @@ class JavaParser(BaseParser):
             
         except Exception as e:
             # Log error and return empty list
-            print(f"Error parsing Maven POM {pom_path}: {e}")
+            logger.warning("Error parsing Maven POM {}: {}", pom_path, e)
         
         return dependencies
     
-    async def _parse_gradle_build(self, gradle_path: Path) -> List[Dependency]:
+    def _parse_gradle_build_sync(self, gradle_path: Path) -> List[Dependency]:
         """Parse Gradle build file.
         
         Args:
@@ -152,10 +212,7 @@ class JavaParser(BaseParser):
                 
                 package = self.create_package(
                     name=f"{group}:{artifact}",
-                    version=version,
-                    description="",
-                    homepage="",
-                    repository_url=""
+                    version=version
                 )
                 
                 # Determine if this is a development dependency
@@ -169,11 +226,11 @@ class JavaParser(BaseParser):
                 
         except Exception as e:
             # Log error and return empty list
-            print(f"Error parsing Gradle build file {gradle_path}: {e}")
+            logger.warning("Error parsing Gradle build file {}: {}", gradle_path, e)
         
         return dependencies
     
-    async def _parse_gradle_lockfile(self, lockfile_path: Path) -> List[Dependency]:
+    def _parse_gradle_lockfile_sync(self, lockfile_path: Path) -> List[Dependency]:
         """Parse Gradle lockfile.
         
         Args:
@@ -189,31 +246,28 @@ class JavaParser(BaseParser):
             
             # Gradle lockfiles typically look like:
             # org.example:library:1.0.0=...
-            lock_pattern = r"([^:]+):([^:]+):([^=]+)="
-            
-            for line in content.splitlines():
-                match = re.match(lock_pattern, line)
-                if match:
-                    group, artifact, version = match.groups()
-                    
-                    package = self.create_package(
-                        name=f"{group}:{artifact}",
-                        version=version.strip(),
-                        description="",
-                        homepage="",
-                        repository_url=""
-                    )
-                    
-                    # Lockfiles contain both direct and transitive dependencies
-                    # Without additional information, we can't determine which are direct
-                    dependencies.append(self.create_dependency(
-                        package=package,
-                        dependency_type=DependencyType.TRANSITIVE,  # Conservative assumption
-                        constraint=version.strip()
-                    ))
+            # One multiline scan keeps the loop over lines inside the regex engine
+            create_package = self.create_package
+            create_dependency = self.create_dependency
+            for match in _RE_GRADLE_LOCK.finditer(content):
+                group, artifact, version = match.groups()
+                version = version.strip()
+                
+                package = create_package(
+                    name=f"{group}:{artifact}",
+                    version=version
+                )
+                
+                # Lockfiles contain both direct and transitive dependencies
+                # Without additional information, we can't determine which are direct
+                dependencies.append(create_dependency(
+                    package=package,
+                    dependency_type=DependencyType.TRANSITIVE,  # Conservative assumption
+                    constraint=version
+                ))
                     
         except Exception as e:
             # Log error and return empty list
-            print(f"Error parsing Gradle lockfile {lockfile_path}: {e}")
+            logger.warning("Error parsing Gradle lockfile {}: {}", lockfile_path, e)
         
         return dependencies
@@ -3,7 +3,6 @@ JavaScript/TypeScript parser for npm, yarn, and pnpm package managers.
 """
 
 import json
-import yaml
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import httpx
@@ -11,6 +10,7 @@ import asyncio
 from ..models import Package, Dependency, DependencyType
 from ..detectors import Language, PackageManager
 from .base import BaseParser
+from ..serialization import json_loads, yaml_load_file
 
 class JavaScriptParser(BaseParser):
     """Parser for JavaScript/TypeScript projects."""
@@ -27,6 +27,31 @@ class JavaScriptParser(BaseParser):
     async def parse_manifest(self, manifest_path: Path) -> List[Dependency]:
         """Parse package.json file.
         
+        The file is parsed in a worker thread so that many manifests can be
+        parsed concurrently; use ``parse_manifest_sync`` outside an event loop.
+        
+        Args:
+            manifest_path: Path to package.json
+            
+        Returns:
+            List of direct dependencies
+        """
+        return await asyncio.to_thread(self.parse_manifest_sync, manifest_path)
+    
+    def parse_manifest_sync(self, manifest_path: Path) -> List[Dependency]:
+        """Parse package.json file.
+        
+        Args:
+            manifest_path: Path to package.json
+            
+        Returns:
+            List of direct dependencies
+        """
+        return self._cached_parse("manifest", manifest_path, self._parse_manifest_file)
+    
+    def _parse_manifest_file(self, manifest_path: Path) -> List[Dependency]:
+        """Parse package.json file.
+        
         Args:
             manifest_path: Path to package.json
             
@@ -34,9 +59,23 @@ class JavaScriptParser(BaseParser):
             List of direct dependencies
         """
         try:
-            content = self._read_file(manifest_path)
-            package_json = json.loads(content)
-        except (FileNotFoundError, json.JSONDecodeError, UnicodeDecodeError) as e:
+            data = manifest_path.read_bytes()
+        except OSError:
+            return []
+        return self.parse_manifest_bytes(data)
+    
+    def parse_manifest_bytes(self, data: bytes) -> List[Dependency]:
+        """Parse package.json content that is already in memory.
+        
+        Args:
+            data: Raw package.json document
+            
+        Returns:
+            List of direct dependencies
+        """
+        try:
+            package_json = json_loads(data)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
             return []
         except Exception:
             return []
@@ -94,6 +133,31 @@ class JavaScriptParser(BaseParser):
     async def parse_lockfile(self, lockfile_path: Path) -> List[Dependency]:
         """Parse lockfile (package-lock.json, yarn.lock, or pnpm-lock.yaml).
         
+        The file is parsed in a worker thread so that many lockfiles can be
+        parsed concurrently; use ``parse_lockfile_sync`` outside an event loop.
+        
+        Args:
+            lockfile_path: Path to lockfile
+            
+        Returns:
+            List of all dependencies with exact versions
+        """
+        return await asyncio.to_thread(self.parse_lockfile_sync, lockfile_path)
+    
+    def parse_lockfile_sync(self, lockfile_path: Path) -> List[Dependency]:
+        """Parse lockfile (package-lock.json, yarn.lock, or pnpm-lock.yaml).
+        
+        Args:
+            lockfile_path: Path to lockfile
+            
+        Returns:
+            List of all dependencies with exact versions
+        """
+        return self._cached_parse("lockfile", lockfile_path, self._parse_lockfile_file)
+    
+    def _parse_lockfile_file(self, lockfile_path: Path) -> List[Dependency]:
+        """Parse lockfile (package-lock.json, yarn.lock, or pnpm-lock.yaml).
+        
         Args:
             lockfile_path: Path to lockfile
             
@@ -103,11 +167,11 @@ class JavaScriptParser(BaseParser):
         filename = lockfile_path.name
         
         if filename == "package-lock.json":
-            return await self._parse_npm_lockfile(lockfile_path)
+            return self._parse_npm_lockfile_sync(lockfile_path)
         elif filename == "yarn.lock":
-            return await self._parse_yarn_lockfile(lockfile_path)
+            return self._parse_yarn_lockfile_sync(lockfile_path)
         elif filename == "pnpm-lock.yaml":
-            return await self._parse_pnpm_lockfile(lockfile_path)
+            return self._parse_pnpm_lockfile_sync(lockfile_path)
         else:
             raise ValueError(f"Unsupported lockfile: {filename}")
     
@@ -132,7 +196,7 @@ class JavaScriptParser(BaseParser):
         
         return all_dependencies
     
-    async def _parse_npm_lockfile(self, lockfile_path: Path) -> List[Dependency]:
+    def _parse_npm_lockfile_sync(self, lockfile_path: Path) -> List[Dependency]:
         """Parse package-lock.json file.
         
         Args:
@@ -141,8 +205,18 @@ class JavaScriptParser(BaseParser):
         Returns:
             List of all dependencies
         """
-        content = self._read_file(lockfile_path)
-        lockfile_data = json.loads(content)
+        return self.parse_lockfile_bytes(lockfile_path.read_bytes())
+    
+    def parse_lockfile_bytes(self, data: bytes) -> List[Dependency]:
+        """Parse package-lock.json content that is already in memory.
+        
+        Args:
+            data: Raw package-lock.json document
+            
+        Returns:
+            List of all dependencies
+        """
+        lockfile_data = json_loads(data)
         
         dependencies = []
         
@@ -234,7 +308,7 @@ class JavaScriptParser(BaseParser):
         
         return dependencies
     
-    async def _parse_yarn_lockfile(self, lockfile_path: Path) -> List[Dependency]:
+    def _parse_yarn_lockfile_sync(self, lockfile_path: Path) -> List[Dependency]:
         """Parse yarn.lock file.
         
         Args:
@@ -285,7 +359,7 @@ class JavaScriptParser(BaseParser):
         
         return dependencies
     
-    async def _parse_pnpm_lockfile(self, lockfile_path: Path) -> List[Dependency]:
+    def _parse_pnpm_lockfile_sync(self, lockfile_path: Path) -> List[Dependency]:
         """Parse pnpm-lock.yaml file.
         
         Args:
@@ -294,8 +368,7 @@ class JavaScriptParser(BaseParser):
         Returns:
             List of all dependencies
         """
-        content = self._read_file(lockfile_path)
-        lockfile_data = yaml.safe_load(content)
+        lockfile_data = yaml_load_file(lockfile_path)
         
         dependencies = []
         
@@ -352,7 +425,7 @@ class JavaScriptParser(BaseParser):
             response = await client.get(url, timeout=10.0)
             
             if response.status_code == 200:
-                package_info = response.json()
+                package_info = json_loads(response.content)
                 
                 # Parse dependencies from package.json
                 if "dependencies" in package_info:
@@ -4,26 +4,46 @@ Python parser for pip, Poetry, Pipenv, and Conda environments.
 
 from __future__ import annotations
 
-import json
 import re
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import IO, Iterator, List, Dict, Any, Optional
 
 import asyncio
 import httpx
-import yaml
-
-try:  # Python 3.11+
-    import tomllib as toml
-except Exception:  # Fallback
-    try:
-        import toml  # type: ignore
-    except Exception:  # pragma: no cover
-        toml = None  # TOML parsing unavailable
 
 from ..models import Package, Dependency, DependencyType
 from ..detectors import Language, PackageManager
-from .base import BaseParser
+from .base import BaseParser, STREAM_BUFFER_SIZE
+from ..http_client import get_shared_client
+from ..serialization import json_loads, toml_load_file, toml_loads, yaml_load_file
+
+_REQ_EXTRAS = re.compile(r"\[.*?\]")
+# Name, optional comparison operator, and the remaining version specifier
+_REQ_SPLIT = re.compile(r"^\s*([A-Za-z0-9_.\-]+)\s*(?:===|==|>=|<=|~=|!=|>|<|=)?\s*=?\s*(.*?)\s*$")
+# Start of what follows a requirement on its line: an inline comment, pip
+# options such as --hash, or a line continuation
+_REQ_TRAILER = re.compile(r"\s+(?:#|--|\\$)")
+# Leading name/version pair of a poetry.lock [[package]] table
+_POETRY_ENTRY = re.compile(r'^\[\[package\]\]\s*\nname\s*=\s*"([^"]+)"\s*\nversion\s*=\s*"([^"]+)"', re.MULTILINE)
+
+
+def _iter_requirement_lines(f: IO[str]) -> Iterator[str]:
+    """Yield the requirement part of each line of a requirements file.
+    
+    Blank lines, comments and pip option lines (-r, -e, --index-url and the
+    --hash continuation lines written by pip-compile) are skipped up front,
+    so only lines naming a package reach the requirement parser.
+    """
+    for raw in f:
+        line = raw.strip()
+        if not line or line[0] in "#-":
+            continue
+        # Plain "name==version" pins contain no whitespace to search
+        if " " in line or "\t" in line:
+            trailer = _REQ_TRAILER.search(line)
+            if trailer:
+                line = line[:trailer.start()]
+        yield line
 
 
 class PythonParser(BaseParser):
@@ -32,12 +52,24 @@ class PythonParser(BaseParser):
     def __init__(self, package_manager: PackageManager = PackageManager.PIP):
         super().__init__(Language.PYTHON, package_manager)
         self.pypi_api_json = "https://pypi.org/pypi"
+        # requires_dist per (name, version) already fetched from PyPI
+        self._pypi_cache: Dict[tuple[str, str], List[str]] = {}
+        # PyPI requests in flight at once during transitive resolution
+        self.max_concurrent_requests = 10
 
     async def parse_manifest(self, manifest_path: Path) -> List[Dependency]:
         """Parse Python manifests (requirements.txt, pyproject.toml, Pipfile, environment.yml).
 
         Returns only direct dependencies. Use parse_lockfile for full tree when available.
+        Parsing runs in a worker thread; use parse_manifest_sync outside an event loop.
         """
+        return await asyncio.to_thread(self.parse_manifest_sync, manifest_path)
+
+    def parse_manifest_sync(self, manifest_path: Path) -> List[Dependency]:
+        """Parse a Python manifest without an event loop."""
+        return self._cached_parse("manifest", manifest_path, self._parse_manifest_file)
+
+    def _parse_manifest_file(self, manifest_path: Path) -> List[Dependency]:
         filename = manifest_path.name.lower()
 
         if filename in {"requirements.txt", "requirements.in", "requirements-dev.txt"}:
@@ -53,7 +85,17 @@ class PythonParser(BaseParser):
         return []
 
     async def parse_lockfile(self, lockfile_path: Path) -> List[Dependency]:
-        """Parse Python lockfiles for complete dependency trees with pinned versions."""
+        """Parse Python lockfiles for complete dependency trees with pinned versions.
+
+        Parsing runs in a worker thread; use parse_lockfile_sync outside an event loop.
+        """
+        return await asyncio.to_thread(self.parse_lockfile_sync, lockfile_path)
+
+    def parse_lockfile_sync(self, lockfile_path: Path) -> List[Dependency]:
+        """Parse a Python lockfile without an event loop."""
+        return self._cached_parse("lockfile", lockfile_path, self._parse_lockfile_file)
+
+    def _parse_lockfile_file(self, lockfile_path: Path) -> List[Dependency]:
         filename = lockfile_path.name.lower()
 
         if filename == "poetry.lock":
@@ -73,15 +115,47 @@ class PythonParser(BaseParser):
 
         If version is not pinned, attempts latest metadata.
         Depth is limited to avoid excessive API calls.
-        """
-        all_deps = dependencies.copy()
-        seen = {d.package.purl for d in dependencies}
 
-        async with httpx.AsyncClient() as client:
-            for dep in dependencies:
-                nested = await self._resolve_pypi_requires_dist(client, dep.package, seen, depth=1, max_depth=2)
-                all_deps.extend(nested)
-        return all_deps
+        The tree is walked breadth first: each level's lookups run
+        concurrently, then children are added in input order, so the output
+        and the parent and depth recorded for shared packages do not depend
+        on response timing.
+        """
+        # Duplicate direct entries are dropped up front
+        out: List[Dependency] = []
+        seen: set[str] = set()
+        for dep in dependencies:
+            purl = dep.package.purl
+            if purl not in seen:
+                seen.add(purl)
+                out.append(dep)
+
+        # The loop's pooled client keeps PyPI connections open across calls
+        client = get_shared_client()
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        level = [dep.package for dep in out]
+        for depth in range(1, 3):
+            if not level:
+                break
+            requires_per_package = await asyncio.gather(
+                *(self._fetch_pypi_requires_dist(client, semaphore, package) for package in level)
+            )
+            next_level: List[Package] = []
+            for package, requires in zip(level, requires_per_package):
+                parent_purl = package.purl
+                for req in requires:
+                    child_name, child_version = self._parse_requirement_line(req)
+                    if not child_name:
+                        continue
+                    child_pkg = self.create_package(name=child_name, version=child_version or "latest")
+                    child_purl = child_pkg.purl
+                    if child_purl in seen:
+                        continue
+                    seen.add(child_purl)
+                    out.append(self.create_dependency(package=child_pkg, dependency_type=DependencyType.TRANSITIVE, parent=parent_purl, depth=depth))
+                    next_level.append(child_pkg)
+            level = next_level
+        return out
 
     # ----------------------
     # Parsers (manifests)
@@ -89,27 +163,19 @@ class PythonParser(BaseParser):
     def _parse_requirements(self, path: Path) -> List[Dependency]:
         deps: List[Dependency] = []
         try:
-            content = path.read_text(encoding="utf-8")
-        except (FileNotFoundError, UnicodeDecodeError):
-            return deps
-        except Exception:
-            return deps
-            
-        for raw in content.splitlines():
-            line = raw.strip()
-            if not line or line.startswith("#") or line.startswith("-r "):
-                continue
-            name, version = self._parse_requirement_line(line)
-            if not name:
-                continue
-            pkg = self.create_package(name=name, version=version or "latest")
-            deps.append(self.create_dependency(pkg, dependency_type=DependencyType.DIRECT, scope="runtime"))
+            with path.open("r", encoding="utf-8", buffering=STREAM_BUFFER_SIZE) as f:
+                for line in _iter_requirement_lines(f):
+                    name, version = self._parse_requirement_line(line)
+                    if not name:
+                        continue
+                    pkg = self.create_package(name=name, version=version or "latest")
+                    deps.append(self.create_dependency(pkg, dependency_type=DependencyType.DIRECT, scope="runtime"))
+        except (OSError, UnicodeDecodeError):
+            return []
         return deps
 
     def _parse_pyproject(self, path: Path) -> List[Dependency]:
-        if toml is None:
-            return []
-        data = toml.loads(path.read_text(encoding="utf-8"))
+        data = toml_load_file(path)
         deps: List[Dependency] = []
 
         # Poetry-style
@@ -127,9 +193,7 @@ class PythonParser(BaseParser):
 
     def _parse_pipfile_manifest(self, path: Path) -> List[Dependency]:
         # Pipfile is TOML format
-        if toml is None:
-            return []
-        data = toml.loads(path.read_text(encoding="utf-8"))
+        data = toml_load_file(path)
         deps: List[Dependency] = []
         for section, dep_type in (("packages", DependencyType.DIRECT), ("dev-packages", DependencyType.DEV)):
             entries = data.get(section, {})
@@ -140,7 +204,7 @@ class PythonParser(BaseParser):
         return deps
 
     def _parse_conda_environment(self, path: Path) -> List[Dependency]:
-        data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+        data = yaml_load_file(path) or {}
         deps: List[Dependency] = []
         for item in data.get("dependencies", []) or []:
             if isinstance(item, str):
@@ -163,84 +227,89 @@ class PythonParser(BaseParser):
     # Parsers (lockfiles)
     # ----------------------
     def _parse_poetry_lock(self, path: Path) -> List[Dependency]:
-        if toml is None:
-            return []
-        data = toml.loads(path.read_text(encoding="utf-8"))
-        pkgs = data.get("package", [])  # [[package]] array of tables
+        content = path.read_text(encoding="utf-8")
+        # Poetry writes name and version first in every [[package]] table, so
+        # the large files/metadata tables never need to be parsed
+        entries = [m.groups() for m in _POETRY_ENTRY.finditer(content)]
+        if not entries:
+            # Not laid out the way Poetry writes it; fall back to a full parse
+            pkgs = toml_loads(content).get("package", [])  # [[package]] array of tables
+            entries = [(p.get("name"), p.get("version", "latest")) for p in pkgs]
         deps: List[Dependency] = []
-        for p in pkgs:
-            name = p.get("name")
-            version = p.get("version", "latest")
+        create_package = self.create_package
+        create_dependency = self.create_dependency
+        for name, version in entries:
             if not name:
                 continue
-            pkg = self.create_package(name=name, version=version)
-            deps.append(self.create_dependency(pkg, dependency_type=DependencyType.TRANSITIVE))
+            pkg = create_package(name=name, version=version)
+            deps.append(create_dependency(pkg, dependency_type=DependencyType.TRANSITIVE))
         return deps
 
     def _parse_pipfile_lock(self, path: Path) -> List[Dependency]:
-        data = json.loads(path.read_text(encoding="utf-8"))
+        data = json_loads(path.read_bytes())
         deps: List[Dependency] = []
+        create_package = self.create_package
+        create_dependency = self.create_dependency
         for section in ("default", "develop"):
             entries: Dict[str, Any] = data.get(section, {})
             for name, meta in entries.items():
                 ver = meta.get("version") or meta.get("ref") or "latest"
                 if isinstance(ver, str) and ver.startswith("=="):
                     ver = ver[2:]
-                pkg = self.create_package(name=name, version=ver)
-                deps.append(self.create_dependency(pkg, dependency_type=DependencyType.TRANSITIVE))
+                pkg = create_package(name=name, version=ver)
+                deps.append(create_dependency(pkg, dependency_type=DependencyType.TRANSITIVE))
         return deps
 
     def _parse_conda_lock(self, path: Path) -> List[Dependency]:
-        data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+        data = yaml_load_file(path) or {}
         deps: List[Dependency] = []
         # conda-lock schema contains a top-level "package" list
+        create_package = self.create_package
+        create_dependency = self.create_dependency
         for p in data.get("package", []) or []:
             name = p.get("name")
             version = p.get("version", "latest")
             if name:
-                pkg = self.create_package(name=name, version=version)
-                deps.append(self.create_dependency(pkg, dependency_type=DependencyType.TRANSITIVE))
+                pkg = create_package(name=name, version=version)
+                deps.append(create_dependency(pkg, dependency_type=DependencyType.TRANSITIVE))
         return deps
 
     def _parse_requirements_as_lock(self, path: Path) -> List[Dependency]:
         deps: List[Dependency] = []
-        for raw in path.read_text(encoding="utf-8").splitlines():
-            line = raw.strip()
-            if not line or line.startswith("#") or line.startswith("-r "):
-                continue
-            name, version = self._parse_requirement_line(line)
-            if not name:
-                continue
-            pkg = self.create_package(name=name, version=version or "latest")
-            deps.append(self.create_dependency(pkg, dependency_type=DependencyType.TRANSITIVE))
+        create_package = self.create_package
+        create_dependency = self.create_dependency
+        with path.open("r", encoding="utf-8", buffering=STREAM_BUFFER_SIZE) as f:
+            for line in _iter_requirement_lines(f):
+                name, version = self._parse_requirement_line(line)
+                if not name:
+                    continue
+                pkg = create_package(name=name, version=version or "latest")
+                deps.append(create_dependency(pkg, dependency_type=DependencyType.TRANSITIVE))
         return deps
 
     # ----------------------
     # Helpers
     # ----------------------
     def _parse_requirement_line(self, line: str) -> tuple[Optional[str], Optional[str]]:
+        # Fast path for the common plain "name==version" pin
+        if ";" not in line and "[" not in line and "===" not in line:
+            name, sep, version = line.partition("==")
+            name = name.strip()
+            if sep and name.replace("-", "").replace("_", "").replace(".", "").isalnum():
+                return name, version.strip() or None
         # Remove environment markers
         line = line.split(";")[0].strip()
         # Remove extras
-        line = re.sub(r"\[.*?\]", "", line)
+        line = _REQ_EXTRAS.sub("", line)
         # VCS/URL requirements are treated as latest
         if line.startswith(("git+", "http://", "https://")):
             name = line.split("#egg=")[-1] if "#egg=" in line else None
             return name, "latest" if name else (None, None)
 
-        # Order matters to avoid substring collisions
-        operators = ["===", "==", ">=", "<=", "~=", "!=", ">", "<", "="]
-        for op in operators:
-            if op in line:
-                parts = line.split(op, 1)
-                name = parts[0].strip()
-                version = parts[1].strip()
-                if version.startswith("="):
-                    version = version.lstrip("=")
-                return name or None, version or None
-
-        # No version specified
-        return line.strip() or None, None
+        match = _REQ_SPLIT.match(line)
+        if not match:
+            return None, None
+        return match.group(1), match.group(2) or None
 
     def _extract_poetry_version(self, spec: Any) -> Optional[str]:
         if isinstance(spec, str):
@@ -266,37 +335,27 @@ class PythonParser(BaseParser):
             return v
         return None
 
-    async def _resolve_pypi_requires_dist(self, client: httpx.AsyncClient, package: Package, seen: set, depth: int, max_depth: int = 2) -> List[Dependency]:
-        if depth > max_depth:
-            return []
-        deps: List[Dependency] = []
+    async def _fetch_pypi_requires_dist(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore, package: Package) -> List[str]:
+        """Get a package's requires_dist from PyPI; empty if it cannot be fetched."""
         name = package.name
         version = package.version if package.version and package.version != "latest" else "json"
 
+        requires = self._pypi_cache.get((name, version))
+        if requires is not None:
+            return requires
         try:
             if version == "json":
                 url = f"{self.pypi_api_json}/{name}/json"
             else:
                 url = f"{self.pypi_api_json}/{name}/{package.version}/json"
-            resp = await client.get(url, timeout=10.0)
+            async with semaphore:
+                resp = await client.get(url, timeout=10.0)
             if resp.status_code != 200:
                 return []
             data = resp.json()
             info = data.get("info", {})
-            requires: List[str] = info.get("requires_dist") or []
-            for req in requires:
-                child_name, child_version = self._parse_requirement_line(req)
-                if not child_name:
-                    continue
-                child_pkg = self.create_package(name=child_name, version=child_version or "latest")
-                if child_pkg.purl in seen:
-                    continue
-                seen.add(child_pkg.purl)
-                dep = self.create_dependency(package=child_pkg, dependency_type=DependencyType.TRANSITIVE, parent=package.purl, depth=depth)
-                deps.append(dep)
-                nested = await self._resolve_pypi_requires_dist(client, child_pkg, seen, depth+1, max_depth)
-                deps.extend(nested)
+            requires = info.get("requires_dist") or []
         except Exception:
             return []
-
-        return deps
+        self._pypi_cache[(name, version)] = requires
+        return requires
@@ -4,14 +4,27 @@ Ruby manifest parser for Bundler projects.
 
 from pathlib import Path
 import re
-import yaml
 from typing import List, Dict, Any
 import asyncio
 
-from .base import BaseParser
+from loguru import logger
+
+from .base import BaseParser, STREAM_BUFFER_SIZE
 from ..detectors import Language, PackageManager
 from ..models import Dependency, DependencyType, Package
 
+# Gemfile statements, matched against stripped lines
+_RE_GEM = re.compile(r"gem\s+['\"]([^'\"]+)['\"](?:\s*,\s*['\"]([^'\"]+)['\"])?")
+_RE_GROUP_OPEN = re.compile(r"group\s+(.*?)\s+do\b")
+_RE_SYMBOL = re.compile(r":(\w+)")
+# Any other construct closed by "end" (platforms/source/git blocks, conditionals)
+_RE_BLOCK_OPEN = re.compile(r"^(?:if|unless|case|begin)\b|\bdo(?:\s*\|[^|]*\|)?$")
+_RE_GROUP_END = re.compile(r"end\b")
+_DEV_GROUPS = frozenset({"development", "test"})
+
+# Gemfile.lock spec entry, e.g. "    rack (2.2.8)"
+_SPEC_LINE = re.compile(r"^    (\S+) \(([^)]+)\)")
+
 class RubyParser(BaseParser):
     """Parser for Ruby Bundler projects."""
     
@@ -22,6 +35,31 @@ class RubyParser(BaseParser):
     async def parse_manifest(self, manifest_path: Path) -> List[Dependency]:
         """Parse a Gemfile file.
         
+        The file is parsed in a worker thread so that many manifests can be
+        parsed concurrently; use ``parse_manifest_sync`` outside an event loop.
+        
+        Args:
+            manifest_path: Path to Gemfile file
+            
+        Returns:
+            List of direct dependencies
+        """
+        return await asyncio.to_thread(self.parse_manifest_sync, manifest_path)
+    
+    def parse_manifest_sync(self, manifest_path: Path) -> List[Dependency]:
+        """Parse a Gemfile file.
+        
+        Args:
+            manifest_path: Path to Gemfile file
+            
+        Returns:
+            List of direct dependencies
+        """
+        return self._cached_parse("manifest", manifest_path, self._parse_manifest_file)
+    
+    def _parse_manifest_file(self, manifest_path: Path) -> List[Dependency]:
+        """Parse a Gemfile file.
+        
         Args:
             manifest_path: Path to Gemfile file
             
@@ -34,55 +72,44 @@ class RubyParser(BaseParser):
         dependencies = []
         
         try:
-            content = self._read_file(manifest_path)
+            # Group names of every open block, innermost last; blocks that are
+            # not groups contribute an empty frame so each "end" pops one
+            frames: List[frozenset] = []
             
-            # Parse gem lines
-            # This is a simplified regex that may not catch all valid Gemfile formats
+            # This is a simplified line scanner that may not catch all valid Gemfile formats
             # For robust parsing, a proper Ruby parser would be needed
-            gem_pattern = r'gem\s+[\'"]([^\'"]+)[\'"](?:\s*,\s*[\'"]([^\'"]+)[\'"])?'
-            group_pattern = r'group\s+:(\w+)(?:\s*,\s*:(\w+))*\s+do(.*?)end'
-            
-            # Process regular gem lines
-            for match in re.finditer(gem_pattern, content):
-                name = match.group(1)
-                version = match.group(2) or ""
-                
-                package = self.create_package(
-                    name=name,
-                    version=version,
-                    description="",
-                    homepage="",
-                    repository_url=""
-                )
-                
-                dependencies.append(self.create_dependency(
-                    package=package,
-                    dependency_type=DependencyType.DIRECT,
-                    constraint=version
-                ))
-            
-            # Process grouped gems (e.g., development, test)
-            for group_match in re.finditer(group_pattern, content, re.DOTALL):
-                group_names = [g for g in group_match.groups()[:-1] if g]
-                group_content = group_match.group(len(group_match.groups()))
-                
-                # Check if this is a development/test group
-                is_dev_group = any(g in ["development", "test"] for g in group_names)
-                
-                # Find gems in this group
-                for gem_match in re.finditer(gem_pattern, group_content):
+            with manifest_path.open("r", encoding="utf-8", errors="replace", buffering=STREAM_BUFFER_SIZE) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line or line.startswith("#"):
+                        continue
+                    
+                    group_match = _RE_GROUP_OPEN.match(line)
+                    if group_match:
+                        frames.append(frozenset(_RE_SYMBOL.findall(group_match.group(1))))
+                        continue
+                    if _RE_BLOCK_OPEN.search(line):
+                        frames.append(frozenset())
+                        continue
+                    if _RE_GROUP_END.match(line):
+                        if frames:
+                            frames.pop()
+                        continue
+                    
+                    gem_match = _RE_GEM.match(line)
+                    if not gem_match:
+                        continue
+                    
                     name = gem_match.group(1)
                     version = gem_match.group(2) or ""
                     
                     package = self.create_package(
                         name=name,
-                        version=version,
-                        description="",
-                        homepage="",
-                        repository_url=""
+                        version=version
                     )
                     
                     # Use DEV dependency type for gems in development or test groups
+                    is_dev_group = any(frame & _DEV_GROUPS for frame in frames)
                     dep_type = DependencyType.DEV if is_dev_group else DependencyType.DIRECT
                     
                     dependencies.append(self.create_dependency(
@@ -93,13 +120,38 @@ class RubyParser(BaseParser):
                     
         except Exception as e:
             # Log error
-            print(f"Error parsing Gemfile {manifest_path}: {e}")
+            logger.warning("Error parsing Gemfile {}: {}", manifest_path, e)
             
         return dependencies
     
     async def parse_lockfile(self, lockfile_path: Path) -> List[Dependency]:
         """Parse a Gemfile.lock lockfile.
         
+        The file is parsed in a worker thread so that many lockfiles can be
+        parsed concurrently; use ``parse_lockfile_sync`` outside an event loop.
+        
+        Args:
+            lockfile_path: Path to Gemfile.lock file
+            
+        Returns:
+            List of all dependencies (direct and transitive)
+        """
+        return await asyncio.to_thread(self.parse_lockfile_sync, lockfile_path)
+    
+    def parse_lockfile_sync(self, lockfile_path: Path) -> List[Dependency]:
+        """Parse a Gemfile.lock lockfile.
+        
+        Args:
+            lockfile_path: Path to Gemfile.lock file
+            
+        Returns:
+            List of all dependencies (direct and transitive)
+        """
+        return self._cached_parse("lockfile", lockfile_path, self._parse_lockfile_file)
+    
+    def _parse_lockfile_file(self, lockfile_path: Path) -> List[Dependency]:
+        """Parse a Gemfile.lock lockfile.
+        
         Args:
             lockfile_path: Path to Gemfile.lock file
             
@@ -112,48 +164,56 @@ class RubyParser(BaseParser):
         dependencies = []
         
         try:
-            content = self._read_file(lockfile_path)
-            
             # Gemfile.lock has a specific format with GEM, PLATFORMS, and DEPENDENCIES sections
-            # Here we'll parse the "GEM" section to get all gems with versions
+            # Here we'll parse the "specs:" list of the "GEM" section to get all gems with
+            # versions, walking the file line by line. Sections end at a blank line.
+            in_gem = False
+            in_specs = False
             
-            # Find the GEM section
-            gem_section_match = re.search(r"GEM\n(.*?)(?:\n\n|\Z)", content, re.DOTALL)
-            if gem_section_match:
-                gem_section = gem_section_match.group(1)
-                
-                # Parse specs
-                specs_match = re.search(r"  specs:\n(.*?)(?:\n\n|\Z)", gem_section, re.DOTALL)
-                if specs_match:
-                    specs = specs_match.group(1)
+            create_package = self.create_package
+            create_dependency = self.create_dependency
+            with lockfile_path.open("r", encoding="utf-8", errors="replace", buffering=STREAM_BUFFER_SIZE) as f:
+                for line in f:
+                    line = line.rstrip("\n")
+                    if not line:
+                        in_gem = in_specs = False
+                        continue
+                    if not line.startswith(" "):
+                        # Section header
+                        in_gem = line == "GEM"
+                        in_specs = False
+                        continue
+                    if not in_gem:
+                        continue
+                    if line == "  specs:":
+                        in_specs = True
+                        continue
+                    # Lines indented by six spaces are the requirements of the gem above
+                    if not in_specs or line.startswith("      "):
+                        continue
                     
-                    # Each line with two spaces followed by name and version is a dependency
-                    for line in specs.split("\n"):
-                        # Match lines that look like "    name (version)"
-                        dep_match = re.match(r'    ([^ ]+) \(([^)]+)\)', line)
-                        if dep_match:
-                            name = dep_match.group(1)
-                            version = dep_match.group(2)
-                            
-                            package = self.create_package(
-                                name=name,
-                                version=version,
-                                description="",
-                                homepage="",
-                                repository_url=""
-                            )
-                            
-                            # We can't easily distinguish direct vs transitive in Gemfile.lock
-                            # without parsing the DEPENDENCIES section and checking against it
-                            dependencies.append(self.create_dependency(
-                                package=package,
-                                dependency_type=DependencyType.TRANSITIVE,  # Conservative assumption
-                                constraint=version
-                            ))
+                    # Match lines that look like "    name (version)"
+                    dep_match = _SPEC_LINE.match(line)
+                    if dep_match:
+                        name = dep_match.group(1)
+                        version = dep_match.group(2)
+                        
+                        package = create_package(
+                            name=name,
+                            version=version
+                        )
+                        
+                        # We can't easily distinguish direct vs transitive in Gemfile.lock
+                        # without parsing the DEPENDENCIES section and checking against it
+                        dependencies.append(create_dependency(
+                            package=package,
+                            dependency_type=DependencyType.TRANSITIVE,  # Conservative assumption
+                            constraint=version
+                        ))
                     
         except Exception as e:
             # Log error
-            print(f"Error parsing Gemfile.lock {lockfile_path}: {e}")
+            logger.warning("Error parsing Gemfile.lock {}: {}", lockfile_path, e)
             
         return dependencies
     
@@ -3,13 +3,32 @@ Rust manifest parser for Cargo projects.
 """
 
 from pathlib import Path
-import toml
 from typing import List, Dict, Any
 import asyncio
 
+from loguru import logger
+
 from .base import BaseParser
 from ..detectors import Language, PackageManager
 from ..models import Dependency, DependencyType, Package
+from ..serialization import toml_load_file
+
+
+def _constraint_version(constraint: Any) -> str:
+    """Version for a dependency entry, falling back to its git or path source."""
+    if isinstance(constraint, str):
+        return constraint
+    if not isinstance(constraint, dict):
+        return ""
+    version = constraint.get("version", "")
+    # Handle git dependencies
+    if "git" in constraint and not version:
+        version = f"git:{constraint['git']}"
+    # Handle path dependencies
+    elif "path" in constraint and not version:
+        version = f"path:{constraint['path']}"
+    return version
+
 
 class RustParser(BaseParser):
     """Parser for Rust Cargo projects."""
@@ -21,6 +40,31 @@ class RustParser(BaseParser):
     async def parse_manifest(self, manifest_path: Path) -> List[Dependency]:
         """Parse a Cargo.toml file.
         
+        The file is parsed in a worker thread so that many manifests can be
+        parsed concurrently; use ``parse_manifest_sync`` outside an event loop.
+        
+        Args:
+            manifest_path: Path to Cargo.toml file
+            
+        Returns:
+            List of direct dependencies
+        """
+        return await asyncio.to_thread(self.parse_manifest_sync, manifest_path)
+    
+    def parse_manifest_sync(self, manifest_path: Path) -> List[Dependency]:
+        """Parse a Cargo.toml file.
+        
+        Args:
+            manifest_path: Path to Cargo.toml file
+            
+        Returns:
+            List of direct dependencies
+        """
+        return self._cached_parse("manifest", manifest_path, self._parse_manifest_file)
+    
+    def _parse_manifest_file(self, manifest_path: Path) -> List[Dependency]:
+        """Parse a Cargo.toml file.
+        
         Args:
             manifest_path: Path to Cargo.toml file
             
@@ -34,109 +78,76 @@ class RustParser(BaseParser):
         
         try:
             # Parse TOML file
-            data = toml.loads(self._read_file(manifest_path))
-            
-            # Extract package metadata
-            package_name = data.get("package", {}).get("name", "")
-            package_version = data.get("package", {}).get("version", "0.0.0")
-            package_description = data.get("package", {}).get("description", "")
-            
-            # Process dependencies section
-            deps = data.get("dependencies", {})
-            for name, constraint in deps.items():
-                # Handle different dependency specification formats
-                version = ""
-                if isinstance(constraint, str):
-                    version = constraint
-                elif isinstance(constraint, dict):
-                    version = constraint.get("version", "")
-                    # Handle git dependencies
-                    if "git" in constraint and not version:
-                        version = f"git:{constraint['git']}"
-                    # Handle path dependencies
-                    elif "path" in constraint and not version:
-                        version = f"path:{constraint['path']}"
-                
-                package = self.create_package(
-                    name=name,
-                    version=version,
-                    description="",
-                    homepage="",
-                    repository_url=""
-                )
-                
-                dependencies.append(self.create_dependency(
-                    package=package,
-                    dependency_type=DependencyType.DIRECT,
-                    constraint=version
-                ))
-            
-            # Process dev-dependencies section
-            dev_deps = data.get("dev-dependencies", {})
-            for name, constraint in dev_deps.items():
-                # Handle different dependency specification formats
-                version = ""
-                if isinstance(constraint, str):
-                    version = constraint
-                elif isinstance(constraint, dict):
-                    version = constraint.get("version", "")
-                    # Handle git dependencies
-                    if "git" in constraint and not version:
-                        version = f"git:{constraint['git']}"
-                    # Handle path dependencies
-                    elif "path" in constraint and not version:
-                        version = f"path:{constraint['path']}"
-                
-                package = self.create_package(
-                    name=name,
-                    version=version,
-                    description="",
-                    homepage="",
-                    repository_url=""
-                )
-                
-                dependencies.append(self.create_dependency(
-                    package=package,
-                    dependency_type=DependencyType.DEV,
-                    constraint=version
-                ))
+            data = toml_load_file(manifest_path)
             
-            # Handle workspace dependencies if present
-            workspace_deps = {}
-            if "workspace" in data and "dependencies" in data["workspace"]:
-                workspace_deps = data["workspace"]["dependencies"]
-                
-            for name, constraint in workspace_deps.items():
-                # Handle different dependency specification formats
-                version = ""
-                if isinstance(constraint, str):
-                    version = constraint
-                elif isinstance(constraint, dict):
-                    version = constraint.get("version", "")
-                
-                package = self.create_package(
-                    name=name,
-                    version=version,
-                    description="",
-                    homepage="",
-                    repository_url=""
-                )
-                
-                dependencies.append(self.create_dependency(
-                    package=package,
-                    dependency_type=DependencyType.DIRECT,
-                    constraint=version
-                ))
+            # Process dependencies, dev-dependencies and workspace dependencies
+            dependencies.extend(self._section_dependencies(data.get("dependencies", {}), DependencyType.DIRECT))
+            dependencies.extend(self._section_dependencies(data.get("dev-dependencies", {}), DependencyType.DEV))
+            # Most crates are not workspace roots
+            workspace = data.get("workspace")
+            workspace_deps = workspace.get("dependencies") if workspace else None
+            if workspace_deps:
+                dependencies.extend(self._section_dependencies(workspace_deps, DependencyType.DIRECT))
                 
         except Exception as e:
             # Log error
-            print(f"Error parsing Cargo.toml file {manifest_path}: {e}")
+            logger.warning("Error parsing Cargo.toml file {}: {}", manifest_path, e)
             
         return dependencies
     
+    def _section_dependencies(self, section: Dict[str, Any], dependency_type: DependencyType) -> List[Dependency]:
+        """Build dependencies from one Cargo.toml dependency table.
+        
+        Args:
+            section: Table mapping crate names to version strings or detail tables
+            dependency_type: Type of dependency
+            
+        Returns:
+            List of dependencies
+        """
+        create_package = self.create_package
+        create_dependency = self.create_dependency
+        return [
+            create_dependency(
+                package=create_package(
+                    name=name,
+                    version=version
+                ),
+                dependency_type=dependency_type,
+                constraint=version
+            )
+            for name, constraint in section.items()
+            for version in (_constraint_version(constraint),)
+        ]
+    
     async def parse_lockfile(self, lockfile_path: Path) -> List[Dependency]:
         """Parse a Cargo.lock lockfile.
         
+        The file is parsed in a worker thread so that many lockfiles can be
+        parsed concurrently; use ``parse_lockfile_sync`` outside an event loop.
+        
+        Args:
+            lockfile_path: Path to Cargo.lock file
+            
+        Returns:
+            List of all dependencies (direct and transitive)
+        """
+        return await asyncio.to_thread(self.parse_lockfile_sync, lockfile_path)
+    
+    def parse_lockfile_sync(self, lockfile_path: Path) -> List[Dependency]:
+        """Parse a Cargo.lock lockfile.
+        
+        Args:
+            lockfile_path: Path to Cargo.lock file
+            
+        Returns:
+            List of all dependencies (direct and transitive)
+        """
+        return self._cached_parse("lockfile", lockfile_path, self._parse_lockfile_file)
+    
+    def _parse_lockfile_file(self, lockfile_path: Path) -> List[Dependency]:
+        """Parse a Cargo.lock lockfile.
+        
         Args:
             lockfile_path: Path to Cargo.lock file
             
@@ -150,36 +161,36 @@ class RustParser(BaseParser):
         
         try:
             # Parse TOML file
-            data = toml.loads(self._read_file(lockfile_path))
+            data = toml_load_file(lockfile_path)
             
             # Process packages
             # Cargo.lock has a list of packages in TOML format
             packages = data.get("package", [])
+            pairs = [
+                (name, version)
+                for package_info in packages
+                if (name := package_info.get("name", "")) and (version := package_info.get("version", ""))
+            ]
             
-            for package_info in packages:
-                name = package_info.get("name", "")
-                version = package_info.get("version", "")
-                
-                if name and version:
-                    package = self.create_package(
+            # Lockfiles contain all dependencies (direct and transitive)
+            # Without additional info, we assume transitive to be conservative
+            create_package = self.create_package
+            create_dependency = self.create_dependency
+            dependencies = [
+                create_dependency(
+                    package=create_package(
                         name=name,
-                        version=version,
-                        description="",
-                        homepage="",
-                        repository_url=""
-                    )
-                    
-                    # Lockfiles contain all dependencies (direct and transitive)
-                    # Without additional info, we assume transitive to be conservative
-                    dependencies.append(self.create_dependency(
-                        package=package,
-                        dependency_type=DependencyType.TRANSITIVE,
-                        constraint=version
-                    ))
+                        version=version
+                    ),
+                    dependency_type=DependencyType.TRANSITIVE,
+                    constraint=version
+                )
+                for name, version in pairs
+            ]
                     
         except Exception as e:
             # Log error
-            print(f"Error parsing Cargo.lock file {lockfile_path}: {e}")
+            logger.warning("Error parsing Cargo.lock file {}: {}", lockfile_path, e)
             
         return dependencies
     
@@ -3,18 +3,50 @@ SBOM (Software Bill of Materials) generator.
 """
 
 import asyncio
-import json
+import hashlib
+import os
+from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, FrozenSet, Optional, Tuple
 from loguru import logger
 
 from .models import SBOM, Package, Dependency, ScanResult, DependencyType
 from .detectors import LanguageDetector, DetectedManifest, Language, PackageManager
+from .serialization import json_aiter_array
 from .parsers import (
     BaseParser, JavaScriptParser, PythonParser, JavaParser, 
     GoParser, RustParser, RubyParser, CppParser, CSharpParser
 )
 
+# Lockfile names to look for next to a manifest, in order of preference
+_LOCKFILE_NAMES: Dict[PackageManager, Tuple[str, ...]] = {
+    PackageManager.NPM: ("package-lock.json",),
+    PackageManager.YARN: ("yarn.lock",),
+    PackageManager.PNPM: ("pnpm-lock.yaml",),
+    PackageManager.PIP: ("requirements.lock", "pip.lock"),
+    PackageManager.POETRY: ("poetry.lock",),
+    PackageManager.PIPENV: ("Pipfile.lock",),
+    PackageManager.CONDA: ("conda-lock.yml", "conda-lock.yaml"),
+    PackageManager.MAVEN: ("maven.lock",),
+    PackageManager.GRADLE: ("gradle.lockfile",),
+    PackageManager.GO_MODULES: ("go.sum",),
+    PackageManager.CARGO: ("Cargo.lock",),
+    PackageManager.BUNDLER: ("Gemfile.lock",),
+}
+
+# Seconds to wait for syft to exit once its output has been read
+_SYFT_EXIT_TIMEOUT = 30
+
+
+def _list_files(directory: Path) -> FrozenSet[str]:
+    """Names of the regular files in a directory; empty if it cannot be read."""
+    try:
+        with os.scandir(directory) as entries:
+            return frozenset(entry.name for entry in entries if entry.is_file())
+    except OSError:
+        return frozenset()
+
+
 class SBOMGenerator:
     """Generates Software Bill of Materials from project directories."""
     
@@ -22,6 +54,17 @@ class SBOMGenerator:
         """Initialize SBOM generator."""
         self.detector = LanguageDetector()
         self.parsers = self._initialize_parsers()
+        # Same parsers keyed by enum value: Enum.__hash__ runs in Python,
+        # while str hashes are cached, so per-manifest lookups use this
+        self._parsers_by_value: Dict[str, BaseParser] = {
+            package_manager._value_: parser for package_manager, parser in self.parsers.items()
+        }
+        # Transitive resolutions keyed by package manager and a digest of
+        # the direct dependency set, so identical sets are resolved once
+        self._transitive_cache: Dict[Tuple[PackageManager, bytes], List[Dependency]] = {}
+        # Finished SBOMs keyed by a digest of the project's manifest and
+        # lockfile contents and the include_transitive flag
+        self._sbom_cache: Dict[Tuple[str, bool], SBOM] = {}
     
     def _initialize_parsers(self) -> Dict[PackageManager, BaseParser]:
         """Initialize parsers for different package managers.
@@ -64,22 +107,26 @@ class SBOMGenerator:
     
     async def generate_sbom(self, project_path: Path, 
                           project_name: Optional[str] = None,
-                          include_transitive: bool = True) -> SBOM:
+                          include_transitive: bool = True,
+                          package_queue: Optional[asyncio.Queue] = None) -> SBOM:
         """Generate SBOM for a project directory.
         
         Args:
             project_path: Path to project directory
             project_name: Optional project name
             include_transitive: Whether to include transitive dependencies
+            package_queue: Optional queue that receives each unique package as
+                soon as its manifest is parsed, so consumers can start work
+                before the whole SBOM is ready
             
         Returns:
             Generated SBOM
         """
-        logger.info(f"Generating SBOM for project: {project_path}")
+        logger.info("Generating SBOM for project: {}", project_path)
         
         # Detect manifests in the project
         manifests = self.detector.detect_manifests(project_path)
-        logger.info(f"Detected {len(manifests)} manifest files")
+        logger.info("Detected {} manifest files", len(manifests))
         
         if not manifests:
             logger.warning("No supported manifest files found")
@@ -88,6 +135,28 @@ class SBOMGenerator:
                 project_path=str(project_path)
             )
         
+        # File names per directory, listed once and shared by all manifests
+        dir_entries: Dict[Path, FrozenSet[str]] = {}
+        
+        # Reuse the previous SBOM when no manifest or lockfile has changed
+        digest = await asyncio.to_thread(self._project_digest, project_path, manifests, dir_entries)
+        cache_key = (digest, include_transitive) if digest is not None else None
+        cached = self._sbom_cache.get(cache_key) if cache_key is not None else None
+        if cached is not None:
+            logger.info("Project manifests unchanged, reusing SBOM with {} packages", cached.total_packages)
+            if package_queue is not None:
+                for package in cached.packages:
+                    package_queue.put_nowait(package)
+            return cached.model_copy(update={
+                "timestamp": datetime.utcnow(),
+                "project_name": project_name or project_path.name,
+                "project_path": str(project_path),
+                "packages": list(cached.packages),
+                "dependencies": list(cached.dependencies),
+                "languages": set(cached.languages),
+                "package_managers": set(cached.package_managers),
+            })
+        
         # Initialize SBOM
         sbom = SBOM(
             project_name=project_name or project_path.name,
@@ -96,12 +165,19 @@ class SBOMGenerator:
         
         # Parse manifests in parallel
         parse_tasks = []
+        published_purls = set()
+        failed = False
         for manifest in manifests:
-            if manifest.package_manager in self.parsers:
-                task = self._parse_manifest(manifest, include_transitive)
+            if manifest.package_manager._value_ in self._parsers_by_value:
+                if package_queue is None:
+                    task = self._parse_manifest(manifest, include_transitive, dir_entries)
+                else:
+                    task = self._parse_and_publish(
+                        manifest, include_transitive, package_queue, published_purls, dir_entries
+                    )
                 parse_tasks.append(task)
             else:
-                logger.warning(f"No parser available for {manifest.package_manager}")
+                logger.warning("No parser available for {}", manifest.package_manager)
         
         # Execute parsing tasks
         if parse_tasks:
@@ -110,28 +186,99 @@ class SBOMGenerator:
             # Process results
             for i, result in enumerate(results):
                 if isinstance(result, Exception):
-                    logger.error(f"Failed to parse manifest {manifests[i].path}: {result}")
+                    logger.error("Failed to parse manifest {}: {}", manifests[i].path, result)
+                    failed = True
                     continue
                 
-                dependencies = result
-                for dependency in dependencies:
-                    sbom.add_package(dependency.package, dependency)
+                sbom.add_packages_bulk((dependency.package, dependency) for dependency in result)
+        
+        # Partial results are not cached so that failures are retried
+        if cache_key is not None and not failed:
+            self._sbom_cache[cache_key] = sbom.model_copy(update={
+                "packages": list(sbom.packages),
+                "dependencies": list(sbom.dependencies),
+                "languages": set(sbom.languages),
+                "package_managers": set(sbom.package_managers),
+            })
         
-        logger.info(f"Generated SBOM with {sbom.total_packages} packages")
+        logger.info("Generated SBOM with {} packages", sbom.total_packages)
         return sbom
     
+    def _project_digest(self, project_path: Path, manifests: List[DetectedManifest],
+                        dir_entries: Dict[Path, FrozenSet[str]]) -> Optional[str]:
+        """Digest of the contents of a project's manifests and their lockfiles.
+        
+        Args:
+            project_path: Path to project directory
+            manifests: Detected manifests
+            dir_entries: Directory listings to reuse and extend
+            
+        Returns:
+            Hex digest, or None if a file could not be read
+        """
+        paths = {manifest.path for manifest in manifests}
+        for manifest in manifests:
+            if manifest.manifest_type != "lockfile":
+                lockfile_path = self._find_lockfile(manifest, dir_entries)
+                if lockfile_path:
+                    paths.add(lockfile_path)
+        
+        h = hashlib.blake2b()
+        try:
+            for path in sorted(paths):
+                content = path.read_bytes()
+                # Length-prefix each entry so that path and content
+                # boundaries are unambiguous
+                name = os.fsencode(os.path.relpath(path, project_path))
+                h.update(len(name).to_bytes(4, "little"))
+                h.update(name)
+                h.update(len(content).to_bytes(8, "little"))
+                h.update(content)
+        except OSError:
+            return None
+        return h.hexdigest()
+    
+    async def _parse_and_publish(self, manifest: DetectedManifest,
+                               include_transitive: bool,
+                               package_queue: asyncio.Queue,
+                               published_purls: set,
+                               dir_entries: Optional[Dict[Path, FrozenSet[str]]] = None) -> List[Dependency]:
+        """Parse a manifest and push newly seen packages onto a queue.
+        
+        Args:
+            manifest: Detected manifest information
+            include_transitive: Whether to include transitive dependencies
+            package_queue: Queue receiving each unique package
+            published_purls: PURLs already pushed during this run
+            dir_entries: Directory listings shared across this run
+            
+        Returns:
+            List of dependencies
+        """
+        dependencies = await self._parse_manifest(manifest, include_transitive, dir_entries)
+        
+        for dependency in dependencies:
+            purl = dependency.package.purl
+            if purl not in published_purls:
+                published_purls.add(purl)
+                package_queue.put_nowait(dependency.package)
+        
+        return dependencies
+    
     async def _parse_manifest(self, manifest: DetectedManifest, 
-                            include_transitive: bool) -> List[Dependency]:
+                            include_transitive: bool,
+                            dir_entries: Optional[Dict[Path, FrozenSet[str]]] = None) -> List[Dependency]:
         """Parse a single manifest file.
         
         Args:
             manifest: Detected manifest information
             include_transitive: Whether to include transitive dependencies
+            dir_entries: Directory listings shared across this run
             
         Returns:
             List of dependencies
         """
-        parser = self.parsers[manifest.package_manager]
+        parser = self._parsers_by_value[manifest.package_manager._value_]
         dependencies = []
         
         try:
@@ -145,56 +292,82 @@ class SBOMGenerator:
                 # Resolve transitive dependencies if requested
                 if include_transitive:
                     # Look for corresponding lockfile first
-                    lockfile_path = self._find_lockfile(manifest)
-                    if lockfile_path and lockfile_path.exists():
+                    lockfile_path = self._find_lockfile(manifest, dir_entries)
+                    if lockfile_path:
                         # Use lockfile for complete dependency tree
                         lockfile_deps = await parser.parse_lockfile(lockfile_path)
                         dependencies.extend(lockfile_deps)
                     else:
                         # Resolve transitive dependencies via API
-                        transitive_deps = await parser.resolve_transitive_dependencies(dependencies)
-                        dependencies = transitive_deps
+                        dependencies = await self._resolve_transitive(manifest.package_manager, dependencies)
             
-            logger.info(f"Parsed {len(dependencies)} dependencies from {manifest.path}")
+            logger.info("Parsed {} dependencies from {}", len(dependencies), manifest.path)
             
         except Exception as e:
-            logger.error(f"Failed to parse {manifest.path}: {e}")
+            logger.error("Failed to parse {}: {}", manifest.path, e)
             raise
         
         return dependencies
     
-    def _find_lockfile(self, manifest: DetectedManifest) -> Optional[Path]:
+    async def _resolve_transitive(self, package_manager: PackageManager,
+                                  dependencies: List[Dependency]) -> List[Dependency]:
+        """Resolve transitive dependencies, reusing earlier results.
+        
+        Manifests with the same direct dependencies, common across similar
+        services in a monorepo, are resolved only once per generator.
+        
+        Args:
+            package_manager: Package manager of the manifest
+            dependencies: List of direct dependencies
+            
+        Returns:
+            List of all dependencies (direct and transitive)
+        """
+        digest = hashlib.blake2b(
+            b"\n".join(sorted(
+                f"{d.package.name}=={d.package.version}".encode() for d in dependencies
+            )),
+            digest_size=16
+        ).digest()
+        key = (package_manager, digest)
+        cached = self._transitive_cache.get(key)
+        if cached is None:
+            parser = self._parsers_by_value[package_manager._value_]
+            direct_ids = {id(d) for d in dependencies}
+            resolved = await parser.resolve_transitive_dependencies(dependencies)
+            # Only the additions are shared; each manifest keeps its own direct
+            # entries, whose type, scope and parent may differ for the same pins
+            cached = [d for d in resolved if id(d) not in direct_ids]
+            self._transitive_cache[key] = cached
+        return list(dependencies) + cached
+    
+    def _find_lockfile(self, manifest: DetectedManifest,
+                       dir_entries: Optional[Dict[Path, FrozenSet[str]]] = None) -> Optional[Path]:
         """Find corresponding lockfile for a manifest.
         
+        The manifest's directory is listed once with ``os.scandir`` and the
+        candidates are checked against that listing instead of one ``stat``
+        per candidate.
+        
         Args:
             manifest: Detected manifest
+            dir_entries: Directory listings to reuse and extend
             
         Returns:
             Path to lockfile if found
         """
         manifest_dir = manifest.path.parent
         
-        # Mapping of package managers to their lockfiles
-        lockfile_names = {
-            PackageManager.NPM: ["package-lock.json"],
-            PackageManager.YARN: ["yarn.lock"],
-            PackageManager.PNPM: ["pnpm-lock.yaml"],
-            PackageManager.PIP: ["requirements.lock", "pip.lock"],
-            PackageManager.POETRY: ["poetry.lock"],
-            PackageManager.PIPENV: ["Pipfile.lock"],
-            PackageManager.CONDA: ["conda-lock.yml", "conda-lock.yaml"],
-            PackageManager.MAVEN: ["maven.lock"],
-            PackageManager.GRADLE: ["gradle.lockfile"],
-            PackageManager.GO_MODULES: ["go.sum"],
-            PackageManager.CARGO: ["Cargo.lock"],
-            PackageManager.BUNDLER: ["Gemfile.lock"],
-        }
+        if dir_entries is None:
+            dir_entries = {}
+        names = dir_entries.get(manifest_dir)
+        if names is None:
+            names = _list_files(manifest_dir)
+            dir_entries[manifest_dir] = names
         
-        if manifest.package_manager in lockfile_names:
-            for lockfile_name in lockfile_names[manifest.package_manager]:
-                lockfile_path = manifest_dir / lockfile_name
-                if lockfile_path.exists():
-                    return lockfile_path
+        for lockfile_name in _LOCKFILE_NAMES.get(manifest.package_manager, ()):
+            if lockfile_name in names:
+                return manifest_dir / lockfile_name
         
         return None
     
@@ -202,7 +375,7 @@ class SBOMGenerator:
         """Generate SBOM from a container image using Syft JSON output.
         Requires `syft` to be installed and available on PATH.
         """
-        logger.info(f"Generating container SBOM for image: {container_image}")
+        logger.info("Generating container SBOM for image: {}", container_image)
         sbom = SBOM(project_name=container_image, project_path=container_image)
 
         try:
@@ -211,48 +384,106 @@ class SBOMGenerator:
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
             )
-            stdout, stderr = await proc.communicate()
-            if proc.returncode != 0:
-                logger.error(f"Syft failed for {container_image}: {stderr.decode().strip()}")
-                return sbom
-
-            data = json.loads(stdout.decode() or "{}")
-            artifacts = data.get("artifacts", [])
+            # Drain stderr alongside stdout so neither pipe can fill and stall syft
+            stderr_task = asyncio.create_task(proc.stderr.read())
 
+            # Artifacts are decoded one at a time as syft writes them, so the
+            # full document is never held in memory
             count = 0
-            for art in artifacts:
-                name = (art.get("name") or "").strip()
-                version = (art.get("version") or "").strip()
-                if not name or not version:
-                    continue
+            parse_error = None
+            # Hoisted out of the per-artifact loop
+            make_package = Package
+            make_dependency = Dependency
+            pairs = []
+            add_pair = pairs.append
+            direct = DependencyType.DIRECT
+            try:
+                async for art in json_aiter_array(proc.stdout, "artifacts"):
+                    get = art.get
+                    name = (get("name") or "").strip()
+                    version = (get("version") or "").strip()
+                    if not name or not version:
+                        continue
 
-                language = (art.get("language") or "unknown").lower()
-                pkg_type = (art.get("type") or "unknown").lower()
+                    package = make_package(
+                        name=name,
+                        version=version,
+                        language=(get("language") or "unknown").lower(),
+                        package_manager=(get("type") or "unknown").lower(),
+                    )
+                    add_pair((package, make_dependency(
+                        package=package,
+                        dependency_type=direct,
+                        scope="runtime",
+                        depth=0,
+                    )))
+                    count += 1
+            except Exception as e:
+                parse_error = e
+                # Nothing reads stdout any more, so syft would block on a full pipe
+                if proc.returncode is None:
+                    try:
+                        proc.kill()
+                    except ProcessLookupError:
+                        pass
+            sbom.add_packages_bulk(pairs)
 
-                package = Package(
-                    name=name,
-                    version=version,
-                    language=language,
-                    package_manager=pkg_type,
-                )
-                dependency = Dependency(
-                    package=package,
-                    dependency_type=DependencyType.DIRECT,
-                    scope="runtime",
-                    depth=0,
-                )
-                sbom.add_package(package, dependency)
-                count += 1
+            try:
+                stderr = await asyncio.wait_for(stderr_task, _SYFT_EXIT_TIMEOUT)
+                await asyncio.wait_for(proc.wait(), _SYFT_EXIT_TIMEOUT)
+            except asyncio.TimeoutError:
+                proc.kill()
+                stderr_task.cancel()
+                raise
+            # A negative return code is the kill above, not a syft failure
+            if proc.returncode > 0 or (proc.returncode < 0 and parse_error is None):
+                logger.error("Syft failed for {}: {}", container_image, stderr.decode().strip())
+                return SBOM(project_name=container_image, project_path=container_image)
+            if parse_error is not None:
+                raise parse_error
 
-            logger.info(f"Container SBOM generated with {count} packages for {container_image}")
+            logger.info("Container SBOM generated with {} packages for {}", count, container_image)
             return sbom
         except FileNotFoundError:
             logger.error("Syft not found. Install from https://github.com/anchore/syft")
             return sbom
         except Exception as e:
-            logger.error(f"Failed to generate container SBOM for {container_image}: {e}")
+            logger.error("Failed to generate container SBOM for {}: {}", container_image, e)
             return sbom
-    
+
+    async def generate_sboms_from_containers(self, container_images: List[str],
+                                             concurrency: Optional[int] = None) -> List[SBOM]:
+        """Generate SBOMs for multiple container images, running Syft in parallel.
+
+        Args:
+            container_images: Container image references
+            concurrency: Maximum number of concurrent Syft processes;
+                defaults to the CPU count
+
+        Returns:
+            List of generated SBOMs, in the order of ``container_images``
+        """
+        concurrency = concurrency or os.cpu_count() or 1
+        logger.info("Generating container SBOMs for {} images", len(container_images))
+
+        # Same fixed worker pool as ParallelSBOMGenerator.generate_sbom_parallel;
+        # generate_sbom_from_container handles its own errors
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in enumerate(container_images):
+            queue.put_nowait(item)
+        sboms: List[SBOM] = [None] * len(container_images)
+
+        async def worker() -> None:
+            while True:
+                try:
+                    index, image = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                sboms[index] = await self.generate_sbom_from_container(image)
+
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, len(container_images)))))
+        return sboms
+
     def get_supported_languages(self) -> List[Language]:
         """Get list of supported programming languages.
         
@@ -314,28 +545,38 @@ class ParallelSBOMGenerator(SBOMGenerator):
         Returns:
             List of generated SBOMs
         """
-        logger.info(f"Generating SBOMs for {len(project_paths)} projects in parallel")
+        logger.info("Generating SBOMs for {} projects in parallel", len(project_paths))
         
-        # Create semaphore to limit concurrent operations
-        semaphore = asyncio.Semaphore(self.max_workers)
+        # A fixed pool of workers drains a queue of paths, so at most
+        # max_workers generations (and their coroutines) exist at once
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in enumerate(project_paths):
+            queue.put_nowait(item)
+        sboms: List[object] = [None] * len(project_paths)
         
-        async def generate_with_semaphore(path: Path) -> SBOM:
-            async with semaphore:
-                return await self.generate_sbom(path)
+        async def worker() -> None:
+            while True:
+                try:
+                    index, path = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    sboms[index] = await self.generate_sbom(path)
+                except Exception as e:
+                    sboms[index] = e
         
         # Execute SBOM generation in parallel
-        tasks = [generate_with_semaphore(path) for path in project_paths]
-        sboms = await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.gather(*(worker() for _ in range(min(self.max_workers, len(project_paths)))))
         
         # Filter out exceptions and log errors
         valid_sboms = []
         for i, sbom in enumerate(sboms):
             if isinstance(sbom, Exception):
-                logger.error(f"Failed to generate SBOM for {project_paths[i]}: {sbom}")
+                logger.error("Failed to generate SBOM for {}: {}", project_paths[i], sbom)
             else:
                 valid_sboms.append(sbom)
         
-        logger.info(f"Successfully generated {len(valid_sboms)} SBOMs")
+        logger.info("Successfully generated {} SBOMs", len(valid_sboms))
         return valid_sboms
 
     def get_supported_languages(self) -> List[Language]:
@@ -0,0 +1,211 @@
+"""
+JSON, TOML, YAML and worker payload helpers that use orjson, ijson, rtoml,
+libyaml and msgpack when they are installed.
+"""
+
+import codecs
+import json
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterator, Optional, Tuple, Union
+
+import yaml
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:  # Python 3.11+
+    import tomllib
+except ImportError:
+    import tomli as tomllib
+
+try:  # Native parser; tomllib is pure Python and much slower on large lockfiles
+    import rtoml
+except ImportError:
+    rtoml = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """Decode a JSON document from text or UTF-8 bytes.
+
+    A leading UTF-8 byte order mark, as written by some Windows tooling, is
+    ignored.
+
+    Args:
+        data: JSON document
+
+    Returns:
+        Decoded Python object
+    """
+    if isinstance(data, bytes) and data.startswith(codecs.BOM_UTF8):
+        data = data[len(codecs.BOM_UTF8):]
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(data: Any, indent: bool = False) -> str:
+    """Encode JSON-compatible data as text.
+
+    Callers are expected to pass plain data, e.g. ``model_dump(mode="json")``.
+
+    Args:
+        data: Data to encode
+        indent: Whether to pretty-print with two-space indentation
+
+    Returns:
+        JSON document
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(data, option=option).decode("utf-8")
+    return json.dumps(data, indent=2 if indent else None)
+
+
+# Codec this process can decode worker payloads with; sent to workers so they
+# only encode results in a format the caller understands
+PAYLOAD_CODEC: Optional[str] = "msgpack" if msgpack is not None else None
+
+
+def pack_payload(data: Any, codec: Optional[str]) -> Any:
+    """Encode JSON-compatible data for a worker boundary.
+
+    Args:
+        data: Data to encode, e.g. ``model_dump(mode="json")``
+        codec: Codec requested by the receiver, as in ``PAYLOAD_CODEC``
+
+    Returns:
+        msgpack bytes if requested and available, otherwise ``data`` itself
+    """
+    if codec == "msgpack" and msgpack is not None:
+        return msgpack.packb(data, use_bin_type=True)
+    return data
+
+
+def unpack_payload(payload: Any) -> Any:
+    """Decode a worker payload produced by ``pack_payload``.
+
+    Args:
+        payload: msgpack bytes, or already decoded data
+
+    Returns:
+        Decoded Python object
+    """
+    if isinstance(payload, bytes):
+        return msgpack.unpackb(payload, raw=False)
+    return payload
+
+
+def json_iter_items(path: Path, prefix: str) -> Iterator[Tuple[str, Any]]:
+    """Iterate the key/value pairs of one object inside a JSON file.
+
+    With ijson installed the file is streamed and only the current value is
+    held in memory; otherwise the whole document is decoded first.
+
+    Args:
+        path: Path to JSON file
+        prefix: Dotted path of the object to iterate, e.g. ``"graph_lock.nodes"``
+
+    Returns:
+        Iterator over ``(key, value)`` pairs; empty if the object is missing
+    """
+    if ijson is not None:
+        with open(path, "rb") as f:
+            if f.read(len(codecs.BOM_UTF8)) != codecs.BOM_UTF8:
+                f.seek(0)
+            yield from ijson.kvitems(f, prefix)
+        return
+
+    data = json_loads(path.read_bytes())
+    for key in prefix.split("."):
+        data = data.get(key) if isinstance(data, dict) else None
+    if isinstance(data, dict):
+        yield from data.items()
+
+
+async def json_aiter_array(stream: Any, path: str) -> AsyncIterator[Any]:
+    """Iterate the elements of one array inside a JSON stream.
+
+    ``stream`` is any object with an async ``read(n)`` method, such as a
+    subprocess's stdout. With ijson installed elements are decoded one at a
+    time as the data arrives; otherwise the whole stream is read first.
+
+    Args:
+        stream: Async byte stream holding a JSON document
+        path: Dotted path of the array to iterate, e.g. ``"artifacts"``
+
+    Returns:
+        Async iterator over array elements; empty if the array is missing
+    """
+    if ijson is not None:
+        async for item in ijson.items_async(stream, f"{path}.item"):
+            yield item
+        return
+
+    data = json_loads(await stream.read() or b"{}")
+    for key in path.split("."):
+        data = data.get(key) if isinstance(data, dict) else None
+    if isinstance(data, list):
+        for item in data:
+            yield item
+
+def toml_loads(text: str) -> Any:
+    """Decode a TOML document, using rtoml when available.
+
+    Args:
+        text: TOML document
+
+    Returns:
+        Decoded table
+    """
+    if rtoml is not None:
+        return rtoml.loads(text)
+    return tomllib.loads(text)
+
+
+def toml_load_file(path: Path) -> Any:
+    """Decode a TOML file, using rtoml when available.
+
+    Args:
+        path: Path to TOML file
+
+    Returns:
+        Decoded table
+    """
+    if rtoml is not None:
+        return rtoml.loads(path.read_text(encoding="utf-8"))
+    # tomllib decodes the bytes itself
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+def yaml_load_file(path: Path) -> Any:
+    """Safely decode a YAML file, using the libyaml loader when available.
+
+    The file is passed to the loader as bytes, which detects the encoding
+    itself.
+
+    Args:
+        path: Path to YAML file
+
+    Returns:
+        Decoded Python object, or None for an empty document
+    """
+    with open(path, "rb") as f:
+        return yaml.load(f, Loader=_YamlLoader)
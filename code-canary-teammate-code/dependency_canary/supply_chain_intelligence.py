@@ -4,13 +4,45 @@ Supply chain intelligence gathering using free APIs.
 
 import asyncio
 import re
+import time
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass, asdict
+from typing import Awaitable, List, Dict, Any, Optional, Tuple
+from dataclasses import dataclass, field, replace
 import httpx
 from loguru import logger
 
+try:  # C++ edit distance, much faster than the pure-Python fallback
+    from rapidfuzz.distance import Levenshtein
+except ImportError:
+    Levenshtein = None
+
+try:  # Linear-time DFA matching, immune to catastrophic backtracking
+    import re2
+except ImportError:
+    re2 = None
+
+from .http_client import get_shared_client, request_with_retry
 from .models import Package
+from .serialization import json_loads
+
+# How long, in seconds, registry results are reused, and how many are kept
+INTEL_CACHE_TTL = 3600.0
+INTEL_CACHE_SIZE = 4096
+
+# Most packages the npm downloads API accepts in one bulk query
+NPM_BULK_DOWNLOADS_LIMIT = 128
+
+# Suspicious naming patterns, fused into one case-insensitive alternation;
+# the inline (?i) flag is understood by both re and re2
+_SUSPICIOUS_NAME = (re2 or re).compile(
+    "(?i)" + "|".join(f"(?:{pattern})" for pattern in (
+        r".*test.*", r".*temp.*", r".*debug.*",  # Test/temp packages
+        r"[0-9]+$",  # Packages ending in numbers
+        r".*[_-](utils?|helpers?|tools?)$",  # Generic utility names
+        r"^[a-z]{1,3}$",  # Very short names (often squatted)
+        r".*[_-]v?[0-9]+[_-].*",  # Version numbers in package names
+    ))
+)
 
 
 @dataclass
@@ -23,9 +55,9 @@ class PackageIntelligence:
     # Registry data
     weekly_downloads: Optional[int] = None
     total_downloads: Optional[int] = None
-    maintainers: List[str] = None
+    maintainers: List[str] = field(default_factory=list)
     upload_time: Optional[datetime] = None
-    project_urls: Dict[str, str] = None
+    project_urls: Dict[str, str] = field(default_factory=dict)
     dependencies_count: int = 0
     
     # Risk signals
@@ -33,12 +65,28 @@ class PackageIntelligence:
     low_download_count: bool = False  # < 1000 weekly downloads
     suspicious_name: bool = False
     potential_typosquat: bool = False
+    # Exact match of a well-known package; its registry data is not fetched
+    is_popular: bool = False
+    # A registry request failed, so the data above may be incomplete and the
+    # record is not cached
+    fetch_failed: bool = False
     
-    def __post_init__(self):
-        if self.maintainers is None:
-            self.maintainers = []
-        if self.project_urls is None:
-            self.project_urls = {}
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the registry data and risk signals for transport."""
+        upload_time = self.upload_time
+        return {
+            "weekly_downloads": self.weekly_downloads,
+            "total_downloads": self.total_downloads,
+            "maintainers": self.maintainers,
+            "upload_time": upload_time.isoformat() if upload_time else None,
+            "project_urls": self.project_urls,
+            "dependencies_count": self.dependencies_count,
+            "is_very_new": self.is_very_new,
+            "low_download_count": self.low_download_count,
+            "suspicious_name": self.suspicious_name,
+            "potential_typosquat": self.potential_typosquat,
+            "is_popular": self.is_popular,
+        }
 
 
 @dataclass 
@@ -49,12 +97,46 @@ class SupplyChainRisk:
     risk_score: float  # 0-10
     risk_factors: List[str]
     recommendations: List[str]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the risk assessment for transport."""
+        return {
+            "risk_level": self.risk_level,
+            "risk_score": self.risk_score,
+            "risk_factors": self.risk_factors,
+            "recommendations": self.recommendations,
+        }
+
+
+def format_intel_result(intel: PackageIntelligence, risk: SupplyChainRisk) -> Dict[str, Any]:
+    """Build the serialized intelligence record for one package.
+    
+    Args:
+        intel: Gathered package intelligence
+        risk: Supply chain risk computed from the intelligence
+        
+    Returns:
+        Intelligence and risk data in the worker output format
+    """
+    return {
+        "package_name": intel.package_name,
+        "package_manager": intel.package_manager,
+        "version": intel.version,
+        "intelligence": intel.to_dict(),
+        "supply_chain_risk": risk.to_dict(),
+    }
 
 
 class SupplyChainIntelligence:
     """Gather supply chain intelligence from free APIs."""
     
     def __init__(self):
+        # Analysis results keyed by (package manager, name, version), with
+        # the monotonic time they were fetched; oldest entries are evicted first
+        self._intel_cache: Dict[Tuple[str, str, str], Tuple[float, PackageIntelligence]] = {}
+        # Packages analyzed against the registries at once; each costs two
+        # requests, and bursts beyond this draw 429s from PyPI and npm
+        self.max_concurrent_requests = 50
         # Popular packages for typosquatting detection (cached)
         self.popular_packages = {
             "pip": [
@@ -72,39 +154,143 @@ class SupplyChainIntelligence:
                 "babel-core", "typescript", "eslint", "jest", "mocha"
             ]
         }
+        self._typosquat_index = self._build_typosquat_index(self.popular_packages)
+        self._popular_names = {
+            ecosystem: frozenset(name.lower() for name in names)
+            for ecosystem, names in self.popular_packages.items()
+        }
     
-    async def gather_package_intelligence(self, packages: List[Package]) -> List[PackageIntelligence]:
-        """Gather intelligence for a batch of packages."""
-        results = []
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            tasks = []
-            for package in packages:
-                if package.package_manager in ["pip", "poetry", "pipenv"]:
-                    tasks.append(self._analyze_pypi_package(client, package))
-                elif package.package_manager in ["npm", "yarn", "pnpm"]:
-                    tasks.append(self._analyze_npm_package(client, package))
-                else:
-                    # Basic analysis for other package managers
-                    tasks.append(self._analyze_generic_package(package))
-            
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Filter out exceptions and return valid results
-            valid_results = []
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    logger.warning(f"Failed to analyze {packages[i].name}: {result}")
-                    # Create basic intelligence record
-                    valid_results.append(PackageIntelligence(
-                        package_name=packages[i].name,
-                        package_manager=packages[i].package_manager,
-                        version=packages[i].version
-                    ))
-                else:
-                    valid_results.append(result)
+    @staticmethod
+    def _build_typosquat_index(popular_packages: Dict[str, List[str]]) -> Dict[str, Dict[int, Tuple[Tuple[str, Tuple[str, ...]], ...]]]:
+        """Index popular names by length, with pigeonhole segments.
+        
+        Each name is split into three segments. A name within edit distance
+        2 of it must contain at least one segment unchanged, since two edits
+        can touch at most two of them, so names sharing no segment can be
+        rejected without computing a distance.
+        
+        Args:
+            popular_packages: Popular package names per ecosystem
             
-            return valid_results
+        Returns:
+            Per ecosystem, tuples of ``(name, segments)`` pairs keyed by name
+            length, each name listed once
+        """
+        index: Dict[str, Dict[int, Tuple[Tuple[str, Tuple[str, ...]], ...]]] = {}
+        for ecosystem, names in popular_packages.items():
+            by_length: Dict[int, List[Tuple[str, Tuple[str, ...]]]] = {}
+            # dict.fromkeys drops repeats while keeping the list order
+            for name in dict.fromkeys(name.lower() for name in names):
+                step = len(name) / 3
+                segments = tuple(
+                    segment
+                    for segment in (name[round(i * step):round((i + 1) * step)] for i in range(3))
+                    if segment
+                )
+                by_length.setdefault(len(name), []).append((name, segments))
+            # Buckets are only ever iterated, so freeze them
+            index[ecosystem] = {length: tuple(bucket) for length, bucket in by_length.items()}
+        return index
+    
+    async def gather_package_intelligence(self, packages: List[Package]) -> List[PackageIntelligence]:
+        """Gather intelligence for a batch of packages.
+        
+        Each distinct (package manager, name, version) is analyzed once per
+        batch, and results are reused for ``INTEL_CACHE_TTL`` seconds across
+        batches unless a registry request failed. Every returned record is a
+        separate copy.
+        """
+        # Reuse the pooled client so registry connections stay open across batches
+        client = get_shared_client()
+        
+        now = time.monotonic()
+        cache = self._intel_cache
+        # Results per distinct package: fresh cache hits now, the rest once
+        # the distinct packages still pending have been analyzed
+        found: Dict[Tuple[str, str, str], PackageIntelligence] = {}
+        pending: Dict[Tuple[str, str, str], Package] = {}
+        for package in packages:
+            key = (package.package_manager, package.name, package.version)
+            if key in found or key in pending:
+                continue
+            cached = cache.get(key)
+            if cached is None or now - cached[0] > INTEL_CACHE_TTL:
+                pending[key] = package
+            else:
+                found[key] = cached[1]
+        
+        # Well-known packages are trusted without querying their registry
+        popular = {key for key, package in pending.items() if self._is_popular(package)}
+        
+        # npm download counts for unscoped packages come from bulk queries,
+        # fetched while the per-package metadata requests are in flight
+        npm_names = {
+            package.name for key, package in pending.items()
+            if package.package_manager in ["npm", "yarn", "pnpm"] and not package.name.startswith("@")
+            and key not in popular
+        }
+        npm_downloads = asyncio.ensure_future(self._fetch_npm_downloads(client, sorted(npm_names)))
+        
+        # Create semaphore for rate limiting
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        
+        async def bounded(analysis: Awaitable[PackageIntelligence]) -> PackageIntelligence:
+            async with semaphore:
+                return await analysis
+        
+        tasks = []
+        for key, package in pending.items():
+            if key in popular:
+                tasks.append(self._analyze_popular_package(package))
+            elif package.package_manager in ["pip", "poetry", "pipenv"]:
+                tasks.append(bounded(self._analyze_pypi_package(client, package)))
+            elif package.package_manager in ["npm", "yarn", "pnpm"]:
+                tasks.append(bounded(self._analyze_npm_package(client, package, npm_downloads)))
+            else:
+                # Basic analysis for other package managers
+                tasks.append(self._analyze_generic_package(package))
+        
+        # The name heuristics are CPU-only, so they run in a worker thread
+        # while the registry requests are in flight
+        screening = asyncio.ensure_future(asyncio.to_thread(self._screen_packages, list(pending.values())))
+        
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        await npm_downloads
+        screens = await screening
+        
+        for (key, package), result, (suspicious, typosquat) in zip(pending.items(), results, screens):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to analyze {package.name}: {result}")
+                continue
+            result.suspicious_name = suspicious
+            result.potential_typosquat = typosquat
+            found[key] = result
+            if result.fetch_failed:
+                continue
+            if len(cache) >= INTEL_CACHE_SIZE:
+                cache.pop(next(iter(cache)), None)
+            cache[key] = (now, result)
+        
+        # Build one record per requested package
+        valid_results = []
+        for package in packages:
+            key = (package.package_manager, package.name, package.version)
+            intel = found.get(key)
+            if intel is None:
+                # Create basic intelligence record
+                valid_results.append(PackageIntelligence(
+                    package_name=package.name,
+                    package_manager=package.package_manager,
+                    version=package.version
+                ))
+            else:
+                valid_results.append(replace(
+                    intel,
+                    maintainers=list(intel.maintainers),
+                    project_urls=dict(intel.project_urls)
+                ))
+        
+        return valid_results
     
     async def _analyze_pypi_package(self, client: httpx.AsyncClient, package: Package) -> PackageIntelligence:
         """Analyze PyPI package using free APIs."""
@@ -114,11 +300,32 @@ class SupplyChainIntelligence:
             version=package.version
         )
         
+        # Metadata and download stats are independent, so fetch them concurrently
+        await asyncio.gather(
+            self._fetch_pypi_metadata(client, package, intel),
+            self._fetch_pypi_downloads(client, package, intel)
+        )
+        
+        return intel
+    
+    async def _fetch_pypi_metadata(self, client: httpx.AsyncClient, package: Package, intel: PackageIntelligence) -> None:
+        """Fill in maintainers, URLs, upload time and dependency count from PyPI."""
         try:
-            # Get package metadata from PyPI
-            resp = await client.get(f"https://pypi.org/pypi/{package.name}/json")
+            # Get package metadata from PyPI. The per-version document holds
+            # only this release's files, while the project document lists
+            # every file of every release, which is megabytes for popular
+            # packages; it is only needed when the version is not on PyPI
+            resp = None
+            if package.version and package.version != "latest":
+                resp = await request_with_retry(client, "GET", f"https://pypi.org/pypi/{package.name}/{package.version}/json")
+            versioned = resp is not None and resp.status_code == 200
+            # Unpinned packages have no per-version document to ask for
+            if resp is None or resp.status_code == 404:
+                resp = await request_with_retry(client, "GET", f"https://pypi.org/pypi/{package.name}/json")
+            if resp.status_code not in (200, 404):
+                intel.fetch_failed = True
             if resp.status_code == 200:
-                data = resp.json()
+                data = json_loads(resp.content)
                 info = data.get("info", {})
                 
                 intel.maintainers = [info.get("maintainer", ""), info.get("author", "")]
@@ -126,9 +333,12 @@ class SupplyChainIntelligence:
                 intel.project_urls = info.get("project_urls") or {}
                 
                 # Get upload time for this version
-                releases = data.get("releases", {})
-                if package.version in releases and releases[package.version]:
-                    upload_time_str = releases[package.version][0].get("upload_time")
+                if versioned:
+                    files = data.get("urls")
+                else:
+                    files = (data.get("releases") or {}).get(package.version)
+                if files:
+                    upload_time_str = files[0].get("upload_time")
                     if upload_time_str:
                         intel.upload_time = datetime.fromisoformat(upload_time_str.replace('Z', '+00:00'))
                         days_old = (datetime.now(intel.upload_time.tzinfo) - intel.upload_time).days
@@ -139,39 +349,94 @@ class SupplyChainIntelligence:
                 intel.dependencies_count = len(requires_dist)
         
         except Exception as e:
+            intel.fetch_failed = True
             logger.debug(f"Failed to get PyPI data for {package.name}: {e}")
-        
+    
+    async def _fetch_pypi_downloads(self, client: httpx.AsyncClient, package: Package, intel: PackageIntelligence) -> None:
+        """Fill in weekly downloads from pypistats."""
         try:
             # Get download stats from pypistats (free)
-            resp = await client.get(f"https://pypistats.org/api/packages/{package.name}/recent")
+            resp = await request_with_retry(client, "GET", f"https://pypistats.org/api/packages/{package.name}/recent")
+            if resp.status_code not in (200, 404):
+                intel.fetch_failed = True
             if resp.status_code == 200:
-                data = resp.json()
+                data = json_loads(resp.content)
                 last_week = data.get("data", {}).get("last_week", 0)
                 intel.weekly_downloads = last_week
                 intel.low_download_count = last_week < 1000
         
         except Exception as e:
+            intel.fetch_failed = True
             logger.debug(f"Failed to get pypistats for {package.name}: {e}")
+    
+    async def _fetch_npm_downloads(self, client: httpx.AsyncClient, names: List[str]) -> Dict[str, Optional[int]]:
+        """Fetch last-week npm download counts in bulk.
         
-        # Risk analysis
-        intel.suspicious_name = self._check_suspicious_name(package.name)
-        intel.potential_typosquat = self._check_typosquatting(package.name, "pip")
+        The downloads API answers up to 128 unscoped packages per request,
+        so N packages cost ceil(N / 128) requests instead of N.
         
-        return intel
+        Args:
+            client: HTTP client
+            names: Unscoped npm package names
+            
+        Returns:
+            Download counts by name, None for packages npm does not know;
+            names whose request failed are omitted
+        """
+        async def fetch_chunk(chunk: List[str]) -> Dict[str, Optional[int]]:
+            try:
+                resp = await request_with_retry(client, "GET", f"https://api.npmjs.org/downloads/point/last-week/{','.join(chunk)}")
+                if resp.status_code != 200:
+                    return {}
+                data = json_loads(resp.content)
+            except Exception as e:
+                logger.debug(f"Failed to get npm download stats for {len(chunk)} packages: {e}")
+                return {}
+            if len(chunk) == 1:
+                # A single name gets the plain, unkeyed response
+                data = {chunk[0]: data}
+            return {
+                name: entry.get("downloads", 0) if isinstance(entry, dict) else None
+                for name, entry in data.items()
+            }
+        
+        counts: Dict[str, Optional[int]] = {}
+        chunks = [names[i:i + NPM_BULK_DOWNLOADS_LIMIT] for i in range(0, len(names), NPM_BULK_DOWNLOADS_LIMIT)]
+        for chunk_counts in await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks)):
+            counts.update(chunk_counts)
+        return counts
     
-    async def _analyze_npm_package(self, client: httpx.AsyncClient, package: Package) -> PackageIntelligence:
-        """Analyze npm package using free APIs."""
+    async def _analyze_npm_package(self, client: httpx.AsyncClient, package: Package,
+                                   bulk_downloads: Optional["asyncio.Future[Dict[str, Optional[int]]]"] = None) -> PackageIntelligence:
+        """Analyze npm package using free APIs.
+        
+        ``bulk_downloads`` resolves to download counts from
+        ``_fetch_npm_downloads``; packages it does not cover are looked up
+        individually.
+        """
         intel = PackageIntelligence(
             package_name=package.name,
             package_manager=package.package_manager,
             version=package.version
         )
         
+        # Metadata and download stats are independent, so fetch them concurrently
+        await asyncio.gather(
+            self._fetch_npm_metadata(client, package, intel),
+            self._fetch_npm_download_count(client, package, intel, bulk_downloads)
+        )
+        
+        return intel
+    
+    async def _fetch_npm_metadata(self, client: httpx.AsyncClient, package: Package, intel: PackageIntelligence) -> None:
+        """Fill in maintainers, repository, upload time and dependency count from npm."""
         try:
             # Get package metadata from npm registry
-            resp = await client.get(f"https://registry.npmjs.org/{package.name}")
+            resp = await request_with_retry(client, "GET", f"https://registry.npmjs.org/{package.name}")
+            if resp.status_code not in (200, 404):
+                intel.fetch_failed = True
             if resp.status_code == 200:
-                data = resp.json()
+                data = json_loads(resp.content)
                 
                 # Maintainers
                 maintainers = data.get("maintainers", [])
@@ -197,72 +462,134 @@ class SupplyChainIntelligence:
                     intel.dependencies_count = len(deps)
         
         except Exception as e:
+            intel.fetch_failed = True
             logger.debug(f"Failed to get npm registry data for {package.name}: {e}")
-        
+    
+    async def _fetch_npm_download_count(self, client: httpx.AsyncClient, package: Package, intel: PackageIntelligence,
+                                        bulk_downloads: Optional["asyncio.Future[Dict[str, Optional[int]]]"]) -> None:
+        """Fill in weekly downloads, from the bulk counts when they cover the package."""
         try:
-            # Get download stats from npm API
-            resp = await client.get(f"https://api.npmjs.org/downloads/point/last-week/{package.name}")
-            if resp.status_code == 200:
-                data = resp.json()
-                downloads = data.get("downloads", 0)
-                intel.weekly_downloads = downloads
-                intel.low_download_count = downloads < 1000
+            counts = await bulk_downloads if bulk_downloads is not None else {}
+            if package.name in counts:
+                downloads = counts[package.name]
+                if downloads is not None:
+                    intel.weekly_downloads = downloads
+                    intel.low_download_count = downloads < 1000
+            else:
+                # Get download stats from npm API
+                resp = await request_with_retry(client, "GET", f"https://api.npmjs.org/downloads/point/last-week/{package.name}")
+                if resp.status_code not in (200, 404):
+                    intel.fetch_failed = True
+                if resp.status_code == 200:
+                    data = json_loads(resp.content)
+                    downloads = data.get("downloads", 0)
+                    intel.weekly_downloads = downloads
+                    intel.low_download_count = downloads < 1000
         
         except Exception as e:
+            intel.fetch_failed = True
             logger.debug(f"Failed to get npm download stats for {package.name}: {e}")
-        
-        # Risk analysis
-        intel.suspicious_name = self._check_suspicious_name(package.name)
-        intel.potential_typosquat = self._check_typosquatting(package.name, "npm")
-        
-        return intel
     
     async def _analyze_generic_package(self, package: Package) -> PackageIntelligence:
-        """Basic analysis for packages without specific API support."""
-        intel = PackageIntelligence(
+        """Basic analysis for packages without specific API support.
+        
+        Only the name heuristics apply, and ``gather_package_intelligence``
+        runs those for every package.
+        """
+        return PackageIntelligence(
             package_name=package.name,
             package_manager=package.package_manager,
             version=package.version
         )
+    
+    async def _analyze_popular_package(self, package: Package) -> PackageIntelligence:
+        """Record a well-known package without querying its registry."""
+        return PackageIntelligence(
+            package_name=package.name,
+            package_manager=package.package_manager,
+            version=package.version,
+            is_popular=True
+        )
+    
+    def _is_popular(self, package: Package) -> bool:
+        """Check whether a PyPI or npm package is on the popular list."""
+        manager = package.package_manager
+        if manager in ["pip", "poetry", "pipenv"]:
+            ecosystem = "pip"
+        elif manager in ["npm", "yarn", "pnpm"]:
+            ecosystem = "npm"
+        else:
+            return False
+        return package.name.lower() in self._popular_names.get(ecosystem, ())
+    
+    def _screen_packages(self, packages: List[Package]) -> List[Tuple[bool, bool]]:
+        """Run the name heuristics over a batch of packages.
         
-        # Only do heuristic-based analysis
-        intel.suspicious_name = self._check_suspicious_name(package.name)
-        ecosystem = "pip" if package.package_manager in ["cargo", "bundler"] else "npm"
-        intel.potential_typosquat = self._check_typosquatting(package.name, ecosystem)
-        
-        return intel
+        Args:
+            packages: Packages to screen
+            
+        Returns:
+            ``(suspicious_name, potential_typosquat)`` per package
+        """
+        screens = []
+        for package in packages:
+            manager = package.package_manager
+            if manager in ["pip", "poetry", "pipenv"]:
+                ecosystem = "pip"
+            elif manager in ["npm", "yarn", "pnpm"]:
+                ecosystem = "npm"
+            else:
+                ecosystem = "pip" if manager in ["cargo", "bundler"] else "npm"
+            screens.append((
+                self._check_suspicious_name(package.name),
+                self._check_typosquatting(package.name, ecosystem)
+            ))
+        return screens
     
     def _check_suspicious_name(self, package_name: str) -> bool:
         """Check for suspicious naming patterns."""
-        suspicious_patterns = [
-            r".*test.*", r".*temp.*", r".*debug.*",  # Test/temp packages
-            r"[0-9]+$",  # Packages ending in numbers
-            r".*[_-](utils?|helpers?|tools?)$",  # Generic utility names
-            r"^[a-z]{1,3}$",  # Very short names (often squatted)
-            r".*[_-]v?[0-9]+[_-].*",  # Version numbers in package names
-        ]
-        
-        for pattern in suspicious_patterns:
-            if re.match(pattern, package_name, re.IGNORECASE):
-                return True
-        return False
+        return _SUSPICIOUS_NAME.match(package_name) is not None
     
     def _check_typosquatting(self, package_name: str, ecosystem: str) -> bool:
         """Check if package name is similar to popular packages."""
-        if ecosystem not in self.popular_packages:
+        by_length = self._typosquat_index.get(ecosystem)
+        if by_length is None:
             return False
         
-        for popular in self.popular_packages[ecosystem]:
-            distance = self._levenshtein_distance(package_name.lower(), popular.lower())
-            # If the package name is very similar but not identical
-            if 1 <= distance <= 2 and package_name.lower() != popular.lower():
-                return True
+        name = package_name.lower()
+        # Names more than two characters longer or shorter are at least
+        # three edits away
+        for length in range(len(name) - 2, len(name) + 3):
+            for popular, segments in by_length.get(length, ()):
+                if name == popular or not any(segment in name for segment in segments):
+                    continue
+                # Only distances of 1-2 matter, so stop counting past 2
+                distance = self._levenshtein_distance(name, popular, score_cutoff=2)
+                # If the package name is very similar but not identical
+                if 1 <= distance <= 2:
+                    return True
         return False
     
-    def _levenshtein_distance(self, s1: str, s2: str) -> int:
-        """Calculate Levenshtein distance between two strings."""
+    def _levenshtein_distance(self, s1: str, s2: str, score_cutoff: Optional[int] = None) -> int:
+        """Calculate Levenshtein distance between two strings.
+        
+        Args:
+            s1: First string
+            s2: Second string
+            score_cutoff: Largest distance of interest; any greater distance
+                is reported as ``score_cutoff + 1``
+            
+        Returns:
+            Edit distance
+        """
+        if Levenshtein is not None:
+            return Levenshtein.distance(s1, s2, score_cutoff=score_cutoff)
+        
         if len(s1) > len(s2):
             s1, s2 = s2, s1
+        # The distance is at least the difference in length
+        if score_cutoff is not None and len(s2) - len(s1) > score_cutoff:
+            return score_cutoff + 1
         
         distances = range(len(s1) + 1)
         for i2, c2 in enumerate(s2):
@@ -273,6 +600,11 @@ class SupplyChainIntelligence:
                 else:
                     distances_.append(1 + min((distances[i1], distances[i1 + 1], distances_[-1])))
             distances = distances_
+            # Row minima never decrease, so the cutoff is already exceeded
+            if score_cutoff is not None and min(distances) > score_cutoff:
+                return score_cutoff + 1
+        if score_cutoff is not None and distances[-1] > score_cutoff:
+            return score_cutoff + 1
         return distances[-1]
     
     def calculate_supply_chain_risk(self, intel: PackageIntelligence) -> SupplyChainRisk:
@@ -300,15 +632,18 @@ class SupplyChainIntelligence:
             risk_factors.append("Potential typosquatting attempt")
             risk_score += 4.0
         
-        # Risk factor: No maintainer info
-        if not intel.maintainers:
-            risk_factors.append("No maintainer information available")
-            risk_score += 1.0
-        
-        # Risk factor: No project URLs
-        if not intel.project_urls:
-            risk_factors.append("No project repository or homepage")
-            risk_score += 1.0
+        # Registry data is not fetched for popular packages, so its absence
+        # says nothing about them
+        if not intel.is_popular:
+            # Risk factor: No maintainer info
+            if not intel.maintainers:
+                risk_factors.append("No maintainer information available")
+                risk_score += 1.0
+            
+            # Risk factor: No project URLs
+            if not intel.project_urls:
+                risk_factors.append("No project repository or homepage")
+                risk_score += 1.0
         
         # Determine risk level
         if risk_score >= 6.0:
@@ -328,7 +663,7 @@ class SupplyChainIntelligence:
             recommendations.append("Consider using more established package versions")
         if intel.low_download_count:
             recommendations.append("Review if this package is still maintained")
-        if not intel.project_urls:
+        if not intel.project_urls and not intel.is_popular:
             recommendations.append("Verify package authenticity through other channels")
         
         return SupplyChainRisk(
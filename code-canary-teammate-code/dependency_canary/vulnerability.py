@@ -5,10 +5,16 @@ Vulnerability enrichment module for querying security databases.
 import asyncio
 import httpx
 import os
+import re
+import time
+import zipfile
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple, FrozenSet
 from loguru import logger
 
+from .http_client import create_async_client, request_with_retry
+from .serialization import json_loads
 from .models import (
     SBOM, ScanResult, Vulnerability, PackageRisk, RiskFactor,
     SeverityLevel, RiskLevel, Package
@@ -17,8 +23,13 @@ from .models import (
 class VulnerabilityEnricher:
     """Enriches SBOM with vulnerability data from multiple sources."""
     
-    def __init__(self):
-        """Initialize vulnerability enricher."""
+    def __init__(self, osv_snapshot_dir: Optional[Path] = None):
+        """Initialize vulnerability enricher.
+        
+        Args:
+            osv_snapshot_dir: Directory holding OSV ``{ecosystem}.zip`` bundles;
+                defaults to the ``OSV_SNAPSHOT_DIR`` environment variable
+        """
         self.osv_api_url = "https://api.osv.dev/v1"
         self.ghsa_api_url = "https://api.github.com/advisories"
         self.nvd_api_url = "https://services.nvd.nist.gov/rest/json/cves/2.0"
@@ -27,6 +38,14 @@ class VulnerabilityEnricher:
         # Rate limiting
         self.max_concurrent_requests = 10
         self.request_delay = 0.1  # seconds between requests
+        
+        # Local OSV snapshot; snapshots older than the max age are ignored
+        # so stale data never hides recently published advisories
+        snapshot_dir = osv_snapshot_dir or os.getenv("OSV_SNAPSHOT_DIR")
+        self.osv_snapshot_dir = Path(snapshot_dir) if snapshot_dir else None
+        self.osv_snapshot_max_age = 2 * 24 * 3600  # seconds
+        self._osv_index: Dict[str, Optional[Dict[str, List[Tuple[Optional[FrozenSet[str]], Dict[str, Any]]]]]] = {}
+        self._osv_index_lock = asyncio.Lock()
     
     async def enrich_sbom(self, sbom: SBOM) -> ScanResult:
         """Enrich SBOM with vulnerability data.
@@ -45,7 +64,7 @@ class VulnerabilityEnricher:
         semaphore = asyncio.Semaphore(self.max_concurrent_requests)
         
         # Process packages in batches
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with create_async_client() as client:
             tasks = []
             for package in sbom.packages:
                 task = self._enrich_package(client, semaphore, package)
@@ -66,14 +85,105 @@ class VulnerabilityEnricher:
         logger.info(f"Enrichment complete: {scan_result.total_vulnerabilities} vulnerabilities found")
         return scan_result
     
+    async def enrich_package_stream(self, package_queue: asyncio.Queue,
+                                    batch_size: int = 1000,
+                                    flush_interval: float = 0.25) -> List[PackageRisk]:
+        """Enrich packages as they arrive on a queue.
+        
+        Packages are grouped into batches of up to ``batch_size`` (or whatever
+        arrived within ``flush_interval`` seconds). Each batch is looked up in
+        OSV with a single ``/querybatch`` call and enriched while the producer
+        keeps running. A ``None`` item marks the end of the stream.
+        
+        Args:
+            package_queue: Queue of packages to enrich
+            batch_size: Maximum packages per batch (OSV accepts up to 1000)
+            flush_interval: Seconds to wait for a batch to fill up
+            
+        Returns:
+            Package risk assessments for packages with findings
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        batch_tasks = []
+        pending_get = None
+        finished = False
+        
+        async with create_async_client() as client:
+            while not finished:
+                # Block until the first package of the next batch arrives
+                package = await (pending_get or package_queue.get())
+                pending_get = None
+                if package is None:
+                    break
+                
+                batch = [package]
+                deadline = loop.time() + flush_interval
+                while len(batch) < batch_size:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    # Keep the pending get() alive across batches rather than
+                    # cancelling it, so no package is dropped on timeout
+                    pending_get = pending_get or asyncio.ensure_future(package_queue.get())
+                    done, _ = await asyncio.wait({pending_get}, timeout=remaining)
+                    if not done:
+                        break
+                    package = pending_get.result()
+                    pending_get = None
+                    if package is None:
+                        finished = True
+                        break
+                    batch.append(package)
+                
+                batch_tasks.append(asyncio.create_task(
+                    self._enrich_batch(client, semaphore, batch)
+                ))
+            
+            batch_results = await asyncio.gather(*batch_tasks)
+        
+        risks = [risk for batch_risks in batch_results for risk in batch_risks]
+        logger.info(f"Stream enrichment complete: {len(risks)} packages with findings")
+        return risks
+    
+    async def _enrich_batch(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                          packages: List[Package]) -> List[PackageRisk]:
+        """Enrich a batch of packages using one OSV batch query.
+        
+        Args:
+            client: HTTP client
+            semaphore: Rate limiting semaphore
+            packages: Packages to enrich
+            
+        Returns:
+            Package risk assessments for packages with findings
+        """
+        osv_results = await self._query_osv_batch(client, semaphore, packages)
+        
+        results = await asyncio.gather(*[
+            self._enrich_package(client, semaphore, package, osv_vulnerabilities=osv_vulns)
+            for package, osv_vulns in zip(packages, osv_results)
+        ], return_exceptions=True)
+        
+        risks = []
+        for package, result in zip(packages, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to enrich package {package.name}: {result}")
+            elif result:
+                risks.append(result)
+        return risks
+    
     async def _enrich_package(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore, 
-                            package: Package) -> Optional[PackageRisk]:
+                            package: Package,
+                            osv_vulnerabilities: Optional[List[Vulnerability]] = None) -> Optional[PackageRisk]:
         """Enrich a single package with vulnerability data.
         
         Args:
             client: HTTP client
             semaphore: Rate limiting semaphore
             package: Package to enrich
+            osv_vulnerabilities: OSV results already fetched by a batch query;
+                OSV is queried directly when None
             
         Returns:
             Package risk assessment or None if no vulnerabilities found
@@ -88,10 +198,13 @@ class VulnerabilityEnricher:
                 
                 # Query OSV, GHSA, and NVD in parallel
                 tasks = [
-                    self._query_osv(client, package),
                     self._query_ghsa(client, package),
                     self._query_nvd(client, package),
                 ]
+                if osv_vulnerabilities is None:
+                    tasks.insert(0, self._query_osv(client, package))
+                else:
+                    vulnerabilities.extend(osv_vulnerabilities)
                 results = await asyncio.gather(*tasks, return_exceptions=True)
                 for res in results:
                     if isinstance(res, Exception):
@@ -130,6 +243,10 @@ class VulnerabilityEnricher:
         Returns:
             List of vulnerabilities
         """
+        snapshot_vulns = await self._query_osv_snapshot(package)
+        if snapshot_vulns is not None:
+            return snapshot_vulns
+        
         try:
             # Construct query payload
             query_data = {
@@ -140,8 +257,8 @@ class VulnerabilityEnricher:
                 "version": package.version
             }
             
-            response = await client.post(
-                f"{self.osv_api_url}/query",
+            response = await request_with_retry(
+                client, "POST", f"{self.osv_api_url}/query",
                 json=query_data
             )
             
@@ -161,6 +278,219 @@ class VulnerabilityEnricher:
         
         return []
     
+    async def _query_osv_batch(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                             packages: List[Package]) -> List[Optional[List[Vulnerability]]]:
+        """Query OSV.dev for many packages with a single batch request.
+        
+        The batch endpoint only returns vulnerability IDs, so full records are
+        fetched once per unique ID and shared between packages.
+        
+        Args:
+            client: HTTP client
+            semaphore: Rate limiting semaphore
+            packages: Packages to query
+            
+        Returns:
+            Vulnerabilities for each package, in input order; entries are None
+            when the batch query failed and the package must be queried alone
+        """
+        # Answer what we can from the local snapshot, query the rest
+        snapshot_results = [await self._query_osv_snapshot(package) for package in packages]
+        remote_indexes = [i for i, vulns in enumerate(snapshot_results) if vulns is None]
+        if not remote_indexes:
+            return snapshot_results
+        remote_packages = [packages[i] for i in remote_indexes]
+        
+        try:
+            queries = [
+                {
+                    "package": {
+                        "name": package.name,
+                        "ecosystem": self._get_osv_ecosystem(package.package_manager)
+                    },
+                    "version": package.version
+                }
+                for package in remote_packages
+            ]
+            
+            async with semaphore:
+                response = await request_with_retry(
+                    client, "POST", f"{self.osv_api_url}/querybatch",
+                    json={"queries": queries}
+                )
+            if response.status_code != 200:
+                return snapshot_results
+            
+            results = response.json().get("results", [])
+            if len(results) != len(remote_packages):
+                return snapshot_results
+            
+            vuln_ids_per_package = [
+                [vuln["id"] for vuln in result.get("vulns", []) if vuln.get("id")]
+                for result in results
+            ]
+            unique_ids = list(dict.fromkeys(
+                vuln_id for vuln_ids in vuln_ids_per_package for vuln_id in vuln_ids
+            ))
+            
+            fetched = await asyncio.gather(*[
+                self._fetch_osv_vulnerability(client, semaphore, vuln_id)
+                for vuln_id in unique_ids
+            ])
+            by_id = {vuln_id: vuln for vuln_id, vuln in zip(unique_ids, fetched) if vuln}
+            
+            for i, vuln_ids in zip(remote_indexes, vuln_ids_per_package):
+                snapshot_results[i] = [by_id[vuln_id] for vuln_id in vuln_ids if vuln_id in by_id]
+            
+        except Exception as e:
+            logger.debug(f"OSV batch query failed for {len(remote_packages)} packages: {e}")
+        
+        return snapshot_results
+    
+    async def _query_osv_snapshot(self, package: Package) -> Optional[List[Vulnerability]]:
+        """Look up a package in the local OSV snapshot.
+        
+        Args:
+            package: Package to look up
+            
+        Returns:
+            Vulnerabilities affecting the exact package version, or None when
+            no fresh snapshot covers the package's ecosystem or an advisory
+            for the package only gives version ranges
+        """
+        if self.osv_snapshot_dir is None:
+            return None
+        
+        ecosystem = self._get_osv_ecosystem(package.package_manager)
+        index = await self._get_osv_index(ecosystem)
+        if index is None:
+            return None
+        
+        entries = index.get(self._osv_package_key(ecosystem, package.name), ())
+        if any(versions is None for versions, _ in entries):
+            # Range-only advisories are left to the live API to evaluate
+            return None
+        
+        vulnerabilities = []
+        for versions, vuln_data in entries:
+            if package.version in versions:
+                vulnerability = self._parse_osv_vulnerability(vuln_data)
+                if vulnerability:
+                    vulnerabilities.append(vulnerability)
+        return vulnerabilities
+    
+    async def _get_osv_index(self, ecosystem: str) -> Optional[Dict[str, List[Tuple[Optional[FrozenSet[str]], Dict[str, Any]]]]]:
+        """Get the in-memory index for an ecosystem, loading it on first use.
+        
+        Args:
+            ecosystem: OSV ecosystem name
+            
+        Returns:
+            Mapping of package name to (affected versions, OSV record) pairs,
+            or None if no fresh snapshot exists
+        """
+        if ecosystem in self._osv_index:
+            return self._osv_index[ecosystem]
+        
+        async with self._osv_index_lock:
+            if ecosystem not in self._osv_index:
+                snapshot_path = self.osv_snapshot_dir / f"{ecosystem}.zip"
+                index = None
+                try:
+                    age = time.time() - snapshot_path.stat().st_mtime
+                    if age <= self.osv_snapshot_max_age:
+                        index = await asyncio.to_thread(self._load_osv_index, snapshot_path, ecosystem)
+                        logger.info(f"Loaded OSV snapshot for {ecosystem}: {len(index)} packages")
+                    else:
+                        logger.warning(f"OSV snapshot for {ecosystem} is stale, using the live API")
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    logger.warning(f"Failed to load OSV snapshot {snapshot_path}: {e}")
+                self._osv_index[ecosystem] = index
+        
+        return self._osv_index[ecosystem]
+    
+    def _load_osv_index(self, snapshot_path: Path,
+                        ecosystem: str) -> Dict[str, List[Tuple[Optional[FrozenSet[str]], Dict[str, Any]]]]:
+        """Build a package index from an OSV ``all.zip`` bundle.
+        
+        The enumerated ``versions`` of each affected entry are indexed.
+        Entries that only give ``ranges`` are indexed with ``None`` versions
+        so lookups for those packages fall back to the live API.
+        
+        Args:
+            snapshot_path: Path to the ecosystem bundle
+            ecosystem: OSV ecosystem name
+            
+        Returns:
+            Mapping of package name to (affected versions, OSV record) pairs
+        """
+        index: Dict[str, List[Tuple[Optional[FrozenSet[str]], Dict[str, Any]]]] = {}
+        
+        with zipfile.ZipFile(snapshot_path) as bundle:
+            for member in bundle.namelist():
+                if not member.endswith(".json"):
+                    continue
+                vuln_data = json_loads(bundle.read(member))
+                if vuln_data.get("withdrawn"):
+                    continue
+                
+                for affected in vuln_data.get("affected", []):
+                    affected_package = affected.get("package", {})
+                    name = affected_package.get("name")
+                    if affected_package.get("ecosystem") != ecosystem or not name:
+                        continue
+                    versions = affected.get("versions")
+                    if versions:
+                        versions = frozenset(versions)
+                    elif affected.get("ranges"):
+                        versions = None
+                    else:
+                        continue
+                    index.setdefault(self._osv_package_key(ecosystem, name), []).append(
+                        (versions, vuln_data)
+                    )
+        
+        return index
+    
+    @staticmethod
+    def _osv_package_key(ecosystem: str, name: str) -> str:
+        """Normalize a package name the way the OSV API matches it.
+        
+        Args:
+            ecosystem: OSV ecosystem name
+            name: Package name
+            
+        Returns:
+            PEP 503 normalized name for PyPI, the name unchanged otherwise
+        """
+        if ecosystem == "PyPI":
+            return re.sub(r"[-_.]+", "-", name).lower()
+        return name
+    
+    async def _fetch_osv_vulnerability(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                                     vuln_id: str) -> Optional[Vulnerability]:
+        """Fetch a full OSV vulnerability record by ID.
+        
+        Args:
+            client: HTTP client
+            semaphore: Rate limiting semaphore
+            vuln_id: OSV vulnerability ID
+            
+        Returns:
+            Parsed vulnerability or None
+        """
+        try:
+            async with semaphore:
+                response = await request_with_retry(client, "GET", f"{self.osv_api_url}/vulns/{vuln_id}")
+            if response.status_code == 200:
+                return self._parse_osv_vulnerability(response.json())
+        except Exception as e:
+            logger.debug(f"OSV lookup failed for {vuln_id}: {e}")
+        
+        return None
+    
     async def _query_ghsa(self, client: httpx.AsyncClient, package: Package) -> List[Vulnerability]:
         """Query GitHub Security Advisories.
         
@@ -183,8 +513,8 @@ class VulnerabilityEnricher:
                 "per_page": 100
             }
             
-            response = await client.get(
-                self.ghsa_api_url,
+            response = await request_with_retry(
+                client, "GET", self.ghsa_api_url,
                 params=params
             )
             
@@ -215,7 +545,7 @@ class VulnerabilityEnricher:
             if self.nvd_api_key:
                 params["apiKey"] = self.nvd_api_key
 
-            resp = await client.get(self.nvd_api_url, params=params)
+            resp = await request_with_retry(client, "GET", self.nvd_api_url, params=params)
             if resp.status_code == 200:
                 data = resp.json() or {}
                 vulns: List[Vulnerability] = []
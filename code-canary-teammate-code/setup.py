@@ -49,13 +49,26 @@ setup(
     extras_require={
         "dev": [
             "pytest>=7.4.0",
-            "pytest-asyncio>=0.21.0",
+            "pytest-asyncio>=0.26.0",
             "pytest-mock>=3.11.0",
+            "pytest-xdist>=3.3.0",
+            "pytest-benchmark>=4.0.0",
             "black>=23.0.0",
             "isort>=5.12.0",
             "flake8>=6.0.0",
             "mypy>=1.5.0",
         ],
+        "fast": [
+            "orjson>=3.9.0",
+            "ijson>=3.2.0",
+            "h2>=4.1.0",
+            "rapidfuzz>=3.0.0",
+            "google-re2>=1.1",
+            "brotli>=1.1.0",
+            "rtoml>=0.9.0",
+            "msgpack>=1.0.0",
+            "uvloop>=0.17.0; sys_platform != 'win32'",
+        ],
         "web": [
             "fastapi>=0.104.0",
             "uvicorn>=0.24.0",
@@ -7,13 +7,14 @@ import pytest
 import asyncio
 import tempfile
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 
 from dependency_canary.modal_workers import ModalSBOMService
 from dependency_canary.sbom import SBOMGenerator
 from dependency_canary.vulnerability import VulnerabilityEnricher
 from dependency_canary.detectors import LanguageDetector
 from dependency_canary.models import SBOM, Package, Dependency, DependencyType
+from dependency_canary.supply_chain_intelligence import SupplyChainIntelligence
 
 
 class TestLanguageDetection:
@@ -56,7 +57,6 @@ class TestLanguageDetection:
 class TestSBOMGeneration:
     """Test SBOM generation functionality."""
     
-    @pytest.mark.asyncio
     async def test_generate_sbom_python_project(self):
         """Test SBOM generation for a Python project."""
         generator = SBOMGenerator()
@@ -84,7 +84,6 @@ class TestSBOMGeneration:
             assert "requests" in package_names
             assert "click" in package_names
     
-    @pytest.mark.asyncio
     async def test_empty_project(self):
         """Test SBOM generation for an empty project."""
         generator = SBOMGenerator()
@@ -101,11 +100,80 @@ class TestSBOMGeneration:
             assert sbom.total_packages == 0
             assert len(sbom.packages) == 0
 
+    def test_add_packages_bulk_matches_add_package(self):
+        """Test that bulk adds deduplicate packages like add_package."""
+        requests_pkg = Package(name="requests", version="2.25.1", language="python", package_manager="pip")
+        lodash_pkg = Package(name="lodash", version="4.17.21", language="javascript", package_manager="npm")
+        pairs = [
+            (requests_pkg, Dependency(package=requests_pkg, dependency_type=DependencyType.DIRECT)),
+            (lodash_pkg, Dependency(package=lodash_pkg, dependency_type=DependencyType.TRANSITIVE)),
+            (requests_pkg, Dependency(package=requests_pkg, dependency_type=DependencyType.TRANSITIVE)),
+        ]
+
+        one_by_one = SBOM(project_name="test")
+        for package, dependency in pairs:
+            one_by_one.add_package(package, dependency)
+        bulk = SBOM(project_name="test", timestamp=one_by_one.timestamp)
+        bulk.add_packages_bulk(pairs)
+
+        assert bulk == one_by_one
+        assert bulk.total_packages == 2
+        assert bulk.direct_dependencies == 1
+        assert bulk.transitive_dependencies == 2
+        assert bulk.languages == {"python", "javascript"}
+
+    def test_add_package_after_languages_reset(self):
+        """Test reassigned language sets are refilled by later packages."""
+        sbom = SBOM(project_name="test")
+        first = Package(name="a", version="1.0", language="python", package_manager="pip")
+        second = Package(name="b", version="1.0", language="python", package_manager="pip")
+        sbom.add_package(first, Dependency(package=first, dependency_type=DependencyType.DIRECT))
+
+        sbom.languages = set()
+        sbom.add_package(second, Dependency(package=second, dependency_type=DependencyType.DIRECT))
+
+        assert sbom.languages == {"python"}
+
+    async def test_transitive_cache_keeps_each_manifests_direct_entries(self):
+        """Test manifests sharing pins but not dependency types resolve independently."""
+        from dependency_canary.detectors import PackageManager
+
+        generator = SBOMGenerator()
+        requests_pkg = Package(name="requests", version="2.31.0", language="python", package_manager="pipenv")
+        idna_pkg = Package(name="idna", version="3.4", language="python", package_manager="pipenv")
+        transitive = Dependency(package=idna_pkg, dependency_type=DependencyType.TRANSITIVE,
+                                parent=requests_pkg.purl, depth=1)
+        runtime = [Dependency(package=requests_pkg, dependency_type=DependencyType.DIRECT, scope="runtime")]
+        development = [Dependency(package=requests_pkg, dependency_type=DependencyType.DEV, scope="development")]
+
+        parser = generator._parsers_by_value[PackageManager.PIPENV.value]
+        with patch.object(parser, "resolve_transitive_dependencies",
+                          new=AsyncMock(side_effect=lambda deps: deps + [transitive])) as mock_resolve:
+            first = await generator._resolve_transitive(PackageManager.PIPENV, runtime)
+            second = await generator._resolve_transitive(PackageManager.PIPENV, development)
+
+        assert mock_resolve.call_count == 1
+        assert [(d.dependency_type, d.scope) for d in first] == [
+            (DependencyType.DIRECT, "runtime"), (DependencyType.TRANSITIVE, None)
+        ]
+        assert [(d.dependency_type, d.scope) for d in second] == [
+            (DependencyType.DEV, "development"), (DependencyType.TRANSITIVE, None)
+        ]
+
+    def test_package_copy_recomputes_purl(self):
+        """Test an updated copy of a package does not keep the old PURL."""
+        package = Package(name="a", version="1.0", language="python", package_manager="pip")
+        assert package.purl == "pkg:pip/a@1.0"
+
+        updated = package.model_copy(update={"version": "2.0"})
+
+        assert updated.purl == "pkg:pip/a@2.0"
+        assert package.purl == "pkg:pip/a@1.0"
+
 
 class TestVulnerabilityEnrichment:
     """Test vulnerability enrichment functionality."""
     
-    @pytest.mark.asyncio
     async def test_enrich_empty_sbom(self):
         """Test enrichment of an empty SBOM."""
         enricher = VulnerabilityEnricher()
@@ -117,7 +185,6 @@ class TestVulnerabilityEnrichment:
         assert result.total_vulnerabilities == 0
         assert len(result.risks) == 0
     
-    @pytest.mark.asyncio
     async def test_enrich_sbom_with_mock_vulnerability(self):
         """Test enrichment with a mocked vulnerability response."""
         enricher = VulnerabilityEnricher()
@@ -143,15 +210,182 @@ class TestVulnerabilityEnrichment:
             mock_client.return_value.__aenter__.return_value.get.return_value = mock_response
             
             result = await enricher.enrich_sbom(sbom)
-            
+
             assert result.sbom == sbom
             assert result.total_vulnerabilities == 0
 
+    async def test_enrich_package_stream_batches(self):
+        """Test streamed packages are grouped into batches until the end marker."""
+        enricher = VulnerabilityEnricher()
+        batches = []
+
+        async def fake_enrich_batch(client, semaphore, packages):
+            batches.append([package.name for package in packages])
+            return []
+
+        queue = asyncio.Queue()
+        for name in ("a", "b", "c"):
+            queue.put_nowait(Package(name=name, version="1.0.0", language="python", package_manager="pip"))
+        queue.put_nowait(None)
+
+        with patch.object(enricher, '_enrich_batch', side_effect=fake_enrich_batch):
+            risks = await enricher.enrich_package_stream(queue, batch_size=2)
+
+        assert risks == []
+        assert batches == [["a", "b"], ["c"]]
+
+    async def test_query_osv_batch_shares_vulnerability_records(self):
+        """Test OSV batch results are mapped back to packages in order."""
+        enricher = VulnerabilityEnricher()
+        packages = [
+            Package(name=name, version="1.0.0", language="python", package_manager="pip")
+            for name in ("a", "b")
+        ]
+
+        batch_response = MagicMock(status_code=200)
+        batch_response.json.return_value = {
+            "results": [{"vulns": [{"id": "OSV-1"}]}, {}]
+        }
+        vuln_response = MagicMock(status_code=200)
+        vuln_response.json.return_value = {"id": "OSV-1", "summary": "bad"}
+
+        client = MagicMock()
+        client.request = AsyncMock(
+            side_effect=lambda method, url, **kwargs: batch_response if method == "POST" else vuln_response
+        )
+
+        results = await enricher._query_osv_batch(client, asyncio.Semaphore(2), packages)
+
+        assert [[v.id for v in vulns] for vulns in results] == [["OSV-1"], []]
+        assert client.request.call_count == 2
+
+    async def test_osv_snapshot_lookup(self):
+        """Test OSV lookups are answered from a local snapshot bundle."""
+        import json
+        import zipfile
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            record = {
+                "id": "PYSEC-0001",
+                "summary": "bad",
+                "affected": [{
+                    "package": {"ecosystem": "PyPI", "name": "requests"},
+                    "versions": ["2.25.1"]
+                }]
+            }
+            with zipfile.ZipFile(Path(tmpdir) / "PyPI.zip", "w") as bundle:
+                bundle.writestr("PYSEC-0001.json", json.dumps(record))
+
+            enricher = VulnerabilityEnricher(osv_snapshot_dir=Path(tmpdir))
+            affected = Package(name="requests", version="2.25.1", language="python", package_manager="pip")
+            fixed = Package(name="requests", version="2.31.0", language="python", package_manager="pip")
+            other = Package(name="left-pad", version="1.0.0", language="javascript", package_manager="npm")
+
+            assert [v.id for v in await enricher._query_osv_snapshot(affected)] == ["PYSEC-0001"]
+            assert await enricher._query_osv_snapshot(fixed) == []
+            # No npm bundle: the live API must be used
+            assert await enricher._query_osv_snapshot(other) is None
+
+    async def test_osv_snapshot_normalizes_pypi_names(self):
+        """Test snapshot lookups match PyPI names the way the live API does."""
+        import json
+        import zipfile
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            record = {
+                "id": "PYSEC-0002",
+                "summary": "bad",
+                "affected": [{
+                    "package": {"ecosystem": "PyPI", "name": "PyYAML"},
+                    "versions": ["5.3"]
+                }]
+            }
+            with zipfile.ZipFile(Path(tmpdir) / "PyPI.zip", "w") as bundle:
+                bundle.writestr("PYSEC-0002.json", json.dumps(record))
+
+            enricher = VulnerabilityEnricher(osv_snapshot_dir=Path(tmpdir))
+            package = Package(name="pyyaml", version="5.3", language="python", package_manager="pip")
+
+            assert [v.id for v in await enricher._query_osv_snapshot(package)] == ["PYSEC-0002"]
+
+    async def test_osv_snapshot_range_only_record_uses_live_api(self):
+        """Test advisories without enumerated versions fall back to the live API."""
+        import json
+        import zipfile
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            record = {
+                "id": "GHSA-0001",
+                "summary": "bad",
+                "affected": [{
+                    "package": {"ecosystem": "npm", "name": "left-pad"},
+                    "ranges": [{"type": "SEMVER", "events": [{"introduced": "0"}, {"fixed": "1.3.0"}]}]
+                }]
+            }
+            with zipfile.ZipFile(Path(tmpdir) / "npm.zip", "w") as bundle:
+                bundle.writestr("GHSA-0001.json", json.dumps(record))
+
+            enricher = VulnerabilityEnricher(osv_snapshot_dir=Path(tmpdir))
+            covered = Package(name="left-pad", version="1.0.0", language="javascript", package_manager="npm")
+            unrelated = Package(name="lodash", version="4.17.21", language="javascript", package_manager="npm")
+
+            assert await enricher._query_osv_snapshot(covered) is None
+            assert await enricher._query_osv_snapshot(unrelated) == []
+
+    async def test_request_with_retry_on_rate_limit(self):
+        """Test 429 responses are retried before giving up."""
+        from dependency_canary.http_client import request_with_retry
+
+        limited = MagicMock(status_code=429, headers={"Retry-After": "1"})
+        ok = MagicMock(status_code=200, headers={})
+        client = MagicMock()
+        client.request = AsyncMock(side_effect=[limited, ok])
+
+        with patch('dependency_canary.http_client.asyncio.sleep', new=AsyncMock()) as mock_sleep:
+            response = await request_with_retry(client, "GET", "https://example.invalid")
+
+        assert response is ok
+        mock_sleep.assert_awaited_once_with(1.0)
+
+
+class TestSupplyChainIntelligence:
+    """Test supply chain heuristics."""
+    
+    def test_typosquatting_detection(self):
+        """Test that near misses of popular names are flagged, in any case."""
+        intel = SupplyChainIntelligence()
+        
+        assert intel._check_typosquatting("reqeusts", "pip")
+        assert intel._check_typosquatting("Requestz", "pip")
+        # Edits at both ends share no prefix or suffix with the popular name
+        assert intel._check_typosquatting("xequestz", "pip")
+        assert intel._check_typosquatting("lodahs", "npm")
+        
+        assert not intel._check_typosquatting("requests", "pip")
+        assert not intel._check_typosquatting("Requests", "pip")
+        assert not intel._check_typosquatting("completely-unrelated", "pip")
+        assert not intel._check_typosquatting("reqeusts", "cargo")
+
+    async def test_failed_registry_fetches_are_not_cached(self):
+        """Test records from failed registry requests are fetched again next batch."""
+        intel = SupplyChainIntelligence()
+        package = Package(name="obscure-lib", version="1.0.0", language="python", package_manager="pip")
+
+        with patch('dependency_canary.supply_chain_intelligence.get_shared_client', return_value=MagicMock()), \
+             patch('dependency_canary.supply_chain_intelligence.request_with_retry',
+                   new=AsyncMock(side_effect=ConnectionError("registry down"))) as mock_request:
+            first = await intel.gather_package_intelligence([package])
+            calls = mock_request.call_count
+            await intel.gather_package_intelligence([package])
+
+        assert first[0].fetch_failed
+        assert not intel._intel_cache
+        assert mock_request.call_count == 2 * calls
+
 
 class TestIntegration:
     """Test integration functionality."""
     
-    @pytest.mark.asyncio
     async def test_basic_sbom_and_enrichment(self):
         """Test basic SBOM generation and enrichment."""
         generator = SBOMGenerator()
@@ -4,68 +4,31 @@ Test Modal integration functionality.
 """
 
 import pytest
-import tempfile
 import json
-from pathlib import Path
+from types import MappingProxyType, SimpleNamespace
 from unittest.mock import patch, MagicMock, AsyncMock
 
 from dependency_canary.modal_workers import ModalSBOMService
-from dependency_canary.models import SBOM, Package, ScanResult
+from dependency_canary.serialization import PAYLOAD_CODEC, pack_payload
+from dependency_canary.models import (
+    SBOM, Package, Dependency, DependencyType, ScanResult, PackageRisk, Vulnerability, SeverityLevel, RiskLevel
+)
 
-
-class TestModalWorkers:
-    """Test Modal worker functions."""
-    
-    @pytest.mark.asyncio
-    async def test_modal_service_fallback(self):
-        """Test Modal service falls back to local processing on failure."""
-        service = ModalSBOMService()
-        
-        with tempfile.TemporaryDirectory() as tmpdir:
-            tmppath = Path(tmpdir)
-            (tmppath / "requirements.txt").write_text("requests==2.25.1")
-            
-            # Mock Modal worker to fail
-            with patch('dependency_canary.modal_workers.generate_sbom_worker') as mock_worker:
-                mock_worker.remote.call = AsyncMock(side_effect=Exception("Modal unavailable"))
-                
-                # Mock local SBOM generator
-                with patch('dependency_canary.sbom.SBOMGenerator.generate_sbom') as mock_local:
-                    expected_sbom = SBOM(project_name="test", project_path=str(tmppath))
-                    mock_local.return_value = expected_sbom
-                    
-                    result = await service.generate_sbom_remote(tmppath, "test")
-                    
-                    assert result == expected_sbom
-                    mock_local.assert_called_once()
-    
-    @pytest.mark.asyncio
-    async def test_modal_vulnerability_enrichment_fallback(self):
-        """Test Modal vulnerability enrichment falls back to local processing."""
-        service = ModalSBOMService()
-        
-        test_sbom = SBOM(project_name="test", project_path="/test")
-        test_package = Package(
-            name="test-package",
-            version="1.0.0",
-            language="python",
-            package_manager="pip"
-        )
-        test_sbom.packages.append(test_package)
-        
-        # Mock Modal worker to fail
-        with patch('dependency_canary.modal_workers.enrich_vulnerabilities_worker') as mock_worker:
-            mock_worker.remote.call = AsyncMock(side_effect=Exception("Modal unavailable"))
-            
-            # Mock local vulnerability enricher
-            with patch('dependency_canary.vulnerability.VulnerabilityEnricher.enrich_sbom') as mock_local:
-                expected_result = ScanResult(sbom=test_sbom)
-                mock_local.return_value = expected_result
-                
-                result = await service.enrich_vulnerabilities_remote(test_sbom)
-                
-                assert result == expected_result
-                mock_local.assert_called_once()
+# Successful Modal full scan response, read-only so tests cannot alter it
+_FULL_SCAN_MOCK_RESULT = MappingProxyType({
+    "sbom": {
+        "project_name": "test",
+        "total_packages": 1,
+        "packages": [],
+        "dependencies": [],
+        "languages": ["python"],
+        "package_managers": ["pip"]
+    },
+    "total_vulnerabilities": 0,
+    "risks": []
+})
+# The same response as the worker sends it; msgpack needs a real dict
+_FULL_SCAN_MOCK_PAYLOAD = pack_payload(dict(_FULL_SCAN_MOCK_RESULT), PAYLOAD_CODEC)
 
 
 class TestModalServiceIntegration:
@@ -76,36 +39,39 @@ class TestModalServiceIntegration:
         service = ModalSBOMService()
         assert service.app is not None
     
-    @pytest.mark.asyncio
-    async def test_full_scan_with_mock_modal(self):
+    async def test_full_scan_with_mock_modal(self, tmp_path):
         """Test full scan with mocked Modal responses."""
         service = ModalSBOMService()
         
-        with tempfile.TemporaryDirectory() as tmpdir:
-            tmppath = Path(tmpdir)
-            (tmppath / "requirements.txt").write_text("click==8.0.0")
+        (tmp_path / "requirements.txt").write_text("click==8.0.0")
+        
+        with patch('dependency_canary.modal_workers.full_scan_worker') as mock_worker:
+            mock_worker.remote = AsyncMock(return_value=_FULL_SCAN_MOCK_PAYLOAD)
             
-            # Mock successful Modal response
-            mock_result = {
-                "sbom": {
-                    "project_name": "test",
-                    "total_packages": 1,
-                    "packages": [],
-                    "dependencies": [],
-                    "languages": ["python"],
-                    "package_managers": ["pip"]
-                },
-                "total_vulnerabilities": 0,
-                "risks": []
-            }
+            result = await service.full_scan_remote(tmp_path, "test")
             
-            with patch('dependency_canary.modal_workers.full_scan_worker') as mock_worker:
-                mock_worker.remote.call = AsyncMock(return_value=mock_result)
-                
-                result = await service.full_scan_remote(tmppath, "test")
-                
-                assert result.sbom.project_name == "test"
-                assert result.total_vulnerabilities == 0
+            assert result.sbom.project_name == "test"
+            assert result.total_vulnerabilities == 0
+            assert mock_worker.remote.call_args.args[0]["payload_codec"] == PAYLOAD_CODEC
+
+    async def test_detect_manifests_local(self, tmp_path):
+        """Test manifest detection runs locally without a Modal worker."""
+        service = ModalSBOMService()
+
+        (tmp_path / "requirements.txt").write_text("click==8.0.0")
+        (tmp_path / "web").mkdir()
+        (tmp_path / "web" / "package.json").write_text("{}")
+
+        with patch('dependency_canary.modal_workers.detect_manifests_worker') as mock_worker:
+            manifests = await service.detect_manifests_local(tmp_path)
+            mock_worker.remote.assert_not_called()
+
+        names = {manifest.path.name for manifest in manifests}
+        assert {"requirements.txt", "package.json"} <= names
+
+        per_project = await service.detect_manifests_local_many([tmp_path, tmp_path / "web"])
+        assert len(per_project) == 2
+        assert [m.path.name for m in per_project[1]] == ["package.json"]
 
 
 class TestModalWorkerFunctions:
@@ -130,9 +96,40 @@ class TestModalWorkerFunctions:
         assert serialized["project_name"] == "test"
         
         # Should be able to recreate from serialized data
-        recreated = SBOM.model_validate(serialized)
+        recreated = SBOM.from_trusted_dict(serialized)
         assert recreated.project_name == sbom.project_name
         assert len(recreated.packages) == len(sbom.packages)
+        assert recreated == SBOM.model_validate(serialized)
+
+    def test_cached_dump(self):
+        """Test that repeated dumps of an unchanged SBOM are reused."""
+        sbom = SBOM(project_name="test", project_path="/test")
+        first = sbom.cached_dump()
+        assert first == sbom.model_dump(exclude_none=True)
+        assert "project_version" not in first
+        assert sbom.cached_dump() is first
+
+        package = Package(name="requests", version="2.31.0", language="python", package_manager="pip")
+        sbom.packages.append(package)
+        assert len(sbom.cached_dump()["packages"]) == 1
+
+        sbom.project_name = "renamed"
+        assert sbom.cached_dump()["project_name"] == "renamed"
+
+        copy = sbom.model_copy(update={"project_name": "copy"})
+        assert copy.cached_dump()["project_name"] == "copy"
+
+    def test_trusted_sbom_shares_packages(self):
+        """Test that dependencies of a recreated SBOM reuse its packages."""
+        sbom = SBOM(project_name="test", project_path="/test")
+        package = Package(name="requests", version="2.31.0", language="python", package_manager="pip")
+        sbom.add_package(package, Dependency(package=package, dependency_type=DependencyType.DIRECT))
+
+        recreated = SBOM.from_trusted_dict(sbom.model_dump())
+        assert recreated == sbom
+        assert SBOM.from_trusted_dict(sbom.model_dump(exclude_none=True)) == sbom
+        assert recreated.dependencies[0].package is recreated.packages[0]
+        assert recreated.languages == {"python"}
     
     def test_scan_result_serialization(self):
         """Test that scan results can be serialized."""
@@ -145,9 +142,45 @@ class TestModalWorkerFunctions:
         assert "total_vulnerabilities" in serialized
         
         # Should be able to recreate
-        recreated = ScanResult.model_validate(serialized)
+        recreated = ScanResult.from_trusted_dict(serialized)
+        assert recreated == ScanResult.model_validate(serialized)
         assert recreated.sbom.project_name == result.sbom.project_name
 
+    def test_scan_result_json_output(self):
+        """Test scan results encode to JSON without a custom encoder."""
+        from dependency_canary.serialization import json_dumps
+
+        sbom = SBOM(project_name="test", project_path="/test", languages={"python"})
+        result = ScanResult(sbom=sbom)
+
+        decoded = json.loads(json_dumps(result.model_dump(mode="json"), indent=True))
+        assert decoded["sbom"]["languages"] == ["python"]
+        assert decoded["scan_timestamp"] == result.scan_timestamp.isoformat()
+
+    def test_scan_result_severity_index(self):
+        """Test severity statistics and lookups survive a serialization round trip."""
+        def vuln(vuln_id, severity):
+            return Vulnerability(id=vuln_id, source="osv", title="", description="", severity=severity)
+
+        result = ScanResult(sbom=SBOM(project_name="test"))
+        result.add_package_risk(PackageRisk(
+            package_purl="pkg:pip/a@1.0", overall_risk=RiskLevel.HIGH, risk_score=5.0,
+            vulnerabilities=[vuln("V-1", SeverityLevel.HIGH), vuln("V-2", SeverityLevel.LOW)]
+        ))
+        result.add_package_risk(PackageRisk(
+            package_purl="pkg:pip/b@1.0", overall_risk=RiskLevel.HIGH, risk_score=3.0,
+            vulnerabilities=[vuln("V-3", SeverityLevel.HIGH)]
+        ))
+
+        assert result.total_vulnerabilities == 3
+        assert result.high_vulnerabilities == 2
+        assert result.low_vulnerabilities == 1
+
+        recreated = ScanResult.model_validate(result.model_dump())
+        assert recreated == result
+        assert [v.id for v in recreated.get_vulnerabilities_by_severity(SeverityLevel.HIGH)] == ["V-1", "V-3"]
+        assert recreated.get_vulnerabilities_by_severity(SeverityLevel.CRITICAL) == []
+
 
 class TestModalConfiguration:
     """Test Modal configuration and setup."""
@@ -172,51 +205,65 @@ class TestModalConfiguration:
         assert volume is not None
 
 
+@pytest.fixture(scope="class")
+def modal_mocks():
+    """Modal workers and their local fallbacks, patched once per test class."""
+    with patch('dependency_canary.modal_workers.generate_sbom_worker') as sbom_worker, \
+            patch('dependency_canary.modal_workers.enrich_vulnerabilities_worker') as enrich_worker, \
+            patch('dependency_canary.sbom.SBOMGenerator.generate_sbom') as local_sbom, \
+            patch('dependency_canary.vulnerability.VulnerabilityEnricher.enrich_sbom') as local_enrich:
+        yield SimpleNamespace(
+            sbom_worker=sbom_worker, enrich_worker=enrich_worker,
+            local_sbom=local_sbom, local_enrich=local_enrich,
+        )
+
+
 class TestModalErrorHandling:
     """Test error handling in Modal integration."""
     
-    @pytest.mark.asyncio
-    async def test_modal_timeout_handling(self):
-        """Test handling of Modal timeouts."""
+    @pytest.fixture(autouse=True)
+    def reset_modal_mocks(self, modal_mocks, worker_error):
+        """Give every test fresh calls and make both workers raise ``worker_error``."""
+        for mock in (modal_mocks.local_sbom, modal_mocks.local_enrich):
+            mock.reset_mock(return_value=True)
+        modal_mocks.sbom_worker.remote = AsyncMock(side_effect=worker_error)
+        modal_mocks.enrich_worker.remote = AsyncMock(side_effect=worker_error)
+    
+    @pytest.fixture(params=[Exception, TimeoutError, ConnectionError])
+    def worker_error(self, request):
+        """Error raised by the mocked Modal worker call."""
+        return request.param("Modal unavailable")
+    
+    async def test_sbom_generation_fallback(self, modal_mocks, tmp_path):
+        """Test SBOM generation falls back to local processing when Modal fails."""
         service = ModalSBOMService()
+        expected_sbom = SBOM(project_name="test", project_path=str(tmp_path))
+        modal_mocks.local_sbom.return_value = expected_sbom
         
-        with tempfile.TemporaryDirectory() as tmpdir:
-            tmppath = Path(tmpdir)
-            
-            # Mock timeout error
-            with patch('dependency_canary.modal_workers.generate_sbom_worker') as mock_worker:
-                mock_worker.remote.call = AsyncMock(side_effect=TimeoutError("Modal timeout"))
-                
-                # Should fall back to local processing
-                with patch('dependency_canary.sbom.SBOMGenerator.generate_sbom') as mock_local:
-                    expected_sbom = SBOM(project_name="test", project_path=str(tmppath))
-                    mock_local.return_value = expected_sbom
-                    
-                    result = await service.generate_sbom_remote(tmppath, "test")
-                    
-                    assert result == expected_sbom
-                    mock_local.assert_called_once()
+        result = await service.generate_sbom_remote(tmp_path, "test")
+        
+        assert result == expected_sbom
+        modal_mocks.sbom_worker.remote.assert_awaited_once()
+        modal_mocks.local_sbom.assert_called_once()
     
-    @pytest.mark.asyncio
-    async def test_modal_network_error_handling(self):
-        """Test handling of Modal network errors."""
+    async def test_vulnerability_enrichment_fallback(self, modal_mocks):
+        """Test vulnerability enrichment falls back to local processing when Modal fails."""
         service = ModalSBOMService()
-        
         test_sbom = SBOM(project_name="test", project_path="/test")
+        test_sbom.packages.append(Package(
+            name="test-package",
+            version="1.0.0",
+            language="python",
+            package_manager="pip"
+        ))
+        expected_result = ScanResult(sbom=test_sbom)
+        modal_mocks.local_enrich.return_value = expected_result
         
-        # Mock network error
-        with patch('dependency_canary.modal_workers.enrich_vulnerabilities_worker') as mock_worker:
-            mock_worker.remote.call = AsyncMock(side_effect=ConnectionError("Network unavailable"))
-            
-            # Should fall back to local processing
-            with patch('dependency_canary.vulnerability.VulnerabilityEnricher.enrich_sbom') as mock_local:
-                expected_result = ScanResult(sbom=test_sbom)
-                mock_local.return_value = expected_result
-                
-                result = await service.enrich_vulnerabilities_remote(test_sbom)
-                
-                assert result == expected_result
-                mock_local.assert_called_once()
+        result = await service.enrich_vulnerabilities_remote(test_sbom)
+        
+        assert result == expected_result
+        modal_mocks.enrich_worker.remote.assert_awaited_once()
+        modal_mocks.local_enrich.assert_called_once()
 
 
 if __name__ == "__main__":
@@ -4,29 +4,52 @@ Test parsers for different package managers.
 """
 
 import pytest
-import tempfile
+import asyncio
+import threading
 import json
 from pathlib import Path
+from unittest.mock import patch, MagicMock
 
 from dependency_canary.parsers.python import PythonParser
 from dependency_canary.parsers.javascript import JavaScriptParser
 from dependency_canary.parsers.golang import GoParser
+from dependency_canary.parsers.csharp import CSharpParser
+from dependency_canary.parsers.cpp import CppParser
+from dependency_canary.parsers.java import JavaParser
+from dependency_canary.parsers.ruby import RubyParser
+from dependency_canary.parsers.rust import RustParser
+from dependency_canary.detectors import PackageManager
 from dependency_canary.models import DependencyType
+from dependency_canary.serialization import json_dumps
+
+
+# Parsers keep no per-file state (parse results are cached by file path,
+# modification time and size), so one instance serves every test
+@pytest.fixture(scope="session")
+def python_parser():
+    return PythonParser()
+
+
+@pytest.fixture(scope="session")
+def javascript_parser():
+    return JavaScriptParser()
+
+
+@pytest.fixture(scope="session")
+def go_parser():
+    return GoParser()
 
 
 class TestPythonParser:
     """Test Python package parser."""
     
-    @pytest.mark.asyncio
-    async def test_parse_requirements_txt(self):
+    async def test_parse_requirements_txt(self, python_parser, tmp_path):
         """Test parsing requirements.txt."""
-        parser = PythonParser()
+        parser = python_parser
         
-        with tempfile.TemporaryDirectory() as tmpdir:
-            tmppath = Path(tmpdir)
-            requirements_file = tmppath / "requirements.txt"
-            
-            requirements_file.write_text("""
+        requirements_file = tmp_path / "requirements.txt"
+        
+        requirements_file.write_text("""
 # Core dependencies
 requests==2.25.1
 click>=8.0.0
@@ -35,32 +58,48 @@ numpy~=1.20.0
 # Optional dependencies
 pytest==7.1.0  # Testing framework
 """)
-            
-            dependencies = await parser.parse_manifest(requirements_file)
-            
-            assert len(dependencies) == 4
-            
-            # Check specific packages
-            package_names = [dep.package.name for dep in dependencies]
-            assert "requests" in package_names
-            assert "click" in package_names
-            assert "numpy" in package_names
-            assert "pytest" in package_names
-            
-            # Check versions
-            requests_dep = next(dep for dep in dependencies if dep.package.name == "requests")
-            assert requests_dep.package.version == "2.25.1"
-    
-    @pytest.mark.asyncio
-    async def test_parse_pyproject_toml(self):
+        
+        dependencies = await parser.parse_manifest(requirements_file)
+        
+        assert len(dependencies) == 4
+        
+        # Check specific packages
+        package_names = {dep.package.name for dep in dependencies}
+        assert "requests" in package_names
+        assert "click" in package_names
+        assert "numpy" in package_names
+        assert "pytest" in package_names
+        
+        # Check versions
+        by_name = {dep.package.name: dep for dep in dependencies}
+        assert by_name["requests"].package.version == "2.25.1"
+
+    def test_parse_hashed_requirements_txt(self, python_parser, tmp_path):
+        """Test pip-compile output with --hash continuation lines and options."""
+        requirements_file = tmp_path / "requirements.txt"
+        requirements_file.write_text("""--index-url https://pypi.org/simple
+-e .
+certifi==2023.7.22 \\
+    --hash=sha256:539cc1d13202e33ca466e88b2807e29f4c13049d6d87031a3c110744495cb082 \\
+    --hash=sha256:92d6037539857d8206b8f6ae472e8b77db8058fec5937a1ef3f54304089edbb9
+    # via requests
+idna==3.4 --hash=sha256:90b77e79eaa3eba6de819a0c442c0b4ceefc341a7a2ab77d7562bf49f425c5c2
+""")
+
+        dependencies = python_parser.parse_manifest_sync(requirements_file)
+
+        assert [(dep.package.name, dep.package.version) for dep in dependencies] == [
+            ("certifi", "2023.7.22"),
+            ("idna", "3.4"),
+        ]
+
+    async def test_parse_pyproject_toml(self, python_parser, tmp_path):
         """Test parsing pyproject.toml."""
-        parser = PythonParser()
+        parser = python_parser
         
-        with tempfile.TemporaryDirectory() as tmpdir:
-            tmppath = Path(tmpdir)
-            pyproject_file = tmppath / "pyproject.toml"
-            
-            pyproject_file.write_text("""
+        pyproject_file = tmp_path / "pyproject.toml"
+        
+        pyproject_file.write_text("""
 [tool.poetry]
 name = "test-project"
 version = "0.1.0"
@@ -74,126 +113,203 @@ click = "8.0.0"
 pytest = "^7.0.0"
 black = "^22.0.0"
 """)
-            
-            dependencies = await parser.parse_manifest(pyproject_file)
-            
-            assert len(dependencies) == 4  # requests, click, pytest, black
-            
-            # Check that dev dependencies are marked correctly
-            dev_deps = [dep for dep in dependencies if dep.dependency_type == DependencyType.DEV]
-            assert len(dev_deps) == 2
-            
-            dev_names = [dep.package.name for dep in dev_deps]
-            assert "pytest" in dev_names
-            assert "black" in dev_names
+        
+        dependencies = await parser.parse_manifest(pyproject_file)
+        
+        assert len(dependencies) == 4  # requests, click, pytest, black
+        
+        # Check that dev dependencies are marked correctly
+        dev_deps = [dep for dep in dependencies if dep.dependency_type == DependencyType.DEV]
+        assert len(dev_deps) == 2
+        
+        dev_names = {dep.package.name for dep in dev_deps}
+        assert "pytest" in dev_names
+        assert "black" in dev_names
+
+
+    async def test_parse_poetry_lock(self, python_parser, tmp_path):
+        """Test reading name/version pairs from poetry.lock."""
+        parser = python_parser
+        
+        lock_file = tmp_path / "poetry.lock"
+        lock_file.write_text("""[[package]]
+name = "certifi"
+version = "2023.7.22"
+description = "Python package for providing Mozilla's CA Bundle."
+files = [
+    {file = "certifi-2023.7.22-py3-none-any.whl", hash = "sha256:92d6"},
+]
+
+[[package]]
+name = "idna"
+version = "3.4"
+
+[metadata]
+lock-version = "2.0"
+""")
+        
+        dependencies = await parser.parse_lockfile(lock_file)
+        
+        assert [(dep.package.name, dep.package.version) for dep in dependencies] == [
+            ("certifi", "2023.7.22"),
+            ("idna", "3.4"),
+        ]
+
+    async def test_parse_many_manifests_concurrently(self, python_parser, tmp_path):
+        """Test concurrent parse_manifest calls overlap instead of running one at a time."""
+        parser = python_parser
+        parse_sync = parser.parse_manifest_sync
+        # Every parse waits for a second one to start, so serialized parsing
+        # breaks the barrier instead of passing slowly; the wait happens before
+        # the parse cache takes its per-key lock, which two files may share
+        barrier = threading.Barrier(2, timeout=5)
+        semaphore = asyncio.Semaphore(8)
+
+        def overlapping_parse(path):
+            barrier.wait()
+            return parse_sync(path)
+
+        async def parse(path):
+            async with semaphore:
+                return await parser.parse_manifest(path)
+
+        paths = []
+        for i in range(32):
+            (tmp_path / str(i)).mkdir()
+            path = tmp_path / str(i) / "requirements.txt"
+            path.write_text(f"package-{i}=={i}.0\n")
+            paths.append(path)
+
+        with patch.object(parser, "parse_manifest_sync", overlapping_parse):
+            results = await asyncio.gather(*(parse(path) for path in paths))
+
+        assert [[dep.package.name for dep in deps] for deps in results] == [
+            [f"package-{i}"] for i in range(32)
+        ]
+
+    async def test_resolve_transitive_order_ignores_response_timing(self):
+        """Test a package reachable from two parents is attributed to the first in input order."""
+        parser = PythonParser()
+        requires = {
+            "a": ["shared==1.0"],
+            "b": ["shared==1.0", "other==1.0"],
+            "shared": ["leaf==1.0"],
+        }
+
+        async def get(url, timeout):
+            name = url.split("/")[4]
+            # The first parent answers last
+            await asyncio.sleep(0.05 if name == "a" else 0)
+            response = MagicMock(status_code=200)
+            response.json.return_value = {"info": {"requires_dist": requires.get(name, [])}}
+            return response
+
+        direct = [
+            parser.create_dependency(parser.create_package(name=name, version="1.0"))
+            for name in ("a", "b")
+        ]
+        client = MagicMock(get=get)
+        with patch("dependency_canary.parsers.python.get_shared_client", return_value=client):
+            resolved = await parser.resolve_transitive_dependencies(direct)
+
+        assert [(dep.package.name, dep.parent, dep.depth) for dep in resolved] == [
+            ("a", None, 0),
+            ("b", None, 0),
+            ("shared", "pkg:pip/a@1.0", 1),
+            ("other", "pkg:pip/b@1.0", 1),
+            ("leaf", "pkg:pip/shared@1.0", 2),
+        ]
 
 
 class TestJavaScriptParser:
     """Test JavaScript/Node.js package parser."""
     
-    @pytest.mark.asyncio
-    async def test_parse_package_json(self):
+    def test_parse_package_json(self, javascript_parser):
         """Test parsing package.json."""
-        parser = JavaScriptParser()
+        parser = javascript_parser
         
-        with tempfile.TemporaryDirectory() as tmpdir:
-            tmppath = Path(tmpdir)
-            package_file = tmppath / "package.json"
-            
-            package_data = {
-                "name": "test-project",
-                "version": "1.0.0",
-                "dependencies": {
-                    "lodash": "^4.17.21",
-                    "express": "4.18.0",
-                    "axios": "~0.27.0"
-                },
-                "devDependencies": {
-                    "jest": "^28.0.0",
-                    "typescript": "4.7.4"
-                }
+        package_data = {
+            "name": "test-project",
+            "version": "1.0.0",
+            "dependencies": {
+                "lodash": "^4.17.21",
+                "express": "4.18.0",
+                "axios": "~0.27.0"
+            },
+            "devDependencies": {
+                "jest": "^28.0.0",
+                "typescript": "4.7.4"
             }
-            
-            package_file.write_text(json.dumps(package_data, indent=2))
-            
-            dependencies = await parser.parse_manifest(package_file)
-            
-            assert len(dependencies) == 5
-            
-            # Check regular dependencies
-            regular_deps = [dep for dep in dependencies if dep.dependency_type == DependencyType.DIRECT]
-            assert len(regular_deps) == 3
-            
-            regular_names = [dep.package.name for dep in regular_deps]
-            assert "lodash" in regular_names
-            assert "express" in regular_names
-            assert "axios" in regular_names
-            
-            # Check dev dependencies
-            dev_deps = [dep for dep in dependencies if dep.dependency_type == DependencyType.DEV]
-            assert len(dev_deps) == 2
-            
-            dev_names = [dep.package.name for dep in dev_deps]
-            assert "jest" in dev_names
-            assert "typescript" in dev_names
+        }
+        
+        dependencies = parser.parse_manifest_bytes(json_dumps(package_data).encode())
+        
+        assert len(dependencies) == 5
+        
+        # Check regular dependencies
+        regular_deps = [dep for dep in dependencies if dep.dependency_type == DependencyType.DIRECT]
+        assert len(regular_deps) == 3
+        
+        regular_names = {dep.package.name for dep in regular_deps}
+        assert "lodash" in regular_names
+        assert "express" in regular_names
+        assert "axios" in regular_names
+        
+        # Check dev dependencies
+        dev_deps = [dep for dep in dependencies if dep.dependency_type == DependencyType.DEV]
+        assert len(dev_deps) == 2
+        
+        dev_names = {dep.package.name for dep in dev_deps}
+        assert "jest" in dev_names
+        assert "typescript" in dev_names
     
-    @pytest.mark.asyncio
-    async def test_parse_package_lock_json(self):
+    def test_parse_package_lock_json(self, javascript_parser):
         """Test parsing package-lock.json."""
-        parser = JavaScriptParser()
+        parser = javascript_parser
         
-        with tempfile.TemporaryDirectory() as tmpdir:
-            tmppath = Path(tmpdir)
-            lock_file = tmppath / "package-lock.json"
-            
-            lock_data = {
-                "name": "test-project",
-                "version": "1.0.0",
-                "lockfileVersion": 2,
-                "packages": {
-                    "": {
-                        "name": "test-project",
-                        "version": "1.0.0"
-                    },
-                    "node_modules/lodash": {
-                        "version": "4.17.21",
-                        "resolved": "https://registry.npmjs.org/lodash/-/lodash-4.17.21.tgz"
-                    },
-                    "node_modules/express": {
-                        "version": "4.18.0",
-                        "resolved": "https://registry.npmjs.org/express/-/express-4.18.0.tgz"
-                    }
+        lock_data = {
+            "name": "test-project",
+            "version": "1.0.0",
+            "lockfileVersion": 2,
+            "packages": {
+                "": {
+                    "name": "test-project",
+                    "version": "1.0.0"
+                },
+                "node_modules/lodash": {
+                    "version": "4.17.21",
+                    "resolved": "https://registry.npmjs.org/lodash/-/lodash-4.17.21.tgz"
+                },
+                "node_modules/express": {
+                    "version": "4.18.0",
+                    "resolved": "https://registry.npmjs.org/express/-/express-4.18.0.tgz"
                 }
             }
-            
-            lock_file.write_text(json.dumps(lock_data, indent=2))
-            
-            dependencies = await parser.parse_lockfile(lock_file)
-            
-            assert len(dependencies) == 2
-            
-            package_names = [dep.package.name for dep in dependencies]
-            assert "lodash" in package_names
-            assert "express" in package_names
-            
-            # These particular dependencies should be marked as direct (depth 0 in node_modules/)
-            for dep in dependencies:
-                assert dep.dependency_type == DependencyType.DIRECT
+        }
+        
+        dependencies = parser.parse_lockfile_bytes(json_dumps(lock_data).encode())
+        
+        assert len(dependencies) == 2
+        
+        package_names = {dep.package.name for dep in dependencies}
+        assert "lodash" in package_names
+        assert "express" in package_names
+        
+        # These particular dependencies should be marked as direct (depth 0 in node_modules/)
+        for dep in dependencies:
+            assert dep.dependency_type == DependencyType.DIRECT
 
 
 class TestGoParser:
     """Test Go package parser."""
     
-    @pytest.mark.asyncio
-    async def test_parse_go_mod(self):
+    async def test_parse_go_mod(self, go_parser, tmp_path):
         """Test parsing go.mod."""
-        parser = GoParser()
+        parser = go_parser
         
-        with tempfile.TemporaryDirectory() as tmpdir:
-            tmppath = Path(tmpdir)
-            go_mod_file = tmppath / "go.mod"
-            
-            go_mod_file.write_text("""
+        go_mod_file = tmp_path / "go.mod"
+        
+        go_mod_file.write_text("""
 module github.com/example/myproject
 
 go 1.19
@@ -206,72 +322,435 @@ require (
 
 require github.com/gorilla/mux v1.8.0
 """)
-            
-            dependencies = await parser.parse_manifest(go_mod_file)
-            
-            assert len(dependencies) == 4
-            
-            package_names = [dep.package.name for dep in dependencies]
-            assert "github.com/gin-gonic/gin" in package_names
-            assert "github.com/stretchr/testify" in package_names
-            assert "golang.org/x/net" in package_names
-            assert "github.com/gorilla/mux" in package_names
-            
-            # Check versions
-            gin_dep = next(dep for dep in dependencies if dep.package.name == "github.com/gin-gonic/gin")
-            assert gin_dep.package.version == "v1.8.1"
-    
-    @pytest.mark.asyncio
-    async def test_parse_go_sum(self):
+        
+        dependencies = await parser.parse_manifest(go_mod_file)
+        
+        assert len(dependencies) == 4
+        
+        package_names = {dep.package.name for dep in dependencies}
+        assert "github.com/gin-gonic/gin" in package_names
+        assert "github.com/stretchr/testify" in package_names
+        assert "golang.org/x/net" in package_names
+        assert "github.com/gorilla/mux" in package_names
+        
+        # Check versions
+        by_name = {dep.package.name: dep for dep in dependencies}
+        assert by_name["github.com/gin-gonic/gin"].package.version == "v1.8.1"
+
+    async def test_parse_go_mod_one_line_require_block(self, go_parser, tmp_path):
+        """Test a require block written on a single line."""
+        go_mod_file = tmp_path / "go.mod"
+        go_mod_file.write_text("module example.com/app\n\nrequire ( example.com/m v1.0.0 )\n")
+        
+        dependencies = await go_parser.parse_manifest(go_mod_file)
+        
+        assert [(dep.package.name, dep.package.version) for dep in dependencies] == [
+            ("example.com/m", "v1.0.0")
+        ]
+
+    async def test_parse_go_sum(self, go_parser, tmp_path):
         """Test parsing go.sum."""
-        parser = GoParser()
+        parser = go_parser
         
-        with tempfile.TemporaryDirectory() as tmpdir:
-            tmppath = Path(tmpdir)
-            go_sum_file = tmppath / "go.sum"
-            
-            go_sum_file.write_text("""
+        go_sum_file = tmp_path / "go.sum"
+        
+        go_sum_file.write_text("""
 github.com/gin-gonic/gin v1.8.1 h1:4+fr/el88TOO3ewCmQr8cx/CtZ/umlIRIs5M4NTNjf8=
 github.com/gin-gonic/gin v1.8.1/go.mod h1:ji8BvRH1azfM+SYow9zQ6SZMvR8qOMdHAHaTQx6YyL0=
 github.com/stretchr/testify v1.8.0 h1:pSgiaMZlXftHpm5L7V1+rVB+AZJydKsMxsQBIJw4PKk=
 github.com/stretchr/testify v1.8.0/go.mod h1:yNjHg4UonilssWZ8iaSj1OCr/vHnekPRkoO+kdMU+MU=
 """)
-            
-            dependencies = await parser.parse_lockfile(go_sum_file)
-            
-            assert len(dependencies) == 2
-            
-            package_names = [dep.package.name for dep in dependencies]
-            assert "github.com/gin-gonic/gin" in package_names
-            assert "github.com/stretchr/testify" in package_names
-            
-            # go.sum dependencies should be marked as transitive
-            for dep in dependencies:
-                assert dep.dependency_type == DependencyType.TRANSITIVE
+        
+        dependencies = await parser.parse_lockfile(go_sum_file)
+        
+        assert len(dependencies) == 2
+        
+        package_names = {dep.package.name for dep in dependencies}
+        assert "github.com/gin-gonic/gin" in package_names
+        assert "github.com/stretchr/testify" in package_names
+        
+        # go.sum dependencies should be marked as transitive
+        for dep in dependencies:
+            assert dep.dependency_type == DependencyType.TRANSITIVE
+
+
+class TestRubyParser:
+    """Test Ruby Bundler parser."""
+    
+    async def test_parse_gemfile_lock(self, tmp_path):
+        """Test only top-level GEM specs are read from Gemfile.lock."""
+        parser = RubyParser()
+        
+        lock_file = tmp_path / "Gemfile.lock"
+        lock_file.write_text("""GEM
+  remote: https://rubygems.org/
+  specs:
+    actionpack (7.0.4)
+      rack (~> 2.0)
+    rack (2.2.8)
+
+PLATFORMS
+  ruby
+
+DEPENDENCIES
+  actionpack
+""")
+        
+        dependencies = await parser.parse_lockfile(lock_file)
+        
+        assert [(dep.package.name, dep.package.version) for dep in dependencies] == [
+            ("actionpack", "7.0.4"),
+            ("rack", "2.2.8"),
+        ]
+
+
+    async def test_parse_gemfile_groups(self, tmp_path):
+        """Test grouped gems are reported once, as DEV for development/test groups."""
+        parser = RubyParser()
+        
+        gemfile = tmp_path / "Gemfile"
+        gemfile.write_text("""source "https://rubygems.org"
+
+gem "rails", "~> 7.0"
+
+group :development, :test do
+  gem "rspec-rails"
+  platforms :mri do
+    gem "byebug"
+  end
+end
+
+group :production do
+  gem "pg", "1.5.4"
+end
+
+gem "puma"
+""")
+        
+        dependencies = await parser.parse_manifest(gemfile)
+        
+        assert [(dep.package.name, dep.dependency_type) for dep in dependencies] == [
+            ("rails", DependencyType.DIRECT),
+            ("rspec-rails", DependencyType.DEV),
+            ("byebug", DependencyType.DEV),
+            ("pg", DependencyType.DIRECT),
+            ("puma", DependencyType.DIRECT),
+        ]
+
+
+class TestRustParser:
+    """Test Rust Cargo parser."""
+    
+    async def test_parse_cargo_toml(self, tmp_path):
+        """Test all dependency tables are read, with git/path sources as versions."""
+        parser = RustParser()
+        
+        cargo_file = tmp_path / "Cargo.toml"
+        cargo_file.write_text("""[package]
+name = "demo"
+version = "0.1.0"
+
+[dependencies]
+serde = { version = "1.0", features = ["derive"] }
+rand = "0.8"
+local = { path = "../local" }
+
+[dev-dependencies]
+tokio = { git = "https://github.com/tokio-rs/tokio" }
+
+[workspace.dependencies]
+anyhow = "1.0"
+""")
+        
+        dependencies = await parser.parse_manifest(cargo_file)
+        
+        assert [(dep.package.name, dep.package.version, dep.dependency_type) for dep in dependencies] == [
+            ("serde", "1.0", DependencyType.DIRECT),
+            ("rand", "0.8", DependencyType.DIRECT),
+            ("local", "path:../local", DependencyType.DIRECT),
+            ("tokio", "git:https://github.com/tokio-rs/tokio", DependencyType.DEV),
+            ("anyhow", "1.0", DependencyType.DIRECT),
+        ]
+
+
+class TestJavaParser:
+    """Test Java Maven parser."""
+    
+    async def test_parse_pom_xml(self, tmp_path):
+        """Test parsing POM files with and without the Maven namespace."""
+        parser = JavaParser()
+        dependencies_xml = """
+  <dependencies>
+    <dependency>
+      <groupId>com.google.guava</groupId>
+      <artifactId>guava</artifactId>
+      <version>32.1.2-jre</version>
+    </dependency>
+    <dependency>
+      <groupId>junit</groupId>
+      <artifactId>junit</artifactId>
+      <version>4.13.2</version>
+      <scope>test</scope>
+    </dependency>
+  </dependencies>"""
+        
+        for name, root in (
+            ("namespaced", '<project xmlns="http://maven.apache.org/POM/4.0.0">'),
+            ("plain", "<project>"),
+        ):
+            pom_dir = tmp_path / name
+            pom_dir.mkdir()
+            pom_file = pom_dir / "pom.xml"
+            pom_file.write_text(f"{root}{dependencies_xml}\n</project>")
+            
+            dependencies = await parser.parse_manifest(pom_file)
+            
+            assert [dep.package.name for dep in dependencies] == [
+                "com.google.guava:guava",
+                "junit:junit",
+            ]
+            assert dependencies[0].package.version == "32.1.2-jre"
+            assert dependencies[1].dependency_type == DependencyType.DEV
+
+    async def test_parse_gradle_lockfile(self, tmp_path):
+        """Test parsing gradle.lockfile entries, skipping comments and the empty line."""
+        parser = JavaParser(PackageManager.GRADLE)
+        
+        lock_file = tmp_path / "gradle.lockfile"
+        lock_file.write_text("""# This is a Gradle generated file for dependency locking.
+# Manual edits can break the build and are not advised.
+# This file is expected to be part of source control.
+com.google.guava:guava:32.1.2-jre=compileClasspath,runtimeClasspath
+junit:junit:4.13.2=testCompileClasspath
+empty=annotationProcessor
+""")
+        
+        dependencies = await parser.parse_lockfile(lock_file)
+        
+        assert [(dep.package.name, dep.package.version) for dep in dependencies] == [
+            ("com.google.guava:guava", "32.1.2-jre"),
+            ("junit:junit", "4.13.2"),
+        ]
+
+
+class TestCppParser:
+    """Test C/C++ vcpkg and conan parser."""
+    
+    def test_parse_conanfile_txt_sync(self, tmp_path):
+        """Test the synchronous path parses conanfile.txt without an event loop."""
+        parser = CppParser(PackageManager.CONAN)
+        
+        conanfile = tmp_path / "conanfile.txt"
+        conanfile.write_text("[requires]\nzlib/1.2.13\nfmt/9.1.0@user/stable\n\n[generators]\ncmake\n")
+        
+        dependencies = parser.parse_manifest_sync(conanfile)
+        
+        assert [(dep.package.name, dep.package.version) for dep in dependencies] == [
+            ("zlib", "1.2.13"),
+            ("fmt", "9.1.0"),
+        ]
+
+    def test_parse_conan_version_range(self, tmp_path):
+        """Test bracketed Conan version ranges are kept whole."""
+        parser = CppParser(PackageManager.CONAN)
+        
+        conanfile = tmp_path / "conanfile.txt"
+        conanfile.write_text("[requires]\nzlib/[>=1.2 <2]\nfmt/[~9]@user/stable\n")
+        
+        dependencies = parser.parse_manifest_sync(conanfile)
+        
+        assert [(dep.package.name, dep.package.version) for dep in dependencies] == [
+            ("zlib", "[>=1.2 <2]"),
+            ("fmt", "[~9]"),
+        ]
+
+    async def test_can_parse_rejects_unknown_names(self, tmp_path):
+        """Test unknown file names are rejected and known ones still checked on disk."""
+        parser = CppParser()
+        
+        (tmp_path / "vcpkg.json").write_text("{}")
+        (tmp_path / "README.md").write_text("")
+        
+        assert await parser.can_parse(tmp_path / "vcpkg.json")
+        assert not await parser.can_parse(tmp_path / "README.md")
+        assert not await parser.can_parse(tmp_path / "conan.lock")
+
+    def test_parse_conanfile_py_sync(self, tmp_path):
+        """Test requires lists and self.requires() calls are both picked up."""
+        parser = CppParser(PackageManager.CONAN)
+        
+        conanfile = tmp_path / "conanfile.py"
+        conanfile.write_text(
+            "from conan import ConanFile\n\n"
+            "class App(ConanFile):\n"
+            "    requires = [\"zlib/1.2.13\", \"fmt/9.1.0@user/stable\"]\n"
+            "    build_requires = [\"cmake/3.27.0\"]\n"
+            "    tool_requires = [\"ninja/1.11.1\"]\n\n"
+            "    def requirements(self):\n"
+            "        self.requires(\"openssl/3.1.0\")\n"
+        )
+        
+        dependencies = parser.parse_manifest_sync(conanfile)
+        
+        assert [(dep.package.name, dep.package.version) for dep in dependencies] == [
+            ("zlib", "1.2.13"),
+            ("fmt", "9.1.0"),
+            ("openssl", "3.1.0"),
+        ]
+
+    def test_parse_results_cached_until_file_changes(self, tmp_path):
+        """Test unchanged manifests are served from the parser cache."""
+        parser = CppParser(PackageManager.CONAN)
+        
+        conanfile = tmp_path / "conanfile.txt"
+        conanfile.write_text("[requires]\nzlib/1.2.13\n")
+        
+        first = parser.parse_manifest_sync(conanfile)
+        first.clear()
+        
+        mock_parse = MagicMock()
+        with patch.dict(parser._manifest_dispatch, {"conanfile.txt": mock_parse}):
+            second = parser.parse_manifest_sync(conanfile)
+        mock_parse.assert_not_called()
+        assert [dep.package.name for dep in second] == ["zlib"]
+        
+        conanfile.write_text("[requires]\nzlib/1.2.13\nfmt/9.1.0\n")
+        third = parser.parse_manifest_sync(conanfile)
+        assert [dep.package.name for dep in third] == ["zlib", "fmt"]
+
+    async def test_parse_conan_lock(self, tmp_path):
+        """Test parsing conan.lock graph nodes, skipping the root node."""
+        parser = CppParser(PackageManager.CONAN)
+        
+        lock_file = tmp_path / "conan.lock"
+        lock_file.write_text(json.dumps({
+            "graph_lock": {
+                "nodes": {
+                    "0": {"ref": "app/1.0"},
+                    "1": {"ref": "zlib/1.2.13@conan/stable"},
+                    "2": {"ref": "openssl/3.1.0"}
+                }
+            }
+        }))
+        
+        dependencies = await parser.parse_lockfile(lock_file)
+        
+        assert [(dep.package.name, dep.package.version) for dep in dependencies] == [
+            ("zlib", "1.2.13"),
+            ("openssl", "3.1.0"),
+        ]
+
+
+class TestCSharpParser:
+    """Test C# NuGet parser."""
+    
+    async def test_parse_csproj(self, tmp_path):
+        """Test parsing SDK-style and legacy MSBuild project files."""
+        parser = CSharpParser()
+        
+        csproj_file = tmp_path / "App.csproj"
+        csproj_file.write_text("""<Project Sdk="Microsoft.NET.Sdk">
+  <ItemGroup>
+    <PackageReference Include="Newtonsoft.Json" Version="13.0.1" />
+    <PackageReference Include="Serilog">
+      <Version>2.12.0</Version>
+    </PackageReference>
+  </ItemGroup>
+</Project>""")
+        legacy_file = tmp_path / "Legacy.csproj"
+        legacy_file.write_text("""<Project xmlns="http://schemas.microsoft.com/developer/msbuild/2003">
+  <ItemGroup>
+    <PackageReference Include="NUnit" Version="3.13.3" />
+    <PackageReference Include="Moq">
+      <Version>4.18.0</Version>
+    </PackageReference>
+  </ItemGroup>
+</Project>""")
+        
+        dependencies = await parser.parse_manifest(csproj_file)
+        assert {dep.package.name: dep.package.version for dep in dependencies} == {
+            "Newtonsoft.Json": "13.0.1",
+            "Serilog": "2.12.0",
+        }
+        
+        legacy = await parser.parse_manifest(legacy_file)
+        assert {dep.package.name: dep.package.version for dep in legacy} == {
+            "NUnit": "3.13.3",
+            "Moq": "4.18.0",
+        }
+
+    async def test_parse_packages_config(self, tmp_path):
+        """Test parsing packages.config files."""
+        parser = CSharpParser()
+        
+        config_file = tmp_path / "packages.config"
+        config_file.write_text("""<?xml version="1.0" encoding="utf-8"?>
+<packages>
+  <package id="jQuery" version="3.6.0" />
+  <package id="StyleCop.Analyzers" version="1.1.118" developmentDependency="true" />
+</packages>""")
+        
+        dependencies = await parser.parse_manifest(config_file)
+        
+        assert [dep.package.name for dep in dependencies] == ["jQuery", "StyleCop.Analyzers"]
+        assert dependencies[1].dependency_type == DependencyType.DEV
+
+    async def test_parse_packages_lock_json_with_bom(self, tmp_path):
+        """Test parsing packages.lock.json written with a UTF-8 byte order mark."""
+        parser = CSharpParser()
+        
+        lock_file = tmp_path / "packages.lock.json"
+        lock_data = {
+            "version": 1,
+            "dependencies": {
+                "Serilog": {"type": "Direct", "resolved": "2.12.0"},
+                "System.Memory": {"type": "Transitive", "resolved": "4.5.5"}
+            }
+        }
+        lock_file.write_bytes(b"\xef\xbb\xbf" + json.dumps(lock_data).encode("utf-8"))
+        
+        dependencies = await parser.parse_lockfile(lock_file)
+        
+        types = {dep.package.name: dep.dependency_type for dep in dependencies}
+        assert types == {
+            "Serilog": DependencyType.DIRECT,
+            "System.Memory": DependencyType.TRANSITIVE,
+        }
+
+
+class TestVersionHelpers:
+    """Test shared version string helpers."""
+    
+    def test_parse_version_constraint(self, javascript_parser):
+        """Test leading comparison operators are stripped."""
+        parser = javascript_parser
+        
+        assert parser._parse_version_constraint("^1.2.3") == "1.2.3"
+        assert parser._parse_version_constraint(">=2.0.0") == "2.0.0"
+        assert parser._parse_version_constraint("!=1.5") == "1.5"
+        assert parser._parse_version_constraint("<1") == "1"
+        assert parser._parse_version_constraint("1.0.0") == "1.0.0"
+        assert parser._parse_version_constraint("") == ""
 
 
 class TestParserErrorHandling:
     """Test parser error handling."""
     
-    @pytest.mark.asyncio
-    async def test_parse_invalid_json(self):
+    async def test_parse_invalid_json(self, javascript_parser, tmp_path):
         """Test parsing invalid JSON files."""
-        parser = JavaScriptParser()
+        parser = javascript_parser
         
-        with tempfile.TemporaryDirectory() as tmpdir:
-            tmppath = Path(tmpdir)
-            invalid_file = tmppath / "package.json"
-            
-            invalid_file.write_text("{invalid json content}")
-            
-            # Should not raise exception, just return empty list
-            dependencies = await parser.parse_manifest(invalid_file)
-            assert dependencies == []
-    
-    @pytest.mark.asyncio
-    async def test_parse_nonexistent_file(self):
+        invalid_file = tmp_path / "package.json"
+        
+        invalid_file.write_text("{invalid json content}")
+        
+        # Should not raise exception, just return empty list
+        dependencies = await parser.parse_manifest(invalid_file)
+        assert dependencies == []
+
+    async def test_parse_nonexistent_file(self, python_parser):
         """Test parsing nonexistent files."""
-        parser = PythonParser()
+        parser = python_parser
         
         nonexistent_file = Path("/tmp/nonexistent/requirements.txt")
         
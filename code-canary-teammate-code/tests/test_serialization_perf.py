@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the SBOM serialization paths used by the Modal workers.
+
+Run with ``pytest tests/test_serialization_perf.py --benchmark-autosave`` and
+compare later runs with ``--benchmark-compare --benchmark-compare-fail=mean:10%``.
+"""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from dependency_canary.models import SBOM, Dependency, DependencyType, Package
+
+
+def _build_sbom(package_count: int) -> SBOM:
+    """Build an SBOM with one direct dependency per package."""
+    sbom = SBOM(project_name="bench", project_path="/bench")
+    sbom.add_packages_bulk(
+        (package, Dependency(package=package, dependency_type=DependencyType.DIRECT))
+        for package in (
+            Package(name=f"package-{i}", version="1.0.0", language="python", package_manager="pip")
+            for i in range(package_count)
+        )
+    )
+    return sbom
+
+
+@pytest.fixture(scope="module")
+def sbom():
+    return _build_sbom(1000)
+
+
+def test_dump_python_mode(benchmark, sbom):
+    """Benchmark the dump returned by the SBOM workers."""
+    data = benchmark.pedantic(sbom.model_dump, kwargs={"exclude_none": True}, rounds=20, iterations=5)
+    assert len(data["packages"]) == 1000
+
+
+def test_dump_json_mode(benchmark, sbom):
+    """Benchmark the dump msgpack-encoded by the full scan worker."""
+    data = benchmark.pedantic(
+        sbom.model_dump, kwargs={"mode": "json", "exclude_none": True}, rounds=20, iterations=5
+    )
+    assert len(data["packages"]) == 1000
+
+
+def test_trusted_dict_round_trip(benchmark, sbom):
+    """Benchmark rebuilding an SBOM from a worker payload."""
+    data = sbom.model_dump(exclude_none=True)
+    recreated = benchmark.pedantic(SBOM.from_trusted_dict, args=(data,), rounds=20, iterations=5)
+    assert recreated == sbom